@@ -0,0 +1,83 @@
+from benchmarks.common import measure, report
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from flask import Flask
+from security.authorize import authorize
+from typing import Any
+import argparse
+import jwt
+
+HMAC_SECRET = 'benchmark-secret-of-at-least-32-bytes'
+
+
+def signing_keys(algorithm: str) -> tuple[Any, Any]:
+    """
+    Creates the keys tokens of an algorithm are signed and verified with.
+
+    :param algorithm: HS256, RS256 or EdDSA.
+    :return: The signing key and the verification key, PEM encoded for public keys.
+    """
+    if algorithm == 'HS256':
+        return HMAC_SECRET, HMAC_SECRET
+
+    if algorithm == 'RS256':
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    public_key = private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                       serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private_key, public_key.decode()
+
+
+def create_gateway(algorithm: str, verification_key: Any, cache_size: int) -> Flask:
+    """
+    Creates an application configured like the gateway, with a token cache of the given size.
+
+    :param algorithm: The algorithm tokens are signed with.
+    :param verification_key: The secret or public key tokens are verified with.
+    :param cache_size: The number of tokens kept in the cache; 0 verifies every token again.
+    :return: A Flask application instance.
+    """
+    gateway = Flask(__name__)
+    gateway.config.update({
+        'JWT_SECRET': verification_key,
+        'JWT_PUBLIC_KEY': verification_key,
+        'JWT_AUTHTYPE': algorithm,
+        'JWT_PREFIX': 'Bearer',
+        'JWT_CACHE_SIZE': cache_size
+    })
+    return gateway
+
+
+def main() -> None:
+    """
+    Measures the overhead `authorize` adds to a request, with HMAC and public-key algorithms, verifying the
+    token every time and answering from the token cache, against a handler called without authorization.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--repeat', type=int, default=20_000)
+    args = parser.parse_args()
+
+    def handler() -> str:
+        return 'ok'
+
+    protected = authorize(['admin', 'user'])(handler)
+    results = {}
+    variants = [('no authorization', 'HS256', 0, handler)]
+    for algorithm in ('HS256', 'RS256', 'EdDSA'):
+        variants += [(f'{algorithm}, uncached', algorithm, 0, protected),
+                     (f'{algorithm}, cached', algorithm, 10_000, protected)]
+
+    for variant, algorithm, cache_size, view in variants:
+        private_key, public_key = signing_keys(algorithm)
+        gateway = create_gateway(algorithm, public_key, cache_size)
+        token = jwt.encode({'role': 'user'}, private_key, algorithm=algorithm)
+        with gateway.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+            assert view() == 'ok'
+            results[variant] = measure(view, args.repeat)
+
+    report(f'Latency of {args.repeat} authorized calls', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+from benchmarks.common import measure, report
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from flask import Flask, Response, request, make_response
+from proxy.compression import init_compression
+import argparse
+import tracemalloc
+import logging
+import threading
+import time
+import os
+
+import httpx
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers every request with a JSON body of a fixed size over keep-alive HTTP/1.1 connections.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = b'{}'
+
+    def do_GET(self) -> None:
+        """
+        Sends the stub body.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format: str, *args) -> None:
+        """
+        Silences the access log of the stub.
+        """
+
+
+def start_stub_upstream(body_size: int) -> ThreadingHTTPServer:
+    """
+    Starts a local stub of an upstream service on a free port in a background thread.
+
+    :param body_size: The size in bytes of the body of every response.
+    :return: The running server; its address is in `server_address`.
+    """
+    item = b'{"id_": 1, "city": "Warsaw", "postal_code": "00-001", "latitude": 52.2297, "longitude": 21.0122}'
+    StubHandler.body = b'{"items": [' + b', '.join([item] * max(1, body_size // (len(item) + 2))) + b']}'
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_gateway(upstream_url: str) -> Flask:
+    """
+    Creates a gateway with the pooled proxy under /users and the former per-request proxy under /legacy.
+
+    :param upstream_url: The base URL of the stub upstream.
+    :return: A Flask application instance.
+    """
+    os.environ['USERS_URL'] = upstream_url
+    from routes.users import users_blueprint
+
+    gateway = Flask(__name__)
+    gateway.register_blueprint(users_blueprint)
+    init_compression(gateway)
+
+    @gateway.route('/legacy/<path:subpath>', methods=['GET'])
+    def legacy_proxy(subpath: str) -> Response:
+        """
+        Forwards a request the way the gateway did before the pooled upstreams: a new client and
+        connection per request, with the whole response read into memory before it is returned.
+        """
+        headers = {k: v for k, v in request.headers if k.lower() != 'host'}
+        resp = httpx.request(method=request.method, url=f'{upstream_url}/users/{subpath}', headers=headers,
+                             content=request.get_data(), follow_redirects=False)
+        return make_response(resp.content, resp.status_code, dict(resp.headers))
+
+    return gateway
+
+
+def transfer(gateway: Flask, path: str, accept_encoding: str) -> tuple[int, int]:
+    """
+    Sends one request through the gateway and consumes the response chunk by chunk, like a WSGI server.
+
+    :param gateway: The Flask application instance.
+    :param path: The path requested.
+    :param accept_encoding: The Accept-Encoding header of the request.
+    :return: The peak memory allocated while the request was served and the number of body bytes sent, in bytes.
+    """
+    tracemalloc.start()
+    response = gateway.test_client().get(path, headers={'Accept-Encoding': accept_encoding}, buffered=False)
+    sent = sum(len(chunk) for chunk in response.response)
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, sent
+
+
+def throughput(gateway: Flask, path: str, requests: int, concurrency: int) -> float:
+    """
+    Sends requests through the gateway from many threads, like the threads of a gunicorn worker.
+
+    :param gateway: The Flask application instance.
+    :param path: The path requested.
+    :param requests: The total number of requests.
+    :param concurrency: The number of threads sending requests.
+    :return: The number of requests per second.
+    """
+    def send(_: int) -> None:
+        gateway.test_client().get(path).get_data()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        started = time.perf_counter()
+        list(executor.map(send, range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def main() -> None:
+    """
+    Compares the pooled, streaming proxy of the gateway with the former per-request proxy against a
+    local stub upstream, so only the cost of the proxy itself is measured.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--repeat', type=int, default=1_000)
+    parser.add_argument('--body-size', type=int, default=1024)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    server = start_stub_upstream(args.body_size)
+    upstream_url = f'http://127.0.0.1:{server.server_address[1]}'
+    gateway = create_gateway(upstream_url)
+    client = gateway.test_client()
+
+    with httpx.Client(base_url=upstream_url) as direct:
+        results = {
+            'direct (no gateway)': measure(lambda: direct.get('/users/me').read(), args.repeat),
+            'per-request client': measure(lambda: client.get('/legacy/me').get_data(), args.repeat),
+            'pooled upstream': measure(lambda: client.get('/users/me').get_data(), args.repeat)
+        }
+    report(f'Latency of proxying a {args.body_size} B response', results)
+
+    print(f"{'variant':<32}{'req/s':>10}")
+    for variant, path in (('per-request client', '/legacy/me'), ('pooled upstream', '/users/me')):
+        rate = throughput(gateway, path, args.repeat, args.concurrency)
+        print(f"{f'{variant} ({args.concurrency} threads)':<32}{rate:>10.1f}")
+
+    print(f"{'variant':<32}{'peak KiB':>10}{'sent KiB':>10}")
+    for variant, path, accept_encoding in (('per-request client', '/legacy/me', 'identity'),
+                                           ('pooled upstream', '/users/me', 'identity'),
+                                           ('pooled upstream, gzip', '/users/me', 'gzip')):
+        peak, sent = transfer(gateway, path, accept_encoding)
+        print(f"{variant:<32}{peak / 1024:>10.1f}{sent / 1024:>10.1f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
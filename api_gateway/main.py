@@ -1,7 +1,17 @@
 from flask import Flask, jsonify
-from routes.parcel_locker import clients_blueprint, packages_blueprint, parcel_lockers_blueprint
+from routes.parcel_locker import (
+    clients_blueprint,
+    packages_blueprint,
+    package_batches_blueprint,
+    parcel_lockers_blueprint,
+)
 from routes.users import users_blueprint
+from routes.health import health_blueprint
+from proxy.upstream import upstreams
+from proxy.compression import init_compression
+from jwt_auth.keys import read_key
 from dotenv import load_dotenv
+import atexit
 import os
 
 app = Flask(__name__)
@@ -13,9 +23,17 @@ def create_app():
     app.config['JWT_ISSUER'] = os.getenv('JWT_ISSUER')
     app.config['JWT_AUTHTYPE'] = os.getenv('JWT_AUTHTYPE')
     app.config['JWT_SECRET'] = os.getenv('JWT_SECRET')
+    app.config['JWT_PUBLIC_KEY'] = read_key('JWT_PUBLIC_KEY')
     app.config['JWT_ACCESS_MAX_AGE'] = int(os.getenv('JWT_ACCESS_MAX_AGE'))
     app.config['JWT_REFRESH_MAX_AGE'] = int(os.getenv('JWT_REFRESH_MAX_AGE'))
     app.config['JWT_PREFIX'] = os.getenv('JWT_PREFIX')
+    app.config['JWT_CACHE_SIZE'] = int(os.getenv('JWT_CACHE_SIZE', 10_000))
+    app.config['JWT_CACHE_TTL'] = float(os.getenv('JWT_CACHE_TTL', 300))
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    app.config['COMPRESSION_LEVEL'] = int(os.getenv('COMPRESSION_LEVEL', 6))
+    app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    app.config['RESPONSE_CACHE_MAX_BODY'] = int(os.getenv('RESPONSE_CACHE_MAX_BODY', 256 * 1024))
 
     with app.app_context():
         @app.errorhandler(Exception)
@@ -29,7 +47,13 @@ def create_app():
         # --- PARCEL_LOCKERS mikroserwis ---
         app.register_blueprint(clients_blueprint)
         app.register_blueprint(packages_blueprint)
+        app.register_blueprint(package_batches_blueprint)
         app.register_blueprint(parcel_lockers_blueprint)
+        app.register_blueprint(health_blueprint)
+        init_compression(app)
+
+        for upstream in upstreams.values():
+            atexit.register(upstream.close)
 
         return app
 
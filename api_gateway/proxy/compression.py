@@ -0,0 +1,140 @@
+from flask import Flask, Response, request, current_app
+from typing import Callable, Iterable, Iterator
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/problem+json', 'text/')
+
+Compressor = tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def compressed_encodings() -> tuple[str, ...]:
+    """
+    Returns the content codings the gateway can produce, in order of preference.
+
+    :return: br if the brotli package is installed, and gzip.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding() -> str | None:
+    """
+    Chooses the content coding of the response from the Accept-Encoding header of the current request.
+
+    :return: The best coding the client accepts, or None if it accepts none of them.
+    """
+    accepted = request.accept_encodings
+    qualities = [(accepted[encoding], encoding) for encoding in compressed_encodings() if accepted[encoding] > 0]
+    if not qualities:
+        return None
+    return max(qualities, key=lambda quality: quality[0])[1]
+
+
+def create_compressor(encoding: str) -> Compressor:
+    """
+    Creates an incremental compressor for a content coding.
+
+    The gzip compression level is set by the COMPRESSION_LEVEL setting (default: 6), and the brotli quality
+    by COMPRESSION_BROTLI_QUALITY (default: 4), which trade some size for much less CPU time per response.
+
+    :param encoding: br or gzip.
+    :return: A pair of functions: one compressing a chunk, one returning the end of the compressed stream.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=int(current_app.config.get('COMPRESSION_BROTLI_QUALITY', 4)))
+        return compressor.process, compressor.finish
+
+    level = int(current_app.config.get('COMPRESSION_LEVEL', 6))
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks: Iterable[bytes], compressor: Compressor) -> Iterator[bytes]:
+    """
+    Compresses a body chunk by chunk, without reading it into memory.
+
+    :param chunks: The chunks of the body.
+    :param compressor: The compressor returned by `create_compressor`.
+    :return: An iterator of compressed chunks.
+    """
+    compress, finish = compressor
+    try:
+        for chunk in chunks:
+            compressed = compress(chunk)
+            if compressed:
+                yield compressed
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def is_compressible(response: Response) -> bool:
+    """
+    Checks if a response may be compressed by the gateway: a text or JSON body that is not encoded yet,
+    not a partial response, and not marked as untransformable.
+
+    :param response: The response.
+    :return: True if the response may be compressed, False otherwise.
+    """
+    return (request.method != 'HEAD'
+            and response.status_code not in (204, 206, 304)
+            and response.mimetype.startswith(COMPRESSIBLE_TYPES)
+            and 'Content-Encoding' not in response.headers
+            and 'Content-Range' not in response.headers
+            and 'no-transform' not in response.headers.get('Cache-Control', ''))
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compresses a response with the best coding the client accepts, if it is at least COMPRESSION_MIN_SIZE
+    bytes long (default: 1024).
+
+    Streamed responses, e.g. proxied listings, are compressed while they are streamed; those of unknown length
+    are compressed regardless of their size. Responses the upstream has already encoded are passed through as
+    they are. The ETag of a compressed response is made weak, as the compressed bytes differ from those the
+    upstream tagged, but the client can still revalidate with it.
+
+    :param response: The response.
+    :return: The compressed response, or the response unchanged.
+    """
+    if not is_compressible(response):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    min_size = int(current_app.config.get('COMPRESSION_MIN_SIZE', 1024))
+    if response.is_streamed:
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+        response.response = compress_stream(response.response, create_compressor(encoding))
+        del response.headers['Content-Length']
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        compress, finish = create_compressor(encoding)
+        response.set_data(compress(data) + finish())
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Compresses the responses of an application.
+
+    :param app: The application.
+    """
+    app.after_request(compress_response)
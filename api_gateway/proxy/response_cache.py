@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from flask import Response, request, current_app, g
+from typing import Any
+from proxy.upstream import Upstream
+import itertools
+import threading
+import hashlib
+import time
+
+CacheKey = tuple[str, str, bytes, str | None]
+
+
+class CachedResponse:
+    """
+    A response of an upstream stored by the gateway, with the time it stays fresh.
+    """
+
+    __slots__ = ('status_code', 'headers', 'body', 'etag', 'stored_at', 'expires_at')
+
+    def __init__(self, status_code: int, headers: list[tuple[str, str]], body: bytes, etag: str | None, ttl: float):
+        """
+        Initializes the stored response.
+
+        :param status_code: The status code of the response.
+        :param headers: The headers of the response.
+        :param body: The body of the response.
+        :param etag: The entity tag of the response, without quotes, or None if it has none.
+        :param ttl: The number of seconds the response stays fresh.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl
+
+    def to_response(self) -> Response:
+        """
+        Builds the response to the current request from the stored one: 304 Not Modified if the client's
+        If-None-Match header matches the stored ETag, otherwise the stored response. The Age header tells
+        the client how long ago the response was fetched from the upstream.
+
+        :return: A new response.
+        """
+        age = str(int(time.monotonic() - self.stored_at))
+        if self.etag is not None and request.if_none_match.contains_weak(self.etag):
+            headers = [(name, value) for name, value in self.headers if name.lower() in ('etag', 'cache-control', 'vary')]
+            return Response(status=304, headers=headers + [('Age', age)])
+        return Response(self.body, self.status_code, self.headers + [('Age', age)])
+
+
+class ResponseCache:
+    """
+    In-process cache of upstream responses, shared by the users of the gateway with the same role.
+
+    Only responses to GET requests of cached routes are stored, and only if the upstream allows it: 200 responses
+    with a max-age or s-maxage, that are not private, not compressed and small enough. A response is stored for
+    as long as the upstream allows, and the total size of the stored bodies is bounded by evicting the least
+    recently used responses first.
+
+    The cache is shared by all threads of a worker process and guarded by a lock.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_body: int = 256 * 1024):
+        """
+        Initializes an empty cache.
+
+        :param max_bytes: The maximum total size of the stored bodies, in bytes.
+        :param max_body: The maximum size of a single stored body, in bytes.
+        """
+        self.max_body = max_body
+        self._max_bytes = max_bytes
+        self._responses: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        """
+        Retrieves a fresh response and marks it as recently used; expired responses are dropped.
+
+        :param key: The key of the response.
+        :return: The stored response, or None if it is not stored or has expired.
+        """
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._responses.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def set(self, key: CacheKey, entry: CachedResponse) -> None:
+        """
+        Stores a response, evicting the least recently used responses until the bodies fit in the cache.
+
+        :param key: The key of the response.
+        :param entry: The response to store.
+        """
+        with self._lock:
+            if key in self._responses:
+                self._remove(key)
+            self._responses[key] = entry
+            self._bytes += len(entry.body)
+            while self._bytes > self._max_bytes and self._responses:
+                self._remove(next(iter(self._responses)))
+                self._evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the cache.
+
+        :return: A dictionary with the number and total size of the stored responses, the number of hits and
+                 misses, the hit ratio, and the number of responses evicted to make room and dropped after expiring.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._responses),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        """
+        Removes a response; the lock must be held.
+
+        :param key: The key of the response.
+        """
+        self._bytes -= len(self._responses.pop(key).body)
+
+
+def get_response_cache(app: Any) -> ResponseCache:
+    """
+    Returns the response cache of an application, creating it on first use.
+
+    The cache is sized by the RESPONSE_CACHE_MAX_BYTES and RESPONSE_CACHE_MAX_BODY settings of the application.
+
+    :param app: The application.
+    :return: The `ResponseCache` instance of the application.
+    """
+    cache = app.extensions.get('response_cache')
+    if cache is None:
+        cache = app.extensions.setdefault('response_cache', ResponseCache(
+            int(app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+            int(app.config.get('RESPONSE_CACHE_MAX_BODY', 256 * 1024))
+        ))
+    return cache
+
+
+def freshness_lifetime(response: Response, max_body: int) -> float:
+    """
+    Determines how long an upstream response may be stored by the gateway, following its Cache-Control header.
+
+    :param response: The upstream response.
+    :param max_body: The maximum size of a stored body, in bytes.
+    :return: The number of seconds the response stays fresh, or 0 if it must not be stored.
+    """
+    cache_control = response.cache_control
+    if (response.status_code != 200
+            or cache_control.private or cache_control.no_store or cache_control.no_cache
+            or (response.content_length is not None and response.content_length > max_body)
+            or 'Content-Encoding' in response.headers or 'Set-Cookie' in response.headers
+            or any(field.lower() != 'accept-encoding' for field in response.vary)):
+        return 0
+    lifetime = cache_control.s_maxage if cache_control.s_maxage is not None else cache_control.max_age
+    return float(lifetime or 0)
+
+
+def buffer_body(response: Response, max_body: int) -> bytes | None:
+    """
+    Reads the body of a streamed upstream response into memory, as long as it is not larger than `max_body`.
+
+    A larger body is left streaming: the response sends the chunks already read, then the rest of the stream.
+
+    :param response: The upstream response.
+    :param max_body: The maximum size of a stored body, in bytes.
+    :return: The body, or None if it is larger than `max_body`.
+    """
+    chunks = iter(response.response)
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if len(body) > max_body:
+            response.response = itertools.chain([bytes(body)], chunks)
+            return None
+    response.set_data(bytes(body))
+    return bytes(body)
+
+
+def forward_cached(upstream: Upstream, path: str, cached: bool) -> Response:
+    """
+    Forwards the current request to an upstream, answering GET requests from the response cache when possible.
+
+    Responses are shared by the users with the same role, so a response is never served to a user whose role
+    could see different data. A request with Cache-Control: no-cache or no-store always reaches the upstream,
+    and requests of routes that are not cached are always forwarded as they are.
+
+    A stored response without an ETag gets one derived from its body, so clients can revalidate it with the
+    gateway.
+
+    :param upstream: The upstream serving the path.
+    :param path: The path of the upstream endpoint, e.g. /clients/1.
+    :param cached: Whether the responses of the route may be stored.
+    :return: The stored response, or the response of the upstream.
+    """
+    if request.method != 'GET' or not cached:
+        return upstream.forward(path)
+
+    cache = get_response_cache(current_app)
+    claims = g.get('jwt_claims')
+    key = (upstream.name, path, request.query_string, claims['role'].lower() if claims else None)
+    if not (request.cache_control.no_cache or request.cache_control.no_store):
+        entry = cache.get(key)
+        if entry is not None:
+            return entry.to_response()
+
+    response = upstream.forward(path)
+    lifetime = freshness_lifetime(response, cache.max_body)
+    if lifetime <= 0:
+        return response
+
+    body = buffer_body(response, cache.max_body)
+    if body is None:
+        return response
+
+    etag, _ = response.get_etag()
+    if etag is None:
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        response.set_etag(etag)
+    entry = CachedResponse(response.status_code, list(response.headers.items()), body, etag, lifetime)
+    cache.set(key, entry)
+    response.close()
+    return entry.to_response()
@@ -0,0 +1,83 @@
+from flask import Blueprint, Response
+from flask.blueprints import BlueprintSetupState
+from dataclasses import dataclass
+from typing import Callable
+from security.authorize import authorize
+from proxy.upstream import upstreams
+from proxy.response_cache import forward_cached
+import re
+
+RULE_VARIABLE = re.compile(r'<(?:[^<>:]+:)?([^<>]+)>')
+
+
+@dataclass(frozen=True, slots=True)
+class ProxyRoute:
+    """
+    An entry of the route table of the gateway: requests matching the rule are forwarded to the same path of
+    the upstream.
+
+    :param endpoint: The name of the Flask endpoint of the route.
+    :param rule: The URL rule of the route, relative to the prefix of its blueprint, e.g. /<int:client_id>.
+    :param methods: The HTTP methods accepted by the route.
+    :param upstream: The name of the upstream the requests are forwarded to.
+    :param roles: The roles allowed to use the route, or None if the route needs no authorization.
+    :param cached: Whether the gateway may store GET responses of the route the upstream marks as cacheable;
+                   False for routes whose responses must always reach the upstream, e.g. live locker states.
+    """
+    endpoint: str
+    rule: str
+    methods: tuple[str, ...]
+    upstream: str
+    roles: frozenset[str] | None = None
+    cached: bool = False
+
+
+def register_routes(blueprint: Blueprint, routes: list[ProxyRoute]) -> None:
+    """
+    Adds the routes of a route table to a blueprint.
+
+    The routes are compiled when the blueprint is registered on the application: the upstream of every route
+    is resolved and its path template is built once, so forwarding a request only fills in the path variables.
+
+    :param blueprint: The blueprint serving the routes.
+    :param routes: The route table.
+    """
+    def setup(state: BlueprintSetupState) -> None:
+        """
+        Compiles the routes and adds them to the application the blueprint is being registered on.
+
+        :param state: The registration state of the blueprint.
+        """
+        for route in routes:
+            state.add_url_rule(route.rule, route.endpoint, compile_route(route, state.url_prefix or ''),
+                               methods=list(route.methods))
+
+    blueprint.record(setup)
+
+
+def compile_route(route: ProxyRoute, url_prefix: str) -> Callable[..., Response]:
+    """
+    Builds the view function forwarding the requests of a route to its upstream, through the response cache
+    of the gateway if the route is cached.
+
+    :param route: The route to compile.
+    :param url_prefix: The URL prefix of the blueprint serving the route.
+    :return: The view function, wrapped in the authorization check of the route if it requires roles.
+    """
+    upstream = upstreams[route.upstream]
+    path = url_prefix + route.rule
+    template = RULE_VARIABLE.sub(r'{\1}', path)
+
+    if template == path:
+        def view() -> Response:
+            return forward_cached(upstream, path, route.cached)
+    else:
+        def view(**variables) -> Response:
+            return forward_cached(upstream, template.format_map(variables), route.cached)
+
+    view.__name__ = route.endpoint
+    view.__doc__ = f'Proxies {", ".join(route.methods)} requests to {path} of the {route.upstream} service.'
+
+    if route.roles is not None:
+        return authorize(sorted(route.roles))(view)
+    return view
@@ -0,0 +1,352 @@
+from flask import request, Response, make_response
+from functools import partial
+from typing import Any, Iterable, Iterator
+import itertools
+import threading
+import logging
+import httpx
+import time
+import os
+
+HOP_BY_HOP_HEADERS = frozenset({
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection',
+    'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade'
+})
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UpstreamServer:
+    """
+    One instance of an upstream service, e.g. one of several parcel_lockers workers, with its health state.
+
+    A server that fails is taken out of rotation until `down_until` passes or an active health check
+    finds it healthy again.
+    """
+
+    __slots__ = ('url', 'failures', 'down_until')
+
+    def __init__(self, url: str):
+        """
+        Initializes a healthy server.
+
+        :param url: The base URL of the server, e.g. http://parcel_lockers-webapp:8100.
+        """
+        self.url = url.rstrip('/')
+        self.failures = 0
+        self.down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """
+        Checks if the server is in rotation.
+
+        :return: True if the server is not marked as down, False otherwise.
+        """
+        return self.down_until <= time.monotonic()
+
+    def mark_failed(self, max_fails: int, fail_timeout: float) -> None:
+        """
+        Records a failed request and takes the server out of rotation once it failed `max_fails` times in a row.
+
+        :param max_fails: The number of consecutive failures after which the server is marked as down.
+        :param fail_timeout: Seconds the server stays out of rotation.
+        """
+        self.failures += 1
+        if self.failures >= max_fails:
+            self.mark_down(fail_timeout)
+
+    def mark_down(self, fail_timeout: float) -> None:
+        """
+        Takes the server out of rotation.
+
+        :param fail_timeout: Seconds the server stays out of rotation.
+        """
+        self.failures = 0
+        self.down_until = time.monotonic() + fail_timeout
+
+    def mark_up(self) -> None:
+        """
+        Puts the server back into rotation.
+        """
+        self.failures = 0
+        self.down_until = 0.0
+
+
+class Upstream:
+    """
+    A backend service the gateway forwards requests to, reached through a shared pool of keep-alive connections.
+
+    Every worker process keeps one `httpx.Client` per upstream, created on first use and shared by all
+    threads of the worker, so consecutive requests reuse open HTTP/1.1 connections instead of paying
+    for a DNS lookup and a TCP handshake on every proxied call. Request and response bodies are streamed
+    through the gateway in chunks instead of being buffered whole.
+
+    The upstream may consist of several servers, which are used in turn (round robin). A server that
+    cannot be reached is taken out of rotation for a while and the request is sent to the next one
+    (passive health checks). If the upstream has a health endpoint, every server is also probed in the
+    background and put back into rotation as soon as it answers again (active health checks).
+
+    Environment variables used, read when the client is created:
+    - <NAME>_URL: Comma-separated base URLs of the servers, e.g. PARCEL_LOCKERS_URL (default: the docker-compose address).
+    - UPSTREAM_MAX_CONNECTIONS: Maximum number of connections to one upstream (default: 100).
+    - UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: Maximum number of idle connections kept open (default: 20).
+    - UPSTREAM_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default: 30).
+    - UPSTREAM_CONNECT_TIMEOUT: Seconds to wait for a connection to the upstream (default: 2).
+    - UPSTREAM_READ_TIMEOUT: Seconds to wait for data from or to the upstream (default: 30).
+    - UPSTREAM_POOL_TIMEOUT: Seconds to wait for a free connection of the pool (default: 5).
+    - UPSTREAM_MAX_FAILS: Consecutive failures after which a server is taken out of rotation (default: 1).
+    - UPSTREAM_FAIL_TIMEOUT: Seconds a failed server stays out of rotation (default: 10).
+    - UPSTREAM_HEALTH_INTERVAL: Seconds between active health checks, 0 to disable them (default: 5).
+    """
+
+    def __init__(self, name: str, default_url: str, transport: httpx.BaseTransport | None = None,
+                 health_path: str | None = None):
+        """
+        Initializes the upstream; the connection pool is created on first use.
+
+        :param name: The name of the upstream, which prefixes the environment variable of its URL.
+        :param default_url: The base URLs used when <NAME>_URL is not set, separated by commas.
+        :param transport: An optional transport used instead of the network, e.g. `httpx.MockTransport` in tests.
+        :param health_path: The path of the health endpoint of the servers, or None if they have none.
+        :raises ValueError: If `default_url` lists no server.
+        """
+        server_urls(name, default_url)
+        self.name = name
+        self._default_url = default_url
+        self._transport = transport
+        self._health_path = health_path
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._servers: list[UpstreamServer] = []
+        self._turn = itertools.count()
+        self._stopped = threading.Event()
+        self._pid: int | None = None
+        self._max_fails = 1
+        self._fail_timeout = 10.0
+
+    @property
+    def client(self) -> httpx.Client:
+        """
+        Returns the client of the current worker process, creating it on first access.
+
+        The client does not ask for compressed responses on its own; the Accept-Encoding header of the
+        forwarded request is passed on, so a compressed body is streamed back to a client that accepts it.
+
+        A client inherited through fork() shares sockets with the parent process, so a new one is created
+        whenever the upstream is used from a different process than the one that created the client.
+
+        :return: The shared `httpx.Client` instance.
+        """
+        self._ensure_open()
+        return self._client
+
+    @property
+    def servers(self) -> list[UpstreamServer]:
+        """
+        Returns the servers of the upstream, in the order of its configuration.
+
+        :return: A list of `UpstreamServer` instances.
+        """
+        self._ensure_open()
+        return self._servers
+
+    def forward(self, path: str) -> Response:
+        """
+        Forwards the current request to a path of the upstream and streams back its response.
+
+        The method, query string, headers and body of the request are forwarded, except hop-by-hop headers
+        and the Host header. A request that cannot be delivered to a server is sent to the next available
+        one. Failing to reach every server is answered with 502 Bad Gateway, and running out of time with
+        504 Gateway Timeout.
+
+        :param path: The path of the upstream endpoint, e.g. /clients/1.
+        :return: A response streaming the status, headers and body of the upstream response.
+        """
+        client = self.client
+        query = request.query_string or None
+        headers = forwarded_headers(request.headers.items())
+        content = request_body()
+
+        for server in self._rotation():
+            upstream_request = client.build_request(request.method, httpx.URL(server.url + path, query=query),
+                                                    headers=headers, content=content)
+            try:
+                upstream_response = client.send(upstream_request, stream=True, follow_redirects=False)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as error:
+                logging.warning('Upstream %s server %s is unreachable: %r', self.name, server.url, error)
+                server.mark_failed(self._max_fails, self._fail_timeout)
+                continue
+            except httpx.TimeoutException as error:
+                logging.warning('Upstream %s server %s timed out: %r', self.name, server.url, error)
+                server.mark_failed(self._max_fails, self._fail_timeout)
+                return make_response({'message': f'The {self.name} service did not respond in time'}, 504)
+            except httpx.TransportError as error:
+                logging.warning('Upstream %s server %s failed: %r', self.name, server.url, error)
+                server.mark_failed(self._max_fails, self._fail_timeout)
+                break
+
+            server.failures = 0
+            response = Response(upstream_response.iter_raw(CHUNK_SIZE), upstream_response.status_code,
+                                forwarded_headers(upstream_response.headers.multi_items()))
+            response.call_on_close(upstream_response.close)
+            return response
+
+        return make_response({'message': f'The {self.name} service is unavailable'}, 502)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Returns the state of the servers of the upstream.
+
+        :return: A list with the URL of every server and whether it is in rotation.
+        """
+        return [{'url': server.url, 'available': server.available} for server in self.servers]
+
+    def check_health(self) -> None:
+        """
+        Probes the health endpoint of every server, putting the healthy ones into rotation and taking the others out.
+        """
+        if not self._health_path:
+            return
+
+        client = self.client
+        for server in self._servers:
+            try:
+                healthy = client.get(server.url + self._health_path).status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+
+            if healthy:
+                server.mark_up()
+            elif server.available:
+                logging.warning('Upstream %s server %s failed its health check', self.name, server.url)
+                server.mark_down(self._fail_timeout)
+
+    def close(self) -> None:
+        """
+        Stops the health checks and closes the connections of the current worker process.
+        """
+        with self._lock:
+            self._stopped.set()
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def _rotation(self) -> list[UpstreamServer]:
+        """
+        Returns the servers to try for a request: the available ones, starting with the next one in turn.
+
+        If every server is out of rotation, all of them are tried rather than failing the request outright.
+
+        :return: The servers in the order they should be tried.
+        """
+        servers = [server for server in self._servers if server.available] or self._servers
+        start = next(self._turn) % len(servers)
+        return servers[start:] + servers[:start]
+
+    def _ensure_open(self) -> None:
+        """
+        Opens the upstream in the current worker process unless it is already open there.
+        """
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._open()
+
+    def _open(self) -> None:
+        """
+        Creates the client and the servers of the upstream, configured by the environment, and starts the
+        active health checks if the upstream has a health endpoint.
+
+        :raises ValueError: If <NAME>_URL lists no server.
+        """
+        urls = server_urls(f'{self.name.upper()}_URL', os.getenv(f'{self.name.upper()}_URL', self._default_url))
+        limits = httpx.Limits(
+            max_connections=int(os.getenv('UPSTREAM_MAX_CONNECTIONS', 100)),
+            max_keepalive_connections=int(os.getenv('UPSTREAM_MAX_KEEPALIVE_CONNECTIONS', 20)),
+            keepalive_expiry=float(os.getenv('UPSTREAM_KEEPALIVE_EXPIRY', 30))
+        )
+        timeout = httpx.Timeout(
+            float(os.getenv('UPSTREAM_READ_TIMEOUT', 30)),
+            connect=float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 2)),
+            pool=float(os.getenv('UPSTREAM_POOL_TIMEOUT', 5))
+        )
+        self._client = httpx.Client(
+            headers={'Accept-Encoding': 'identity'},
+            limits=limits,
+            timeout=timeout,
+            transport=self._transport
+        )
+        self._servers = [UpstreamServer(url) for url in urls]
+        self._max_fails = int(os.getenv('UPSTREAM_MAX_FAILS', 1))
+        self._fail_timeout = float(os.getenv('UPSTREAM_FAIL_TIMEOUT', 10))
+        self._pid = os.getpid()
+
+        interval = float(os.getenv('UPSTREAM_HEALTH_INTERVAL', 5))
+        if self._health_path and interval > 0:
+            self._stopped = threading.Event()
+            threading.Thread(target=self._run_health_checks, args=(self._stopped, interval),
+                             name=f'{self.name}-health', daemon=True).start()
+
+    def _run_health_checks(self, stopped: threading.Event, interval: float) -> None:
+        """
+        Runs the active health checks until the upstream is closed.
+
+        :param stopped: The event set when the upstream is closed.
+        :param interval: Seconds between two rounds of checks.
+        """
+        while not stopped.wait(interval):
+            try:
+                self.check_health()
+            except Exception as error:
+                logging.warning('Health check of upstream %s failed: %r', self.name, error)
+
+
+def server_urls(name: str, urls: str) -> list[str]:
+    """
+    Splits the comma-separated base URLs of the servers of an upstream.
+
+    :param name: The name of the setting the URLs come from, used in the error message.
+    :param urls: The base URLs, separated by commas.
+    :return: The base URLs, without surrounding whitespace.
+    :raises ValueError: If no server is listed.
+    """
+    servers = [url.strip() for url in urls.split(',') if url.strip()]
+    if not servers:
+        raise ValueError(f'{name} must list at least one server URL, got {urls!r}')
+    return servers
+
+
+def forwarded_headers(headers: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    Filters the headers that must not be forwarded by a proxy: hop-by-hop headers, the headers named
+    by the Connection header, and the Host header, which is set for the upstream by the client.
+
+    :param headers: The headers as (name, value) pairs.
+    :return: The headers to forward, in their original order.
+    """
+    headers = list(headers)
+    connection_tokens = {token.strip().lower()
+                         for name, value in headers if name.lower() == 'connection'
+                         for token in value.split(',')}
+    return [(name, value) for name, value in headers
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() not in connection_tokens
+            and name.lower() != 'host']
+
+
+def request_body() -> Iterator[bytes] | None:
+    """
+    Returns the body of the current request as a stream of chunks, without reading it into memory.
+
+    :return: An iterator of body chunks, or None if the request has no body.
+    """
+    if request.content_length is None and 'chunked' not in request.headers.get('Transfer-Encoding', '').lower():
+        return None
+    return iter(partial(request.stream.read, CHUNK_SIZE), b'')
+
+
+parcel_lockers_upstream = Upstream('parcel_lockers', 'http://parcel_lockers-webapp:8100', health_path='/health')
+users_upstream = Upstream('users', 'http://users-nginx:82')
+
+upstreams = {upstream.name: upstream for upstream in (parcel_lockers_upstream, users_upstream)}
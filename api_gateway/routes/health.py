@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify, Response, make_response, current_app
+from proxy.upstream import upstreams
+from jwt_auth.flask_auth import get_verifier
+from proxy.response_cache import get_response_cache
+
+health_blueprint = Blueprint('health', __name__, url_prefix='/health')
+
+
+@health_blueprint.route('', methods=['GET'])
+def health_route() -> Response:
+    """
+    Route to report the health of the gateway: the state of the upstream servers and the statistics
+    of the token and response caches.
+
+    :return: A JSON response with the statistics.
+    """
+    return make_response(jsonify({
+        'status': 'up',
+        'upstreams': {name: upstream.stats() for name, upstream in upstreams.items()},
+        'token_cache': get_verifier(current_app).cache.stats(),
+        'response_cache': get_response_cache(current_app).stats()
+    }), 200)
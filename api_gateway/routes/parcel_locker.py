@@ -1,126 +1,33 @@
-from flask import Flask, request, Blueprint, Response, make_response
-from security.authorize import authorize
-import httpx
+from flask import Blueprint
+from proxy.router import ProxyRoute, register_routes
 
 clients_blueprint = Blueprint('clients', __name__, url_prefix='/clients')
 packages_blueprint = Blueprint('packages', __name__, url_prefix='/packages')
+package_batches_blueprint = Blueprint('package_batches', __name__, url_prefix='/packages:batch')
 parcel_lockers_blueprint = Blueprint('parcel_lockers', __name__, url_prefix='/parcel_lockers')
 
-
-@clients_blueprint.route('/<int:client_id>')
-@authorize(['admin', 'user'])
-def proxy_clients_get(client_id: int) -> Response:
-    """
-    Proxies GET requests to the clients endpoint.
-
-    :param client_id: The ID of the client to retrieve.
-    :return: The response from the proxied request.
-    """
-    target_url = f"http://parcel_lockers-webapp:8100/clients/{client_id}"
-    forwarded_headers = {
-        k: v for k, v in request.headers if k.lower() != "host"
-    }
-
-    resp = httpx.request(
-        method=request.method,
-        url=target_url,
-        headers=forwarded_headers,
-        content=request.get_data(),
-        follow_redirects=False
-    )
-    return make_response(resp.content, resp.status_code, dict(resp.headers))
-
-
-@packages_blueprint.route('', methods=['POST'])
-@authorize(['admin', 'user'])
-def proxy_packages_post() -> Response:
-    """
-    Proxies POST requests to the packages endpoint.
-
-    :return: The response from the proxied request.
-    """
-    target_url = "http://parcel_lockers-webapp:8100/packages"
-    forwarded_headers = {
-        k: v for k, v in request.headers if k.lower() != "host"
-    }
-
-    resp = httpx.request(
-        method=request.method,
-        url=target_url,
-        headers=forwarded_headers,
-        content=request.get_data(),
-        follow_redirects=False
-    )
-    return make_response(resp.content, resp.status_code, dict(resp.headers))
-
-
-@packages_blueprint.route('/<int:package_id>', methods=['PUT'])
-@authorize(['admin', 'user'])
-def proxy_packages_put(package_id: int) -> Response:
-    """
-    Proxies PUT requests to update a package.
-
-    :param package_id: The ID of the package to update.
-    :return: The response from the proxied request.
-    """
-    target_url = f"http://parcel_lockers-webapp:8100/packages/{package_id}"
-    forwarded_headers = {
-        k: v for k, v in request.headers if k.lower() != "host"
-    }
-
-    resp = httpx.request(
-        method=request.method,
-        url=target_url,
-        headers=forwarded_headers,
-        content=request.get_data(),
-        follow_redirects=False
-    )
-    return make_response(resp.content, resp.status_code, dict(resp.headers))
-
-
-@parcel_lockers_blueprint.route('/parcel_locker', methods=['POST'])
-@authorize(['admin'])
-def proxy_add_parcel_locker() -> Response:
-    """
-    Proxies POST requests to add a new parcel locker.
-
-    :return: The response from the proxied request.
-    """
-    target_url = "http://parcel_lockers-webapp:8100/parcel_lockers/parcel_locker"
-    forwarded_headers = {
-        k: v for k, v in request.headers if k.lower() != "host"
-    }
-
-    resp = httpx.request(
-        method=request.method,
-        url=target_url,
-        headers=forwarded_headers,
-        content=request.get_data(),
-        follow_redirects=False
-    )
-    return make_response(resp.content, resp.status_code, dict(resp.headers))
-
-
-@parcel_lockers_blueprint.route('/locker', methods=['POST'])
-@authorize(['admin'])
-def proxy_add_locker() -> Response:
-    """
-    Proxies POST requests to add a new locker to a parcel locker.
-
-    :return: The response from the proxied request.
-    """
-    target_url = "http://parcel_lockers-webapp:8100/parcel_lockers/locker"
-    forwarded_headers = {
-        k: v for k, v in request.headers if k.lower() != "host"
-    }
-
-    resp = httpx.request(
-        method=request.method,
-        url=target_url,
-        headers=forwarded_headers,
-        content=request.get_data(),
-        follow_redirects=False
-    )
-    return make_response(resp.content, resp.status_code, dict(resp.headers))
-
-
+ADMIN = frozenset({'admin'})
+ADMIN_OR_USER = frozenset({'admin', 'user'})
+
+register_routes(clients_blueprint, [
+    ProxyRoute('proxy_clients_get', '/<int:client_id>', ('GET',), 'parcel_lockers', ADMIN_OR_USER),
+])
+
+register_routes(packages_blueprint, [
+    ProxyRoute('proxy_packages_list', '', ('GET',), 'parcel_lockers', ADMIN),
+    ProxyRoute('proxy_packages_post', '', ('POST',), 'parcel_lockers', ADMIN_OR_USER),
+    ProxyRoute('proxy_packages_put', '/<int:package_id>', ('PUT',), 'parcel_lockers', ADMIN_OR_USER),
+])
+
+register_routes(package_batches_blueprint, [
+    ProxyRoute('proxy_packages_batch_post', '', ('POST',), 'parcel_lockers', ADMIN_OR_USER),
+])
+
+register_routes(parcel_lockers_blueprint, [
+    ProxyRoute('proxy_parcel_lockers_list', '', ('GET',), 'parcel_lockers', ADMIN),
+    ProxyRoute('proxy_add_parcel_locker', '/parcel_locker', ('POST',), 'parcel_lockers', ADMIN),
+    ProxyRoute('proxy_add_locker', '/locker', ('POST',), 'parcel_lockers', ADMIN),
+    ProxyRoute('proxy_lockers_list', '/<int:parcel_locker_id>/lockers', ('GET',), 'parcel_lockers', ADMIN),
+    ProxyRoute('proxy_availability_get', '/<int:parcel_locker_id>/availability', ('GET',), 'parcel_lockers',
+               ADMIN_OR_USER, cached=True),
+])
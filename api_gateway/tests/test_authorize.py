@@ -1,7 +1,12 @@
 import pytest
 import jwt
-from flask import Flask, jsonify
+from flask import Flask, jsonify, current_app
 from security.authorize import authorize
+from jwt_auth.cache import TokenCache
+from jwt_auth.flask_auth import get_verifier
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+import time
 
 
 @pytest.fixture
@@ -113,3 +118,108 @@ def test_valid_token(client):
     response = client.get("/protected", headers=headers)
     assert response.status_code == 200
     assert response.json == {"message": "Access granted"}
+
+
+def test_verified_token_is_cached(client, mocker):
+    """
+    Test case for a token sent twice; expects its signature to be verified only once.
+
+    :param client: The test client instance.
+    :param mocker: The mocking object used to spy on the token verification.
+    :return: None
+    """
+    decode = mocker.spy(jwt, 'decode')
+    token = jwt.encode({"role": "admin"}, "test_secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/protected", headers=headers)
+    second = client.get("/protected", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert decode.call_count == 1
+    assert get_verifier(current_app).cache.stats()['hits'] == 1
+
+
+def test_cached_token_expires(client):
+    """
+    Test case for a cached token whose `exp` claim has passed; expects it to be rejected.
+
+    :param client: The test client instance.
+    :return: None
+    """
+    expires_at = int(time.time()) + 1
+    token = jwt.encode({"role": "admin", "exp": expires_at}, "test_secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/protected", headers=headers).status_code == 200
+
+    time.sleep(max(0.0, expires_at - time.time()) + 0.05)
+
+    response = client.get("/protected", headers=headers)
+    assert response.status_code == 401
+    assert get_verifier(current_app).cache.stats()['expirations'] == 1
+
+
+def test_cache_is_keyed_by_secret(client, app):
+    """
+    Test case for a cached token after the signing key has changed; expects it to be verified again and rejected.
+
+    :param client: The test client instance.
+    :param app: The Flask app instance.
+    :return: None
+    """
+    token = jwt.encode({"role": "admin"}, "test_secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/protected", headers=headers).status_code == 200
+
+    app.config["JWT_SECRET"] = "rotated_secret"
+
+    assert client.get("/protected", headers=headers).status_code == 401
+
+
+def test_token_cache_evicts_least_recently_used():
+    """
+    Test case for a full token cache; expects the least recently used token to be evicted.
+
+    :return: None
+    """
+    cache = TokenCache(max_size=2)
+    first, second, third = (TokenCache.key(token) for token in ("a", "b", "c"))
+    cache.set(first, {"role": "admin"})
+    cache.set(second, {"role": "user"})
+    cache.get(first)
+    cache.set(third, {"role": "user"})
+
+    assert cache.get(second) is None
+    assert cache.get(first) == {"role": "admin"}
+    assert cache.stats()['evictions'] == 1
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_asymmetric_token(algorithm):
+    """
+    Test case for tokens signed with a private key and verified with only the public key of the signer.
+
+    :param algorithm: The public-key algorithm the token is signed with.
+    :return: None
+    """
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    public_key = private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                       serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+
+    app = Flask(__name__)
+    app.config.update({"JWT_AUTHTYPE": algorithm, "JWT_PUBLIC_KEY": public_key, "JWT_PREFIX": "Bearer"})
+
+    @app.route('/protected')
+    @authorize(['admin'])
+    def protected_route():
+        return jsonify({"message": "Access granted"})
+
+    client = app.test_client()
+    token = jwt.encode({"role": "admin"}, private_key, algorithm=algorithm)
+    forged = jwt.encode({"role": "admin"}, "guessed_secret", algorithm="HS256")
+
+    assert client.get("/protected", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    assert client.get("/protected", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
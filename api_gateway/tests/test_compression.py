@@ -0,0 +1,107 @@
+import gzip
+import json
+import pytest
+import httpx
+from flask import Flask, jsonify
+from proxy.compression import init_compression
+from proxy.upstream import Upstream
+
+LISTING = json.dumps({"items": [{"id_": number, "city": "Warsaw"} for number in range(200)]}).encode()
+
+
+@pytest.fixture
+def app() -> Flask:
+    """
+    Fixture to create an application compressing its responses, with a route proxied to a stub upstream
+    and a route answered by the gateway itself.
+
+    :return: A Flask application instance.
+    """
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/encoded':
+            return httpx.Response(200, content=iter([gzip.compress(LISTING)]),
+                                  headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        if request.url.path == '/small':
+            return httpx.Response(200, content=iter([b'{"id_": 1}']),
+                                  headers={"Content-Type": "application/json", "Content-Length": "10"})
+        return httpx.Response(200, content=iter([LISTING[:1000], LISTING[1000:]]),
+                              headers={"Content-Type": "application/json"})
+
+    upstream = Upstream('parcel_lockers', 'http://parcel_lockers-webapp:8100', httpx.MockTransport(handle))
+
+    app = Flask(__name__)
+
+    @app.route('/proxied/<path:path>')
+    def proxied(path: str):
+        return upstream.forward(f'/{path}')
+
+    @app.route('/local')
+    def local():
+        return jsonify({"items": [{"id_": number} for number in range(200)]})
+
+    init_compression(app)
+    return app
+
+
+def test_streamed_response_is_gzipped(client):
+    """
+    Test that a streamed upstream response of unknown length is compressed while it is streamed.
+    """
+    response = client.get('/proxied/parcel_lockers', headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == LISTING
+
+
+def test_buffered_response_is_gzipped(client):
+    """
+    Test that a response built by the gateway is compressed as a whole.
+    """
+    response = client.get('/local', headers={"Accept-Encoding": "deflate, gzip;q=0.8"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["items"][199] == {"id_": 199}
+
+
+def test_brotli_is_preferred(client):
+    """
+    Test that brotli is chosen over gzip when the client accepts both and brotli is installed.
+    """
+    brotli = pytest.importorskip('brotli')
+
+    response = client.get('/proxied/parcel_lockers', headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == LISTING
+
+
+def test_small_response_is_not_compressed(client):
+    """
+    Test that a response below the size threshold is sent as it is.
+    """
+    response = client.get('/proxied/small', headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b'{"id_": 1}'
+
+
+def test_encoded_upstream_response_is_passed_through(client):
+    """
+    Test that a body the upstream has already compressed is not compressed again.
+    """
+    response = client.get('/proxied/encoded', headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == LISTING
+
+
+def test_client_without_accept_encoding(client):
+    """
+    Test that a client that accepts no compression gets the identity body.
+    """
+    response = client.get('/proxied/parcel_lockers')
+
+    assert "Content-Encoding" not in response.headers
+    assert response.data == LISTING
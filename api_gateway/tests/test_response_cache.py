@@ -0,0 +1,206 @@
+import pytest
+import httpx
+import jwt
+from flask import Flask, Blueprint
+from unittest.mock import patch
+from proxy.router import ProxyRoute, register_routes
+from proxy.response_cache import ResponseCache, CachedResponse, get_response_cache
+from proxy.upstream import Upstream, upstreams
+
+BODY = b'{"id_": 1, "city": "Warsaw"}'
+
+
+class StubLockers:
+    """
+    Answers the requests forwarded to the parcel lockers service with a configured Cache-Control header.
+    """
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.cache_control: str | None = 'max-age=60, public'
+        self.etag: str | None = '"v1"'
+        self.sized = True
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Records a forwarded request and returns the same body, with the configured headers.
+
+        :param request: The request sent by the gateway.
+        :return: The response of the stub.
+        """
+        self.requests.append(request)
+        headers = {"Content-Type": "application/json"}
+        if self.sized:
+            headers["Content-Length"] = str(len(BODY))
+        if self.cache_control is not None:
+            headers["Cache-Control"] = self.cache_control
+        if self.etag is not None:
+            headers["ETag"] = self.etag
+        return httpx.Response(200, content=iter([BODY[:10], BODY[10:]]), headers=headers)
+
+
+@pytest.fixture
+def lockers() -> StubLockers:
+    """
+    Fixture to create the stub of the parcel lockers service.
+
+    :return: The stub.
+    """
+    return StubLockers()
+
+
+@pytest.fixture
+def app(lockers):
+    """
+    Fixture to create an application proxying a cached route and a route that is not cached, both allowed
+    to admins and users, to the stub.
+
+    :param lockers: The stub of the parcel lockers service.
+    :return: A Flask application instance.
+    """
+    blueprint = Blueprint('parcel_lockers', __name__, url_prefix='/parcel_lockers')
+    register_routes(blueprint, [
+        ProxyRoute('get_availability', '/<int:parcel_locker_id>/availability', ('GET',), 'parcel_lockers',
+                   frozenset({'admin', 'user'}), cached=True),
+        ProxyRoute('get_lockers', '/<int:parcel_locker_id>/lockers', ('GET',), 'parcel_lockers',
+                   frozenset({'admin', 'user'}))
+    ])
+
+    upstream = Upstream('parcel_lockers', 'http://parcel_lockers-webapp:8100', httpx.MockTransport(lockers.handle))
+    with patch.dict(upstreams, {'parcel_lockers': upstream}):
+        app = Flask(__name__)
+        app.config.update({"JWT_SECRET": "test_secret", "JWT_AUTHTYPE": "HS256", "JWT_PREFIX": "Bearer"})
+        app.register_blueprint(blueprint)
+    return app
+
+
+def auth(role: str) -> dict[str, str]:
+    """
+    Builds the Authorization header of a user with a role.
+
+    :param role: The role of the user.
+    :return: The headers of the request.
+    """
+    return {"Authorization": f"Bearer {jwt.encode({'role': role}, 'test_secret', algorithm='HS256')}"}
+
+
+def test_second_request_is_served_from_cache(client, lockers):
+    """
+    Test that a cacheable response is stored and served again without reaching the upstream.
+    """
+    first = client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    second = client.get('/parcel_lockers/1/availability', headers=auth('user'))
+
+    assert first.status_code == second.status_code == 200
+    assert second.data == BODY
+    assert second.headers["ETag"] == '"v1"'
+    assert "Age" in second.headers
+    assert len(lockers.requests) == 1
+
+
+def test_cache_is_keyed_by_role(client, lockers):
+    """
+    Test that users with different roles never share a stored response.
+    """
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    client.get('/parcel_lockers/1/availability', headers=auth('admin'))
+    client.get('/parcel_lockers/1/availability', headers=auth('admin'))
+
+    assert len(lockers.requests) == 2
+
+
+def test_if_none_match_returns_not_modified(client, lockers):
+    """
+    Test that a client revalidating a stored response with its ETag gets 304 Not Modified from the gateway.
+    """
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    response = client.get('/parcel_lockers/1/availability', headers={**auth('user'), "If-None-Match": '"v1"'})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers["ETag"] == '"v1"'
+    assert len(lockers.requests) == 1
+
+
+@pytest.mark.parametrize('cache_control', ['no-store', 'private, max-age=60', 'no-cache', 'public', 'max-age=0'])
+def test_uncacheable_response_is_not_stored(client, lockers, cache_control):
+    """
+    Test that responses the upstream does not allow shared caches to store are always forwarded.
+    """
+    lockers.cache_control = cache_control
+
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+
+    assert len(lockers.requests) == 2
+
+
+def test_route_not_cached_is_not_stored(client, lockers):
+    """
+    Test that the responses of a route that is not cached are always forwarded, revalidation included.
+    """
+    client.get('/parcel_lockers/1/lockers', headers=auth('user'))
+    response = client.get('/parcel_lockers/1/lockers', headers={**auth('user'), "If-None-Match": '"v1"'})
+
+    assert response.status_code == 200
+    assert len(lockers.requests) == 2
+    assert lockers.requests[-1].headers["If-None-Match"] == '"v1"'
+    assert get_response_cache(client.application).stats()['size'] == 0
+
+
+def test_streamed_response_is_stored_with_derived_etag(client, lockers):
+    """
+    Test that a streamed response without Content-Length and ETag is stored for its max-age, with an ETag derived
+    from its body that clients can revalidate with.
+    """
+    lockers.etag = None
+    lockers.sized = False
+
+    first = client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    revalidated = client.get('/parcel_lockers/1/availability',
+                             headers={**auth('user'), "If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert first.data == BODY
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+    assert len(lockers.requests) == 1
+
+
+def test_large_streamed_response_is_forwarded_whole(client, lockers):
+    """
+    Test that a streamed response too large to be stored is sent to the client whole.
+    """
+    lockers.sized = False
+    get_response_cache(client.application).max_body = 10
+
+    response = client.get('/parcel_lockers/1/availability', headers=auth('user'))
+
+    assert response.data == BODY
+    assert get_response_cache(client.application).stats()['size'] == 0
+
+
+def test_request_no_cache_bypasses_cache(client, lockers):
+    """
+    Test that a request with Cache-Control: no-cache reaches the upstream and refreshes the stored response.
+    """
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+    client.get('/parcel_lockers/1/availability', headers={**auth('user'), "Cache-Control": "no-cache"})
+    client.get('/parcel_lockers/1/availability', headers=auth('user'))
+
+    assert len(lockers.requests) == 2
+    assert get_response_cache(client.application).stats()['hits'] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Test that the cache evicts the least recently used responses when the stored bodies exceed its size.
+    """
+    cache = ResponseCache(max_bytes=2 * len(BODY))
+    for client_id in (1, 2, 3):
+        cache.set(('parcel_lockers', f'/clients/{client_id}', b'', 'user'), CachedResponse(200, [], BODY, None, 60))
+
+    assert cache.get(('parcel_lockers', '/clients/1', b'', 'user')) is None
+    assert cache.get(('parcel_lockers', '/clients/3', b'', 'user')) is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 2 * len(BODY)
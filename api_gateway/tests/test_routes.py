@@ -1,29 +1,38 @@
 import pytest
-from unittest.mock import MagicMock
+from typing import Iterator
+from unittest.mock import patch
 from flask import Flask, current_app
 from flask.testing import FlaskClient
 from routes.users import users_blueprint
-from routes.parcel_locker import clients_blueprint, packages_blueprint, parcel_lockers_blueprint
+from routes.parcel_locker import (
+    clients_blueprint,
+    packages_blueprint,
+    package_batches_blueprint,
+    parcel_lockers_blueprint,
+)
 from security.authorize import authorize
+from proxy.upstream import Upstream, upstreams
 from main import create_app
 import httpx
 import jwt
 
 
 @pytest.fixture
-def app():
+def app(upstream):
     """
     Fixture to create and return a Flask application instance with registered blueprints.
 
     This fixture sets up a Flask app and registers the blueprints for users, clients, packages,
-    and parcel lockers to be used in the tests.
+    and parcel lockers to be used in the tests. The routes are compiled against the stub upstreams.
 
+    :param upstream: The stub of the upstream services.
     :return: A Flask app instance with registered blueprints.
     """
     app = Flask(__name__)
     app.register_blueprint(users_blueprint)
     app.register_blueprint(clients_blueprint)
     app.register_blueprint(packages_blueprint)
+    app.register_blueprint(package_batches_blueprint)
     app.register_blueprint(parcel_lockers_blueprint)
     return app
 
@@ -42,6 +51,52 @@ def client(app: Flask) -> FlaskClient:
     return app.test_client()
 
 
+class StubUpstream:
+    """
+    Records the requests forwarded by the gateway and answers them with a configured response.
+    """
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.status_code = 200
+        self.content = b''
+        self.headers: dict[str, str] = {}
+        self.error: Exception | None = None
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Records a forwarded request and returns the configured response.
+
+        :param request: The request sent by the gateway.
+        :return: The configured response.
+        """
+        request.read()
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(self.status_code, content=iter([self.content]), headers=self.headers)
+
+
+@pytest.fixture
+def upstream() -> Iterator[StubUpstream]:
+    """
+    Fixture replacing the upstream services of the gateway with an in-memory stub.
+
+    The routes keep forwarding through `Upstream`, but its client sends the requests
+    to the stub through an `httpx.MockTransport` instead of the network. The upstreams
+    are replaced before the application is created, as routes resolve them when compiled.
+
+    :return: The stub answering the forwarded requests.
+    """
+    stub = StubUpstream()
+    transport = httpx.MockTransport(stub.handle)
+    with patch.dict(upstreams, {
+        'parcel_lockers': Upstream('parcel_lockers', 'http://parcel_lockers-webapp:8100', transport),
+        'users': Upstream('users', 'http://users-nginx:82', transport)
+    }):
+        yield stub
+
+
 @pytest.fixture
 def mock_jwt_token(mocker):
     """
@@ -84,7 +139,7 @@ def mock_jwt_token(mocker):
     return token
 
 
-def test_proxy_users(client, mocker):
+def test_proxy_users(client, upstream):
     """
     Test case for proxying a request to the users route.
 
@@ -92,15 +147,12 @@ def test_proxy_users(client, mocker):
     app returns the mocked response data and status code when accessing the `/users/some-path` route.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b"Mocked Response"
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b"Mocked Response"
+    upstream.headers = {"Content-Type": "application/json"}
 
     response = client.get('/users/some-path')
 
@@ -109,7 +161,7 @@ def test_proxy_users(client, mocker):
     assert response.headers["Content-Type"] == "application/json"
 
 
-def test_proxy_clients_get(client, mocker, mock_jwt_token):
+def test_proxy_clients_get(client, upstream, mock_jwt_token):
     """
     Test case for proxying a GET request to the clients route with a valid JWT token.
 
@@ -118,16 +170,13 @@ def test_proxy_clients_get(client, mocker, mock_jwt_token):
     with a valid JWT token.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :param mock_jwt_token: The mocked JWT token for authorization.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b'{"client_id": 1, "name": "Test Client"}'
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b'{"client_id": 1, "name": "Test Client"}'
+    upstream.headers = {"Content-Type": "application/json"}
 
     response = client.get('/clients/1', headers={"Authorization": f"Bearer {mock_jwt_token}"})
 
@@ -136,7 +185,7 @@ def test_proxy_clients_get(client, mocker, mock_jwt_token):
     assert response.headers["Content-Type"] == "application/json"
 
 
-def test_proxy_packages_post_success(client, mocker, mock_jwt_token):
+def test_proxy_packages_post_success(client, upstream, mock_jwt_token):
     """
     Test case for proxying a POST request to the packages route with a valid JWT token.
 
@@ -145,16 +194,13 @@ def test_proxy_packages_post_success(client, mocker, mock_jwt_token):
     with a valid JWT token.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :param mock_jwt_token: The mocked JWT token for authorization.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b'{"message": "success"}'
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b'{"message": "success"}'
+    upstream.headers = {"Content-Type": "application/json"}
 
     response = client.post('/packages', data='{"key": "value"}', headers={"Authorization": f"Bearer {mock_jwt_token}"})
 
@@ -163,7 +209,27 @@ def test_proxy_packages_post_success(client, mocker, mock_jwt_token):
     assert response.headers["Content-Type"] == "application/json"
 
 
-def test_proxy_packages_put_success(client, mocker, mock_jwt_token):
+def test_proxy_packages_batch_post(client, upstream, mock_jwt_token):
+    """
+    Test case for proxying a manifest of packages to the `/packages:batch` route with a valid JWT token.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.content = b'{"results": [{"package": 1}]}'
+    upstream.headers = {"Content-Type": "application/json"}
+
+    response = client.post('/packages:batch', data='{"packages": []}',
+                           headers={"Authorization": f"Bearer {mock_jwt_token}"})
+
+    assert response.status_code == 200
+    assert response.data == b'{"results": [{"package": 1}]}'
+    assert upstream.requests[0].url.path == '/packages:batch'
+
+
+def test_proxy_packages_put_success(client, upstream, mock_jwt_token):
     """
     Test case for proxying a PUT request to the packages route with a valid JWT token.
 
@@ -172,16 +238,13 @@ def test_proxy_packages_put_success(client, mocker, mock_jwt_token):
     with a valid JWT token.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :param mock_jwt_token: The mocked JWT token for authorization.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b'{"message": "success"}'
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b'{"message": "success"}'
+    upstream.headers = {"Content-Type": "application/json"}
 
     package_id = 123
     data = '{"name": "Updated Package", "status": "Delivered"}'
@@ -193,7 +256,7 @@ def test_proxy_packages_put_success(client, mocker, mock_jwt_token):
     assert response.headers["Content-Type"] == "application/json"
 
 
-def test_proxy_add_parcel_locker(client, mocker, mock_jwt_token):
+def test_proxy_add_parcel_locker(client, upstream, mock_jwt_token):
     """
     Test case for proxying a POST request to add a parcel locker with a valid JWT token.
 
@@ -202,16 +265,13 @@ def test_proxy_add_parcel_locker(client, mocker, mock_jwt_token):
     route with a valid JWT token.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :param mock_jwt_token: The mocked JWT token for authorization.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b'{"message": "Parcel locker added successfully"}'
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b'{"message": "Parcel locker added successfully"}'
+    upstream.headers = {"Content-Type": "application/json"}
 
     parcel_locker_data = '{"location": "Test Location", "name": "Parcel Locker 1"}'
 
@@ -222,7 +282,7 @@ def test_proxy_add_parcel_locker(client, mocker, mock_jwt_token):
     assert response.headers["Content-Type"] == "application/json"
 
 
-def test_proxy_add_locker(client, mocker, mock_jwt_token):
+def test_proxy_add_locker(client, upstream, mock_jwt_token):
     """
     Test case for proxying a POST request to add a locker with a valid JWT token.
 
@@ -231,16 +291,13 @@ def test_proxy_add_locker(client, mocker, mock_jwt_token):
     route with a valid JWT token.
 
     :param client: The Flask test client.
-    :param mocker: The mocking object used to mock the external request.
+    :param upstream: The stub of the upstream service.
     :param mock_jwt_token: The mocked JWT token for authorization.
     :return: None
     """
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.content = b'{"message": "Locker added successfully"}'
-    mock_response.headers = {"Content-Type": "application/json"}
-
-    mocker.patch.object(httpx, 'request', return_value=mock_response)
+    upstream.status_code = 200
+    upstream.content = b'{"message": "Locker added successfully"}'
+    upstream.headers = {"Content-Type": "application/json"}
 
     locker_data = '{"location": "Test Location", "name": "Locker 1"}'
 
@@ -249,3 +306,170 @@ def test_proxy_add_locker(client, mocker, mock_jwt_token):
     assert response.status_code == 200
     assert response.data == b'{"message": "Locker added successfully"}'
     assert response.headers["Content-Type"] == "application/json"
+
+
+def test_proxy_packages_list(client, upstream, mock_jwt_token):
+    """
+    Test case for proxying a GET request listing packages with a valid JWT token.
+
+    This test mocks the response from an external service and ensures that the pagination
+    cursor and the filters of the `/packages` route are forwarded as query parameters.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.status_code = 200
+    upstream.content = b'{"items": [], "next_cursor": null}'
+    upstream.headers = {"Content-Type": "application/json"}
+
+    response = client.get('/packages?after=10&limit=5&status=Sent',
+                          headers={"Authorization": f"Bearer {mock_jwt_token}"})
+
+    assert response.status_code == 200
+    assert response.data == b'{"items": [], "next_cursor": null}'
+    assert upstream.requests[-1].url.copy_with(query=None) == "http://parcel_lockers-webapp:8100/packages"
+    assert upstream.requests[-1].url.params.multi_items() == [('after', '10'), ('limit', '5'), ('status', 'Sent')]
+
+
+def test_proxy_parcel_lockers_list(client, upstream, mock_jwt_token):
+    """
+    Test case for proxying a GET request listing parcel lockers with a valid JWT token.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.status_code = 200
+    upstream.content = b'{"items": [], "next_cursor": null}'
+    upstream.headers = {"Content-Type": "application/json"}
+
+    response = client.get('/parcel_lockers?city=Warsaw', headers={"Authorization": f"Bearer {mock_jwt_token}"})
+
+    assert response.status_code == 200
+    assert upstream.requests[-1].url.params.multi_items() == [('city', 'Warsaw')]
+
+
+def test_proxy_lockers_list(client, upstream, mock_jwt_token):
+    """
+    Test case for proxying a GET request listing the lockers of a parcel locker with a valid JWT token.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.status_code = 200
+    upstream.content = b'{"items": [], "next_cursor": null}'
+    upstream.headers = {"Content-Type": "application/json"}
+
+    response = client.get('/parcel_lockers/3/lockers?size=M', headers={"Authorization": f"Bearer {mock_jwt_token}"})
+
+    assert response.status_code == 200
+    assert upstream.requests[-1].url.copy_with(query=None) == "http://parcel_lockers-webapp:8100/parcel_lockers/3/lockers"
+    assert upstream.requests[-1].url.params.multi_items() == [('size', 'M')]
+
+
+def test_proxy_availability_get(client, upstream, mock_jwt_token):
+    """
+    Test case for proxying a GET request for the free lockers of a parcel locker with a valid JWT token.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.status_code = 200
+    upstream.content = b'{"parcel_locker_id": 3, "availability": {"S": 1, "M": 0, "L": 2}}'
+    upstream.headers = {"Content-Type": "application/json", "Cache-Control": "max-age=5, public", "ETag": '"a1"'}
+
+    response = client.get('/parcel_lockers/3/availability', headers={"Authorization": f"Bearer {mock_jwt_token}"})
+
+    assert response.status_code == 200
+    assert response.data == upstream.content
+    assert response.headers["ETag"] == '"a1"'
+    assert upstream.requests[-1].url == "http://parcel_lockers-webapp:8100/parcel_lockers/3/availability"
+
+
+def test_proxy_forwards_body_and_filters_hop_by_hop_headers(client, upstream, mock_jwt_token):
+    """
+    Test case for forwarding the body of a request and dropping the headers that belong to a single connection.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mock_jwt_token: The mocked JWT token for authorization.
+    :return: None
+    """
+    upstream.status_code = 201
+    upstream.content = b'{"new_parcel_locker_id": 1}'
+    upstream.headers = {"Content-Type": "application/json", "Keep-Alive": "timeout=5", "X-Request-Id": "abc"}
+
+    response = client.post('/parcel_lockers/parcel_locker', data='{"city": "Warsaw"}',
+                            headers={"Authorization": f"Bearer {mock_jwt_token}", "Connection": "X-Debug",
+                                     "X-Debug": "1", "Content-Type": "application/json"})
+
+    forwarded = upstream.requests[-1]
+    assert response.status_code == 201
+    assert response.headers["X-Request-Id"] == "abc"
+    assert "Keep-Alive" not in response.headers
+    assert forwarded.method == "POST"
+    assert forwarded.content == b'{"city": "Warsaw"}'
+    assert forwarded.headers["Content-Type"] == "application/json"
+    assert forwarded.headers["Authorization"] == f"Bearer {mock_jwt_token}"
+    assert "X-Debug" not in forwarded.headers
+    assert forwarded.headers["Host"] == "parcel_lockers-webapp:8100"
+
+
+def test_proxy_upstream_unavailable(client, upstream):
+    """
+    Test case for an upstream service that cannot be reached; expects 502 Bad Gateway.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :return: None
+    """
+    upstream.error = httpx.ConnectError('Connection refused')
+
+    response = client.post('/users/login', json={"username": "user"})
+
+    assert response.status_code == 502
+    assert response.json == {"message": "The users service is unavailable"}
+
+
+def test_proxy_upstream_timeout(client, upstream):
+    """
+    Test case for an upstream service that does not answer in time; expects 504 Gateway Timeout.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :return: None
+    """
+    upstream.error = httpx.ReadTimeout('Timed out')
+
+    response = client.get('/users/some-path')
+
+    assert response.status_code == 504
+    assert response.json == {"message": "The users service did not respond in time"}
+
+
+def test_route_table_enforces_roles(client, upstream, mocker):
+    """
+    Test case for a route of the table restricted to admins, requested with a token of a user.
+
+    :param client: The Flask test client.
+    :param upstream: The stub of the upstream service.
+    :param mocker: The mocking object used to patch the app's configuration.
+    :return: None
+    """
+    mocker.patch.dict(current_app.config, {"JWT_SECRET": "test_secret", "JWT_AUTHTYPE": "HS256",
+                                           "JWT_PREFIX": "Bearer"})
+    token = jwt.encode({"role": "user"}, "test_secret", algorithm="HS256")
+
+    denied = client.get('/packages', headers={"Authorization": f"Bearer {token}"})
+    unauthorized = client.get('/packages')
+
+    assert denied.status_code == 403
+    assert unauthorized.status_code == 401
+    assert upstream.requests == []
@@ -0,0 +1,133 @@
+import pytest
+from flask import Flask
+from proxy.upstream import Upstream
+import httpx
+
+
+@pytest.fixture
+def app() -> Flask:
+    """
+    Fixture to create a bare Flask application, providing the request context `Upstream.forward` works in.
+
+    :return: A Flask application instance.
+    """
+    return Flask(__name__)
+
+
+class StubServers:
+    """
+    Answers the requests sent to several servers of one upstream, some of which may be down.
+    """
+
+    def __init__(self):
+        self.hosts: list[str] = []
+        self.down: set[str] = set()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Records the host of a request and answers it, or refuses the connection if the host is down.
+
+        :param request: The request sent by the upstream.
+        :return: A response naming the host that served the request.
+        """
+        if request.url.host in self.down:
+            raise httpx.ConnectError('Connection refused', request=request)
+        self.hosts.append(request.url.host)
+        return httpx.Response(200, content=iter([request.url.host.encode()]))
+
+
+@pytest.fixture
+def servers(monkeypatch) -> StubServers:
+    """
+    Fixture configuring the parcel_lockers upstream with three servers and disabling background health checks.
+
+    :param monkeypatch: The fixture used to set the environment variables.
+    :return: The stub of the servers.
+    """
+    monkeypatch.setenv('PARCEL_LOCKERS_URL', 'http://first:8100,http://second:8100,http://third:8100')
+    monkeypatch.setenv('UPSTREAM_HEALTH_INTERVAL', '0')
+    return StubServers()
+
+
+def forward(app: Flask, upstream: Upstream, path: str = '/clients/1') -> tuple[int, bytes]:
+    """
+    Forwards a GET request through an upstream.
+
+    :param app: The Flask application instance.
+    :param upstream: The upstream to forward the request through.
+    :param path: The path of the request.
+    :return: The status code and the body of the response.
+    """
+    with app.test_request_context(path):
+        response = upstream.forward(path)
+        return response.status_code, response.get_data()
+
+
+def test_round_robin(app, servers):
+    """
+    Test that consecutive requests are spread evenly over the servers of an upstream.
+    """
+    upstream = Upstream('parcel_lockers', 'http://unused:8100', httpx.MockTransport(servers.handle))
+
+    for _ in range(6):
+        forward(app, upstream)
+
+    assert sorted(servers.hosts) == ['first', 'first', 'second', 'second', 'third', 'third']
+    assert servers.hosts[:3] == ['first', 'second', 'third']
+
+
+def test_failover_takes_server_out_of_rotation(app, servers):
+    """
+    Test that a request to an unreachable server is sent to the next one and the server is skipped afterwards.
+    """
+    upstream = Upstream('parcel_lockers', 'http://unused:8100', httpx.MockTransport(servers.handle))
+    servers.down.add('first')
+
+    results = [forward(app, upstream) for _ in range(4)]
+
+    assert [status for status, _ in results] == [200] * 4
+    assert 'first' not in servers.hosts
+    assert [server.available for server in upstream.servers] == [False, True, True]
+
+
+def test_all_servers_down(app, servers):
+    """
+    Test that an upstream whose servers are all unreachable answers with 502 Bad Gateway.
+    """
+    upstream = Upstream('parcel_lockers', 'http://unused:8100', httpx.MockTransport(servers.handle))
+    servers.down.update({'first', 'second', 'third'})
+
+    status, body = forward(app, upstream)
+
+    assert status == 502
+    assert b'The parcel_lockers service is unavailable' in body
+
+
+def test_health_check_restores_server(app, servers):
+    """
+    Test that the active health check takes a failing server out of rotation and puts it back once it recovers.
+    """
+    upstream = Upstream('parcel_lockers', 'http://unused:8100', httpx.MockTransport(servers.handle),
+                        health_path='/health')
+    servers.down.add('second')
+
+    upstream.check_health()
+    assert [server.available for server in upstream.servers] == [True, False, True]
+
+    servers.down.clear()
+    upstream.check_health()
+    assert all(server.available for server in upstream.servers)
+
+
+def test_empty_server_list_is_rejected(app, servers, monkeypatch):
+    """
+    Test that an upstream without servers is rejected with a ValueError, whether it comes from the default URL
+    or from the environment.
+    """
+    with pytest.raises(ValueError, match='at least one server URL'):
+        Upstream('parcel_lockers', ' , ')
+
+    monkeypatch.setenv('PARCEL_LOCKERS_URL', '  ')
+    upstream = Upstream('parcel_lockers', 'http://unused:8100', httpx.MockTransport(servers.handle))
+    with pytest.raises(ValueError, match='PARCEL_LOCKERS_URL'):
+        forward(app, upstream)
@@ -0,0 +1,17 @@
+from quart import Response, request
+from app.routes.caching import set_validators, not_modified
+
+
+async def conditional(response: Response, max_age: int, private: bool = False) -> Response:
+    """
+    Makes a JSON response conditional: answered with 304 Not Modified if the client's If-None-Match header
+    matches its ETag. The asyncio counterpart of `app.routes.caching.conditional`.
+
+    :param response: The full response, with status 200.
+    :param max_age: The number of seconds the response is fresh.
+    :param private: True if the response depends on the caller and must not be stored by shared caches.
+    :return: The response with validators, or a 304 response.
+    """
+    if set_validators(response, await response.get_data(), max_age, request.if_none_match, private):
+        return not_modified(response)
+    return response
@@ -0,0 +1,145 @@
+from quart import jsonify, request, Response, make_response, Blueprint
+from app.src.async_configuration import async_container
+from app.routes.async_listing import stream_page
+from app.routes.async_validation import validate
+from app.routes.async_caching import conditional
+from app.routes.caching import CLIENT_MAX_AGE
+from app.routes.customers import (
+    PackageRequestModel,
+    PackageBatchRequestModel,
+    PackageListQueryModel,
+    PackageSize,
+    MAX_IDEMPOTENCY_KEY_LENGTH,
+)
+from app.src.service import IdempotencyKeyReused
+
+clients_blueprint = Blueprint('clients', __name__, url_prefix='/clients')
+packages_blueprint = Blueprint('packages', __name__, url_prefix='/packages')
+package_batches_blueprint = Blueprint('package_batches', __name__, url_prefix='/packages:batch')
+
+
+@clients_blueprint.route('/<int:client_id>')
+async def get_clients_location_route(client_id: int) -> Response:
+    """
+    Route to get the location of a client by their ID.
+
+    :param client_id: The ID of the client whose location is being requested.
+    :return: A JSON response with the location of the client or an error message.
+    """
+    try:
+        service = async_container.service
+        client = await service.client_repo.find_by_id(client_id)
+
+        if not client:
+            return await make_response(jsonify({'message': f'Client {client_id} not found'}), 404)
+
+        response = await make_response(jsonify({'location': (client.latitude, client.longitude)}), 200)
+        return await conditional(response, CLIENT_MAX_AGE, private=True)
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@packages_blueprint.route('', methods=['GET'])
+@validate()
+async def list_packages_route(query: PackageListQueryModel) -> Response:
+    """
+    Route to list packages page by page, using the ID of the last package of a page as the cursor of the next one.
+
+    :param query: The query string containing the cursor, the page size and optional filters.
+    :return: A streamed JSON response with the packages and the next cursor, or an error message.
+    """
+    try:
+        service = async_container.service
+        packages = service.iter_packages(query.after, query.limit + 1, query.status, query.size, query.receiver_id,
+                                         query.created_from, query.created_to)
+        return await stream_page(packages, query.limit)
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@packages_blueprint.route('', methods=['POST'])
+@validate()
+async def send_package_route(body: PackageRequestModel) -> Response:
+    """
+    Route to send a package from a sender to a receiver, at most once per Idempotency-Key header.
+
+    :param body: The request body containing sender_id, receiver_id, max_distance, and size.
+    :return: A JSON response with the package details or an error message.
+    """
+    try:
+        if body.size not in PackageSize:
+            return await make_response(jsonify({'message': f'The size must be S, M or L'}), 400)
+        size = PackageSize(body.size)
+
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+            return await make_response(jsonify({'message': f'The idempotency key must have 1 to '
+                                                           f'{MAX_IDEMPOTENCY_KEY_LENGTH} characters'}), 400)
+
+        service = async_container.service
+        if idempotency_key is None:
+            package = await service.send_package(body.sender_id, body.receiver_id, body.max_distance, size)
+            return await make_response(jsonify({'package': package}), 201)
+
+        package, replayed = await service.send_package_once(idempotency_key, body.sender_id, body.receiver_id,
+                                                            body.max_distance, size)
+        response = await make_response(jsonify({'package': package}), 201)
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    except IdempotencyKeyReused as e:
+        return await make_response(jsonify({'message': str(e)}), 422)
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@package_batches_blueprint.route('', methods=['POST'])
+@validate()
+async def send_packages_batch_route(body: PackageBatchRequestModel) -> Response:
+    """
+    Route to send many packages in one request, e.g. the manifest of a courier.
+
+    :param body: The request body containing the packages, each with sender_id, receiver_id, max_distance, and size.
+    :return: A JSON response with the result of every package or an error message.
+    """
+    try:
+        for index, package in enumerate(body.packages):
+            if package.size not in PackageSize:
+                return await make_response(jsonify({'message': f'The size of package {index} must be S, M or L'}),
+                                           400)
+
+        service = async_container.service
+        sent = await service.send_packages([(package.sender_id, package.receiver_id, package.max_distance,
+                                             package.size) for package in body.packages])
+
+        results = [{'package': package_id} if error is None else {'error': error} for package_id, error in sent]
+        return await make_response(jsonify({'results': results}), 200)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@packages_blueprint.route('/<int:package_id>', methods=['PUT'])
+async def receive_package_route(package_id: int) -> Response:
+    """
+    Route to mark a package as received.
+
+    :param package_id: The ID of the package to be received.
+    :return: A JSON response with the package details or an error message.
+    """
+    try:
+        service = async_container.service
+        package = await service.package_repo.find_by_id(package_id)
+
+        if package is None:
+            return await make_response(jsonify({'message': 'The package is not found'}), 404)
+
+        if package.status == 'Received':
+            return await make_response(jsonify({'message': 'The package was received'}), 409)
+
+        await service.receive_package(package_id)
+
+        return await make_response(jsonify({'package': package}), 200)
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
@@ -0,0 +1,16 @@
+from quart import Blueprint, jsonify, Response, make_response
+from app.src.async_configuration import async_container
+
+health_blueprint = Blueprint('health', __name__, url_prefix='/health')
+
+
+@health_blueprint.route('', methods=['GET'])
+async def health_route() -> Response:
+    """
+    Route to report the health of the service and the statistics of its connection pool.
+
+    :return: A JSON response with the pool statistics, with status 503 if the database is unreachable.
+    """
+    stats = await async_container.stats()
+    status_code = 503 if stats['database']['status'] == 'down' else 200
+    return await make_response(jsonify(stats), status_code)
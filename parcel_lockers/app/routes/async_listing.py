@@ -0,0 +1,42 @@
+from quart import Response, current_app
+from quart.helpers import stream_with_context
+from app.src.entity import Entity
+from typing import AsyncGenerator
+
+
+async def stream_page(items: AsyncGenerator[Entity, None], limit: int) -> Response:
+    """
+    Streams a keyset-paginated page as JSON, one item at a time.
+
+    The asyncio counterpart of `app.routes.listing.stream_page`, producing the same document
+    from an asynchronous generator of entities.
+
+    :param items: The entities of the page, followed by the first entity of the next page if there is one.
+    :param limit: The maximum number of items on the page.
+    :return: A streamed JSON response.
+    """
+    first = await anext(items, None)
+
+    @stream_with_context
+    async def generate() -> AsyncGenerator[str, None]:
+        """
+        Yields the JSON document of the page piece by piece.
+
+        :return: An asynchronous generator of JSON fragments.
+        """
+        last_id, count, has_more = None, 0, False
+        yield '{"items": ['
+        try:
+            item = first
+            while item is not None:
+                if count == limit:
+                    has_more = True
+                    break
+                yield (', ' if count else '') + current_app.json.dumps(item)
+                last_id, count = item.id_, count + 1
+                item = await anext(items, None)
+        finally:
+            await items.aclose()
+        yield f'], "next_cursor": {current_app.json.dumps(last_id if has_more else None)}}}'
+
+    return Response(generate(), 200, mimetype='application/json')
@@ -0,0 +1,151 @@
+from quart import Blueprint, jsonify, Response, make_response
+from app.src.async_configuration import async_container
+from app.routes.async_listing import stream_page
+from app.routes.async_validation import validate
+from app.routes.async_caching import conditional
+from app.routes.caching import AVAILABILITY_MAX_AGE
+from app.routes.management import (
+    AddParcelLockerRequestModel,
+    AddLockerRequestModel,
+    NearestBatchRequestModel,
+    ParcelLockerListQueryModel,
+    LockerListQueryModel,
+)
+
+parcel_lockers_blueprint = Blueprint('parcel_lockers', __name__, url_prefix='/parcel_lockers')
+
+
+@parcel_lockers_blueprint.route('/parcel_locker', methods=['POST'])
+@validate()
+async def add_parcel_locker_route(body: AddParcelLockerRequestModel) -> Response:
+    """
+    Route to add a new parcel locker to the system.
+
+    :param body: The request body containing city, postal_code, latitude, and longitude for the new parcel locker.
+    :return: A JSON response with the new parcel locker ID or an error message.
+    """
+    try:
+        service = async_container.service
+        new_parcel_locker_id = await service.add_parcel_locker(
+            city=body.city,
+            postal_code=body.postal_code,
+            latitude=body.latitude,
+            longitude=body.longitude
+        )
+        return await make_response(jsonify({'new_parcel_locker_id': new_parcel_locker_id}), 201)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@parcel_lockers_blueprint.route('/locker', methods=['POST'])
+@validate()
+async def add_locker_route(body: AddLockerRequestModel) -> Response:
+    """
+    Route to add a new locker to an existing parcel locker.
+
+    :param body: The request body containing parcel_locker_id, package_id, client_id, size, and status.
+    :return: A JSON response with the new locker details or an error message.
+    """
+    try:
+        service = async_container.service
+        new_locker = await service.add_locker(
+            parcel_locker_id=body.parcel_locker_id,
+            package_id=body.package_id,
+            client_id=body.client_id,
+            size=body.size,
+            status=body.status
+        )
+        return await make_response(jsonify({'new_locker': new_locker}), 201)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@parcel_lockers_blueprint.route('/nearest:batch', methods=['POST'])
+@validate()
+async def find_nearest_parcel_lockers_batch_route(body: NearestBatchRequestModel) -> Response:
+    """
+    Route to find the nearest parcel lockers for many clients in one request.
+
+    :param body: The request body containing client_ids, k and an optional max_distance.
+    :return: A JSON response with the nearest parcel lockers of each client or an error message.
+    """
+    try:
+        service = async_container.service
+        nearest = await service.find_nearest_parcel_lockers_batch(body.client_ids, body.k, body.max_distance)
+
+        results = [
+            {'client_id': client_id, 'error': f'Client {client_id} not found'} if parcel_lockers is None else
+            {'client_id': client_id,
+             'parcel_lockers': [{'id': parcel_locker_id, 'city': city, 'distance': distance}
+                                for parcel_locker_id, city, distance in parcel_lockers]}
+            for client_id, parcel_lockers in nearest.items()
+        ]
+        return await make_response(jsonify({'results': results}), 200)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@parcel_lockers_blueprint.route('/<int:parcel_locker_id>/availability', methods=['GET'])
+async def get_availability_route(parcel_locker_id: int) -> Response:
+    """
+    Route to get the number of free lockers of each size in a parcel locker.
+
+    :param parcel_locker_id: The ID of the parcel locker.
+    :return: A JSON response with the number of free lockers by size or an error message.
+    """
+    try:
+        service = async_container.service
+        availability = await service.find_availability(parcel_locker_id)
+
+        if availability is None:
+            return await make_response(jsonify({'message': f'Parcel locker {parcel_locker_id} not found'}), 404)
+
+        response = await make_response(jsonify({'parcel_locker_id': parcel_locker_id,
+                                                 'availability': availability}), 200)
+        return await conditional(response, AVAILABILITY_MAX_AGE)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@parcel_lockers_blueprint.route('', methods=['GET'])
+@validate()
+async def list_parcel_lockers_route(query: ParcelLockerListQueryModel) -> Response:
+    """
+    Route to list parcel lockers page by page, using the ID of the last parcel locker of a page as the cursor.
+
+    :param query: The query string containing the cursor, the page size and an optional city.
+    :return: A streamed JSON response with the parcel lockers and the next cursor, or an error message.
+    """
+    try:
+        service = async_container.service
+        parcel_lockers = service.iter_parcel_lockers(query.after, query.limit + 1, query.city)
+        return await stream_page(parcel_lockers, query.limit)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@parcel_lockers_blueprint.route('/<int:parcel_locker_id>/lockers', methods=['GET'])
+@validate()
+async def list_lockers_route(parcel_locker_id: int, query: LockerListQueryModel) -> Response:
+    """
+    Route to list the lockers of a parcel locker page by page, using the ID of the last locker of a page as the cursor.
+
+    :param parcel_locker_id: The ID of the parcel locker.
+    :param query: The query string containing the cursor, the page size and optional filters.
+    :return: A streamed JSON response with the lockers and the next cursor, or an error message.
+    """
+    try:
+        service = async_container.service
+        if await service.parcel_locker_repo.find_by_id(parcel_locker_id) is None:
+            return await make_response(jsonify({'message': f'Parcel locker {parcel_locker_id} not found'}), 404)
+
+        lockers = service.iter_lockers(parcel_locker_id, query.after, query.limit + 1, query.status, query.size)
+        return await stream_page(lockers, query.limit)
+
+    except Exception as e:
+        return await make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
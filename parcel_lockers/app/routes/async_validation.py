@@ -0,0 +1,58 @@
+from quart import request, jsonify, make_response
+from pydantic import BaseModel, ValidationError
+from functools import wraps
+from typing import Callable, Any
+
+import json
+
+
+def validate() -> Callable:
+    """
+    Decorator validating the query string and the JSON body of a Quart route with pydantic models.
+
+    The asyncio counterpart of `flask_pydantic.validate`, with the same contract: the models are taken from
+    the annotations of the `query` and `body` parameters of the route, the validated models are passed as
+    these arguments, and invalid input is answered with status 400 and a `validation_error` object
+    listing the errors of the query parameters and of the body parameters.
+
+    :return: The decorator.
+    """
+    def decorate(func: Callable) -> Callable:
+        query_model: type[BaseModel] | None = func.__annotations__.get('query')
+        body_model: type[BaseModel] | None = func.__annotations__.get('body')
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            """
+            Wrapper function that validates the request before calling the route.
+
+            :param args: Positional arguments for the route.
+            :param kwargs: Keyword arguments for the route, i.e. its path parameters.
+            :return: The response of the route, or a validation error response.
+            """
+            errors = {}
+            if query_model is not None:
+                try:
+                    kwargs['query'] = query_model(**request.args.to_dict())
+                except ValidationError as e:
+                    errors['query_params'] = json.loads(e.json())
+
+            if body_model is not None:
+                if not request.is_json:
+                    content_type = request.headers.get('Content-Type', '')
+                    return await make_response(jsonify({
+                        'detail': f"Unsupported media type '{content_type}' in request. "
+                                  f"'application/json' is required."
+                    }), 415)
+                try:
+                    kwargs['body'] = body_model.model_validate(await request.get_json(force=True))
+                except ValidationError as e:
+                    errors['body_params'] = json.loads(e.json())
+
+            if errors:
+                return await make_response(jsonify({'validation_error': errors}), 400)
+            return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
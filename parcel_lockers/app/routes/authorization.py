@@ -0,0 +1,45 @@
+from jwt_auth.keys import read_key
+from jwt_auth.verifier import allowed_roles
+from typing import Any
+from os import getenv
+
+ADMIN = allowed_roles(['admin'])
+ADMIN_OR_USER = allowed_roles(['admin', 'user'])
+
+ENDPOINT_ROLES: dict[str, frozenset[str] | None] = {
+    'clients.get_clients_location_route': ADMIN_OR_USER,
+    'packages.list_packages_route': ADMIN,
+    'packages.send_package_route': ADMIN_OR_USER,
+    'packages.receive_package_route': ADMIN_OR_USER,
+    'package_batches.send_packages_batch_route': ADMIN_OR_USER,
+    'parcel_lockers.add_parcel_locker_route': ADMIN,
+    'parcel_lockers.add_locker_route': ADMIN,
+    'parcel_lockers.find_nearest_parcel_lockers_batch_route': ADMIN,
+    'parcel_lockers.get_availability_route': ADMIN_OR_USER,
+    'parcel_lockers.list_parcel_lockers_route': ADMIN,
+    'parcel_lockers.list_lockers_route': ADMIN,
+}
+
+
+def configure_authorization(config: Any) -> bool:
+    """
+    Reads the token verification settings from the environment into the configuration of the application.
+
+    By default the service trusts its callers and leaves authorization to the API gateway. With JWT_VERIFY=true
+    it verifies the access tokens itself, with the same roles as the gateway, so internal callers can reach it
+    directly. Tokens are verified with JWT_SECRET for HMAC algorithms, or with the public key of the users
+    service, JWT_PUBLIC_KEY or JWT_PUBLIC_KEY_FILE, for asymmetric ones (JWT_AUTHTYPE=RS256, EdDSA, ...).
+
+    :param config: The configuration of the application.
+    :return: True if the service verifies tokens, False otherwise.
+    """
+    if getenv('JWT_VERIFY', 'false').lower() != 'true':
+        return False
+
+    config['JWT_AUTHTYPE'] = getenv('JWT_AUTHTYPE', 'HS256')
+    config['JWT_SECRET'] = getenv('JWT_SECRET')
+    config['JWT_PUBLIC_KEY'] = read_key('JWT_PUBLIC_KEY')
+    config['JWT_PREFIX'] = getenv('JWT_PREFIX', 'Bearer')
+    config['JWT_CACHE_SIZE'] = int(getenv('JWT_CACHE_SIZE', 10_000))
+    config['JWT_CACHE_TTL'] = float(getenv('JWT_CACHE_TTL', 300))
+    return True
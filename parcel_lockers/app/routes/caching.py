@@ -0,0 +1,69 @@
+from flask import Response, request
+from typing import Any
+from werkzeug.datastructures import ETags
+import hashlib
+
+CLIENT_MAX_AGE = 60
+AVAILABILITY_MAX_AGE = 5
+
+
+def body_etag(data: bytes) -> str:
+    """
+    Derives the entity tag of a response from its body, so it changes exactly when the representation does.
+
+    :param data: The body of the response.
+    :return: The entity tag, without quotes.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def set_validators(response: Any, data: bytes, max_age: int, if_none_match: ETags, private: bool = False) -> bool:
+    """
+    Adds the ETag and Cache-Control headers to a response and checks the If-None-Match header of the request.
+
+    The response may be stored for `max_age` seconds by clients and revalidated with its ETag afterwards.
+    Public responses may also be stored by shared caches such as the API gateway; private ones, which depend
+    on who is asking, only by the client itself.
+
+    :param response: The response of a Flask or Quart application.
+    :param data: The body of the response.
+    :param max_age: The number of seconds the response is fresh.
+    :param if_none_match: The entity tags of the If-None-Match header of the request.
+    :param private: True if the response must not be stored by shared caches.
+    :return: True if the client already has this representation, False otherwise.
+    """
+    etag = body_etag(data)
+    response.set_etag(etag)
+    response.cache_control.max_age = max_age
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    return if_none_match.contains_weak(etag)
+
+
+def not_modified(response: Any) -> Any:
+    """
+    Builds the 304 Not Modified response for a response whose representation the client already has.
+
+    :param response: The full response of a Flask or Quart application.
+    :return: A response of the same class without a body, with the validators and caching headers
+             of the full response.
+    """
+    headers = {name: response.headers[name] for name in ('ETag', 'Cache-Control', 'Vary') if name in response.headers}
+    return type(response)(status=304, headers=headers)
+
+
+def conditional(response: Response, max_age: int, private: bool = False) -> Response:
+    """
+    Makes a JSON response conditional: answered with 304 Not Modified if the client's If-None-Match header
+    matches its ETag, so polling clients do not download the same document again.
+
+    :param response: The full response, with status 200.
+    :param max_age: The number of seconds the response is fresh.
+    :param private: True if the response depends on the caller and must not be stored by shared caches.
+    :return: The response with validators, or a 304 response.
+    """
+    if set_validators(response, response.get_data(), max_age, request.if_none_match, private):
+        return not_modified(response)
+    return response
@@ -1,7 +1,12 @@
 from flask import Flask, jsonify, request, Response, make_response, Blueprint
 from app.src.configuration import create_parcel_locker_service
+from app.src.service import IdempotencyKeyReused
+from app.routes.listing import PageQueryModel, stream_page
+from app.routes.caching import CLIENT_MAX_AGE, conditional
 from flask_pydantic import validate
 from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
 import logging
 from enum import Enum
 
@@ -10,6 +15,10 @@ logging.basicConfig(level=logging.INFO)
 
 clients_blueprint = Blueprint('clients', __name__, url_prefix='/clients')
 packages_blueprint = Blueprint('packages', __name__, url_prefix='/packages')
+package_batches_blueprint = Blueprint('package_batches', __name__, url_prefix='/packages:batch')
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+MAX_BATCH_SIZE = 1000
 
 
 class PackageRequestModel(BaseModel):
@@ -19,6 +28,19 @@ class PackageRequestModel(BaseModel):
     size: str = Field(..., description='Size: S, M or L')
 
 
+class PackageBatchRequestModel(BaseModel):
+    packages: list[PackageRequestModel] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE,
+                                                description='Packages to send')
+
+
+class PackageListQueryModel(PageQueryModel):
+    status: Optional[str] = Field(None, description='Status of the packages, e.g. Sent or Received')
+    size: Optional[str] = Field(None, pattern='^[SML]$', description='Size: S, M or L')
+    receiver_id: Optional[int] = Field(None, ge=0, description='Receiver ID')
+    created_from: Optional[datetime] = Field(None, description='Packages created at or after this time')
+    created_to: Optional[datetime] = Field(None, description='Packages created before this time')
+
+
 class PackageSize(Enum):
     S = "S"
     M = "M"
@@ -28,7 +50,8 @@ class PackageSize(Enum):
 @clients_blueprint.route('/<int:client_id>')
 def get_clients_location_route(client_id: int) -> Response:
     """
-    Route to get the location of a client by their ID.
+    Route to get the location of a client by their ID. The response carries an ETag, and a request whose
+    If-None-Match header matches it is answered with 304 Not Modified.
 
     :param client_id: The ID of the client whose location is being requested.
     :return: A JSON response with the location of the client or an error message.
@@ -40,7 +63,26 @@ def get_clients_location_route(client_id: int) -> Response:
         if not client:
             return make_response(jsonify({'message': f'Client {client_id} not found'}), 404)
 
-        return make_response(jsonify({'location': service.find_client_location(client_id)}), 200)
+        return conditional(make_response(jsonify({'location': service.find_client_location(client_id)}), 200),
+                           CLIENT_MAX_AGE, private=True)
+    except Exception as e:
+        return make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@packages_blueprint.route('', methods=['GET'])
+@validate()
+def list_packages_route(query: PackageListQueryModel) -> Response:
+    """
+    Route to list packages page by page, using the ID of the last package of a page as the cursor of the next one.
+
+    :param query: The query string containing the cursor, the page size and optional filters.
+    :return: A streamed JSON response with the packages and the next cursor, or an error message.
+    """
+    try:
+        service = create_parcel_locker_service()
+        packages = service.iter_packages(query.after, query.limit + 1, query.status, query.size, query.receiver_id,
+                                         query.created_from, query.created_to)
+        return stream_page(packages, query.limit)
     except Exception as e:
         return make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
 
@@ -52,6 +94,10 @@ def send_package_route(body: PackageRequestModel) -> Response:
     """
     Route to send a package from a sender to a receiver.
 
+    A request with an Idempotency-Key header sends the package at most once: a retry with the same key and body
+    gets the response of the first request, marked with an Idempotent-Replayed header, and a request reusing
+    the key with a different body is rejected with 422.
+
     :param body: The request body containing sender_id, receiver_id, max_distance, and size.
     :return: A JSON response with the package details or an error message.
     """
@@ -59,15 +105,55 @@ def send_package_route(body: PackageRequestModel) -> Response:
         sender_id = body.sender_id
         receiver_id = body.receiver_id
         max_distance = body.max_distance
+        if body.size not in PackageSize:
+            return make_response(jsonify({'message': f'The size must be S, M or L'}), 400)
         size = PackageSize(body.size)
 
-        if size not in PackageSize:
-            return make_response(jsonify({'message': f'The size must be S, M or L'}), 400)
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+            return make_response(jsonify({'message': f'The idempotency key must have 1 to '
+                                                     f'{MAX_IDEMPOTENCY_KEY_LENGTH} characters'}), 400)
+
+        service = create_parcel_locker_service()
+        if idempotency_key is None:
+            package = service.send_package(sender_id, receiver_id, max_distance, size)
+            return make_response(jsonify({'package': package}), 201)
+
+        package, replayed = service.send_package_once(idempotency_key, sender_id, receiver_id, max_distance, size)
+        response = make_response(jsonify({'package': package}), 201)
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    except IdempotencyKeyReused as e:
+        return make_response(jsonify({'message': str(e)}), 422)
+    except Exception as e:
+        return make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+
+
+@package_batches_blueprint.route('', methods=['POST'])
+@validate()
+def send_packages_batch_route(body: PackageBatchRequestModel) -> Response:
+    """
+    Route to send many packages in one request, e.g. the manifest of a courier.
+
+    The packages are sent in a single transaction, but a package that cannot be sent does not stop the others:
+    the result of every package, in the order of the request, holds either its ID or the reason it was not sent.
+
+    :param body: The request body containing the packages, each with sender_id, receiver_id, max_distance, and size.
+    :return: A JSON response with the result of every package or an error message.
+    """
+    try:
+        for index, package in enumerate(body.packages):
+            if package.size not in PackageSize:
+                return make_response(jsonify({'message': f'The size of package {index} must be S, M or L'}), 400)
 
         service = create_parcel_locker_service()
-        package = service.send_package(sender_id, receiver_id, max_distance, size)
+        sent = service.send_packages([(package.sender_id, package.receiver_id, package.max_distance, package.size)
+                                      for package in body.packages])
 
-        return make_response(jsonify({'package': package}), 201)
+        results = [{'package': package_id} if error is None else {'error': error} for package_id, error in sent]
+        return make_response(jsonify({'results': results}), 200)
 
     except Exception as e:
         return make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
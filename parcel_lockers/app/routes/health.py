@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify, Response, make_response
+from app.src.configuration import container
+
+health_blueprint = Blueprint('health', __name__, url_prefix='/health')
+
+
+@health_blueprint.route('', methods=['GET'])
+def health_route() -> Response:
+    """
+    Route to report the health of the service and the statistics of its connection pool.
+
+    :return: A JSON response with the pool statistics, with status 503 if the database is unreachable.
+    """
+    stats = container.stats()
+    status_code = 503 if stats['database']['status'] == 'down' else 200
+    return make_response(jsonify(stats), status_code)
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from flask import Response, current_app, stream_with_context
+from app.src.entity import Entity
+from itertools import chain
+from typing import Iterator, Generator
+
+
+class PageQueryModel(BaseModel):
+    after: int = Field(0, ge=0, description="Cursor: the ID of the last item of the previous page.")
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of items on the page.")
+
+
+def stream_page(items: Generator[Entity, None, None], limit: int) -> Response:
+    """
+    Streams a keyset-paginated page as JSON, one item at a time.
+
+    The response has the form {"items": [...], "next_cursor": ...}, where next_cursor is the value
+    of `after` for the next page, or null on the last page. `items` should yield up to `limit + 1`
+    entities ordered by ID; the extra entity is not sent and only tells that another page exists.
+    The first entity is read before the response starts, so a failing query still results in an error response.
+
+    :param items: The entities of the page, followed by the first entity of the next page if there is one.
+    :param limit: The maximum number of items on the page.
+    :return: A streamed JSON response.
+    """
+    first = next(items, None)
+
+    @stream_with_context
+    def generate() -> Iterator[str]:
+        """
+        Yields the JSON document of the page piece by piece.
+
+        :return: A generator of JSON fragments.
+        """
+        last_id, count, has_more = None, 0, False
+        yield '{"items": ['
+        try:
+            for item in chain([first], items) if first is not None else ():
+                if count == limit:
+                    has_more = True
+                    break
+                yield (', ' if count else '') + current_app.json.dumps(item)
+                last_id, count = item.id_, count + 1
+        finally:
+            items.close()
+        yield f'], "next_cursor": {current_app.json.dumps(last_id if has_more else None)}}}'
+
+    return Response(generate(), 200, mimetype='application/json')
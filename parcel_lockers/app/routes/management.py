@@ -3,6 +3,8 @@ from typing import Optional
 from flask import Blueprint, jsonify, Response, make_response
 from flask_pydantic import validate
 from app.src.configuration import create_parcel_locker_service
+from app.routes.listing import PageQueryModel, stream_page
+from app.routes.caching import AVAILABILITY_MAX_AGE, conditional
 
 parcel_lockers_blueprint = Blueprint('parcel_lockers', __name__, url_prefix='/parcel_lockers')
 
@@ -14,6 +16,21 @@ class AddParcelLockerRequestModel(BaseModel):
     longitude: float = Field(..., description="Longitude coordinate.")
 
 
+class NearestBatchRequestModel(BaseModel):
+    client_ids: list[int] = Field(..., min_length=1, max_length=10000, description="IDs of the clients.")
+    k: int = Field(5, ge=1, le=100, description="Number of parcel lockers to return for each client.")
+    max_distance: Optional[float] = Field(None, ge=0, description="Max distance of parcel lockers from a client.")
+
+
+class ParcelLockerListQueryModel(PageQueryModel):
+    city: Optional[str] = Field(None, description="City of the parcel lockers.")
+
+
+class LockerListQueryModel(PageQueryModel):
+    status: Optional[str] = Field(None, description="Status of the lockers, e.g. 'Available' or 'Occupied'.")
+    size: Optional[str] = Field(None, pattern='^[SML]$', description="Size of the lockers: S, M, or L.")
+
+
 class AddLockerRequestModel(BaseModel):
     parcel_locker_id: int = Field(..., ge=1, description="ID of the parcel locker.")
     package_id: Optional[int] = Field(None, ge=1, description="ID of the package in this locker (optional).")
@@ -82,3 +99,97 @@ def add_locker_route(body: AddLockerRequestModel) -> Response:
     except Exception as e:
         response = make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
         return response
+
+
+@parcel_lockers_blueprint.route('/nearest:batch', methods=['POST'])
+@validate()
+def find_nearest_parcel_lockers_batch_route(body: NearestBatchRequestModel) -> Response:
+    """
+    Route to find the nearest parcel lockers for many clients in one request.
+
+    :param body: The request body containing client_ids, k and an optional max_distance.
+    :return: A JSON response with the nearest parcel lockers of each client or an error message.
+    """
+    try:
+        service = create_parcel_locker_service()
+        nearest = service.find_nearest_parcel_lockers_batch(body.client_ids, body.k, body.max_distance)
+
+        results = [
+            {'client_id': client_id, 'error': f'Client {client_id} not found'} if parcel_lockers is None else
+            {'client_id': client_id,
+             'parcel_lockers': [{'id': parcel_locker_id, 'city': city, 'distance': distance}
+                                for parcel_locker_id, city, distance in parcel_lockers]}
+            for client_id, parcel_lockers in nearest.items()
+        ]
+        response = make_response(jsonify({'results': results}), 200)
+        return response
+
+    except Exception as e:
+        response = make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+        return response
+
+
+@parcel_lockers_blueprint.route('/<int:parcel_locker_id>/availability', methods=['GET'])
+def get_availability_route(parcel_locker_id: int) -> Response:
+    """
+    Route to get the number of free lockers of each size in a parcel locker. The response carries an ETag,
+    and a request whose If-None-Match header matches it is answered with 304 Not Modified.
+
+    :param parcel_locker_id: The ID of the parcel locker.
+    :return: A JSON response with the number of free lockers by size or an error message.
+    """
+    try:
+        service = create_parcel_locker_service()
+        availability = service.find_availability(parcel_locker_id)
+
+        if availability is None:
+            return make_response(jsonify({'message': f'Parcel locker {parcel_locker_id} not found'}), 404)
+
+        response = make_response(jsonify({'parcel_locker_id': parcel_locker_id, 'availability': availability}), 200)
+        return conditional(response, AVAILABILITY_MAX_AGE)
+
+    except Exception as e:
+        response = make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+        return response
+
+
+@parcel_lockers_blueprint.route('', methods=['GET'])
+@validate()
+def list_parcel_lockers_route(query: ParcelLockerListQueryModel) -> Response:
+    """
+    Route to list parcel lockers page by page, using the ID of the last parcel locker of a page as the cursor.
+
+    :param query: The query string containing the cursor, the page size and an optional city.
+    :return: A streamed JSON response with the parcel lockers and the next cursor, or an error message.
+    """
+    try:
+        service = create_parcel_locker_service()
+        parcel_lockers = service.iter_parcel_lockers(query.after, query.limit + 1, query.city)
+        return stream_page(parcel_lockers, query.limit)
+
+    except Exception as e:
+        response = make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+        return response
+
+
+@parcel_lockers_blueprint.route('/<int:parcel_locker_id>/lockers', methods=['GET'])
+@validate()
+def list_lockers_route(parcel_locker_id: int, query: LockerListQueryModel) -> Response:
+    """
+    Route to list the lockers of a parcel locker page by page, using the ID of the last locker of a page as the cursor.
+
+    :param parcel_locker_id: The ID of the parcel locker.
+    :param query: The query string containing the cursor, the page size and optional filters.
+    :return: A streamed JSON response with the lockers and the next cursor, or an error message.
+    """
+    try:
+        service = create_parcel_locker_service()
+        if service.parcel_locker_repo.find_by_id(parcel_locker_id) is None:
+            return make_response(jsonify({'message': f'Parcel locker {parcel_locker_id} not found'}), 404)
+
+        lockers = service.iter_lockers(parcel_locker_id, query.after, query.limit + 1, query.status, query.size)
+        return stream_page(lockers, query.limit)
+
+    except Exception as e:
+        response = make_response(jsonify({'message': f'An unexpected error occurred: {str(e)}'}), 500)
+        return response
@@ -19,4 +19,7 @@ INSERT INTO locker (parcel_locker_id, client_id, size, status) VALUES
 
 (4, NULL, 'S', 'Available'), (4, NULL, 'S', 'Available'), (4, NULL, 'M', 'Available'), (4, NULL, 'M', 'Available'), (4, NULL, 'L', 'Available'), (4, NULL, 'L', 'Available');
 
+INSERT INTO locker_availability (parcel_locker_id, size, free_count)
+SELECT parcel_locker_id, size, SUM(status = 'Available') FROM locker GROUP BY parcel_locker_id, size;
+
 
@@ -0,0 +1,2 @@
+ALTER TABLE parcel_locker
+ADD INDEX idx_parcel_locker_location (latitude, longitude);
@@ -0,0 +1,2 @@
+ALTER TABLE locker
+ADD INDEX idx_locker_availability (parcel_locker_id, size, status);
@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS locker_availability (
+    parcel_locker_id BIGINT NOT NULL,
+    size VARCHAR(2) NOT NULL,
+    free_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (parcel_locker_id, size),
+    FOREIGN KEY (parcel_locker_id) REFERENCES parcel_locker(id_) ON DELETE CASCADE
+);
+
+INSERT INTO locker_availability (parcel_locker_id, size, free_count)
+SELECT parcel_locker_id, size, SUM(status = 'Available') FROM locker GROUP BY parcel_locker_id, size
+ON DUPLICATE KEY UPDATE free_count = VALUES(free_count);
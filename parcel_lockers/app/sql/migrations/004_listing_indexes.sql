@@ -0,0 +1,7 @@
+ALTER TABLE parcel_locker
+ADD INDEX idx_parcel_locker_city (city);
+
+ALTER TABLE package
+ADD INDEX idx_package_receiver_status (receiver_id, status),
+ADD INDEX idx_package_status_size (status, size),
+ADD INDEX idx_package_created_at (created_at);
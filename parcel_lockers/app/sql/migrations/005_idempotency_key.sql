@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    idempotency_key VARCHAR(255) NOT NULL PRIMARY KEY,
+    request_hash CHAR(32) NOT NULL,
+    package_id BIGINT NULL DEFAULT NULL,
+    created_at DATETIME NOT NULL,
+    INDEX idx_idempotency_key_created_at (created_at)
+);
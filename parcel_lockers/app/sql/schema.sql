@@ -13,7 +13,9 @@ CREATE TABLE IF NOT EXISTS parcel_locker (
     city VARCHAR(55) NOT NULL,
     postal_code VARCHAR(6) NOT NULL,
     latitude float NOT NULL,
-    longitude float NOT NULL
+    longitude float NOT NULL,
+    INDEX idx_parcel_locker_location (latitude, longitude),
+    INDEX idx_parcel_locker_city (city)
 );
 
 CREATE TABLE IF NOT EXISTS locker (
@@ -23,10 +25,19 @@ CREATE TABLE IF NOT EXISTS locker (
     package_id BIGINT NULL DEFAULT NULL,
     size VARCHAR(2),
     status VARCHAR(15) DEFAULT 'Available',
+    INDEX idx_locker_availability (parcel_locker_id, size, status),
     FOREIGN KEY (parcel_locker_id) REFERENCES parcel_locker(id_) ON DELETE CASCADE,
     FOREIGN KEY (client_id) REFERENCES client(id_)
 );
 
+CREATE TABLE IF NOT EXISTS locker_availability (
+    parcel_locker_id BIGINT NOT NULL,
+    size VARCHAR(2) NOT NULL,
+    free_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (parcel_locker_id, size),
+    FOREIGN KEY (parcel_locker_id) REFERENCES parcel_locker(id_) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS package (
     id_ BIGINT AUTO_INCREMENT PRIMARY KEY,
     sender_id BIGINT NOT NULL,
@@ -37,12 +48,23 @@ CREATE TABLE IF NOT EXISTS package (
     created_at DATETIME NOT NULL,
     delivered_at DATETIME NULL DEFAULT NULL,
     status VARCHAR(55),
+    INDEX idx_package_receiver_status (receiver_id, status),
+    INDEX idx_package_status_size (status, size),
+    INDEX idx_package_created_at (created_at),
     FOREIGN KEY (sender_id) REFERENCES client(id_),
     FOREIGN KEY (receiver_id) REFERENCES client(id_),
     FOREIGN KEY (parcel_locker_id) REFERENCES parcel_locker(id_),
     FOREIGN KEY (locker_id) REFERENCES locker(id_)
 );
 
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    idempotency_key VARCHAR(255) NOT NULL PRIMARY KEY,
+    request_hash CHAR(32) NOT NULL,
+    package_id BIGINT NULL DEFAULT NULL,
+    created_at DATETIME NOT NULL,
+    INDEX idx_idempotency_key_created_at (created_at)
+);
+
 ALTER TABLE package
 ADD FOREIGN KEY (locker_id) REFERENCES locker(id_);
 
@@ -0,0 +1,112 @@
+from app.src.async_database import AsyncMySQLConnectionManager
+from app.src.async_repository import (
+    AsyncLockerRepository,
+    AsyncClientRepository,
+    AsyncPackageRepository,
+    AsyncParcelLockerRepository,
+    AsyncIdempotencyKeyRepository,
+)
+from app.src.async_service import AsyncParcelLockerService
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.cache import Cache, create_entity_caches
+from typing import Any
+
+import os
+
+
+class AsyncServiceContainer:
+    """
+    Application-scoped container for the dependencies of the asyncio parcel lockers service.
+
+    The asyncio server runs every request of a worker on one event loop, so a single connection pool,
+    a single set of entity caches and a single `AsyncParcelLockerService` are created when the server
+    starts and shared by all requests until it stops.
+
+    Environment variables used are the ones of `ServiceContainer`, except that the 'redis' entity cache
+    backend is not supported, because its client would block the event loop, and that the size of the pool
+    is read from ASYNC_DB_POOL_SIZE.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty container; the shared resources are created by `open`.
+        """
+        self._connection_manager: AsyncMySQLConnectionManager | None = None
+        self._caches: dict[str, Cache] = {}
+        self._service: AsyncParcelLockerService | None = None
+
+    async def open(self) -> None:
+        """
+        Opens the connection pool and creates the service shared by all requests.
+
+        :raises ValueError: If ENTITY_CACHE names an unknown or unsupported backend.
+        """
+        if self._service is not None:
+            return
+
+        if os.getenv('ENTITY_CACHE', 'lru') == 'redis':
+            raise ValueError('The redis entity cache backend is not supported by the asyncio service')
+
+        connection_manager = AsyncMySQLConnectionManager()
+        await connection_manager.open()
+        self._connection_manager = connection_manager
+        self._caches = create_entity_caches()
+
+        client_repo = AsyncClientRepository(connection_manager, self._caches.get('client'))
+        self._service = AsyncParcelLockerService(
+            locker_repo=AsyncLockerRepository(connection_manager),
+            client_repo=client_repo,
+            package_repo=AsyncPackageRepository(connection_manager),
+            parcel_locker_repo=AsyncParcelLockerRepository(connection_manager, client_repo,
+                                                           self._caches.get('parcel_locker')),
+            connection_manager=connection_manager,
+            nearest_engine=NearestParcelLockerEngine(),
+            idempotency_repo=AsyncIdempotencyKeyRepository(connection_manager, self._caches.get('idempotency_key'),
+                                                           float(os.getenv('IDEMPOTENCY_KEY_TTL', 86400)))
+        )
+
+    @property
+    def service(self) -> AsyncParcelLockerService:
+        """
+        Returns the service shared by all requests.
+
+        :return: The shared `AsyncParcelLockerService` instance.
+        :raises RuntimeError: If the container has not been opened.
+        """
+        if self._service is None:
+            raise RuntimeError("The service container is not open")
+        return self._service
+
+    async def stats(self) -> dict[str, Any]:
+        """
+        Returns health and usage statistics of the shared resources.
+
+        :return: A dictionary describing the database connection pool, or only its status
+                 if the pool has not been opened yet, and the statistics of the entity caches.
+        """
+        if self._connection_manager is None:
+            return {'database': {'status': 'not initialized'}}
+
+        healthy = await self._connection_manager.is_healthy()
+        stats: dict[str, Any] = {
+            'database': {
+                'status': 'up' if healthy else 'down',
+                **self._connection_manager.stats()
+            }
+        }
+        if self._caches:
+            stats['caches'] = {name: cache.stats() for name, cache in self._caches.items()}
+        return stats
+
+    async def close(self) -> None:
+        """
+        Closes the connection pool and drops the shared resources.
+        """
+        if self._connection_manager is not None:
+            await self._connection_manager.close()
+        self._connection_manager = None
+        self._caches = {}
+        self._service = None
+
+
+async_container = AsyncServiceContainer()
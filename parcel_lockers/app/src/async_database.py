@@ -0,0 +1,293 @@
+from dotenv import load_dotenv
+from aiomysql import Pool, Connection
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import AsyncIterator, Callable, Any
+
+import aiomysql
+import asyncio
+import inspect
+import time
+import os
+
+load_dotenv()
+
+_transaction: ContextVar[tuple['AsyncMySQLConnectionManager', asyncio.Task | None, Connection,
+                               list[Callable[[], Any]]] | None] = ContextVar('async_transaction', default=None)
+
+
+class AsyncMySQLConnectionManager:
+    """
+    Manages a pool of MySQL database connections for asyncio code.
+
+    The asyncio counterpart of `MySQLConnectionManager`: it reads the same environment variables, but the pool
+    is an `aiomysql` pool, so waiting for a connection or for a query result suspends the current task
+    instead of blocking the worker. The pool has to be opened with `open` inside the event loop that uses it.
+    """
+
+    def __init__(self):
+        """
+        Reads the configuration of the pool; the connections are created by `open`.
+
+        Environment variables used:
+        - ASYNC_DB_POOL_SIZE: The maximum number of connections of the pool (default: 20).
+        - DB_HOST: Hostname of the MySQL server.
+        - DB_NAME: Name of the database to connect to.
+        - DB_USER: Username for database authentication.
+        - DB_PASSWORD: Password for database authentication.
+        - DB_PORT: Port for connecting to the database (default: 3307).
+        - DB_POOL_TIMEOUT: Seconds to wait for a free connection when the pool is exhausted (default: 5).
+        """
+        self._pool: Pool | None = None
+        self._pool_size = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+        self._timeout = float(os.getenv('DB_POOL_TIMEOUT', 5))
+        self._checkouts = 0
+        self._exhausted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def open(self) -> None:
+        """
+        Creates the connection pool, unless it is already open.
+        """
+        if self._pool is None:
+            self._pool = await aiomysql.create_pool(
+                minsize=1,
+                maxsize=self._pool_size,
+                host=os.getenv('DB_HOST'),
+                db=os.getenv('DB_NAME'),
+                user=os.getenv('DB_USER'),
+                password=os.getenv('DB_PASSWORD'),
+                port=int(os.getenv('DB_PORT', 3307)),
+                autocommit=False
+            )
+
+    @asynccontextmanager
+    async def get_connection(self) -> AsyncIterator[Connection]:
+        """
+        Checks out a connection from the pool for the duration of the block.
+
+        When every pooled connection is in use, the task waits for one to be returned
+        for up to DB_POOL_TIMEOUT seconds (default: 5) before giving up.
+
+        :return: An aiomysql connection.
+        :raises TimeoutError: If no connection becomes available within the timeout.
+        :raises RuntimeError: If the pool has not been opened.
+        """
+        if self._pool is None:
+            raise RuntimeError("The connection pool is not open")
+
+        started = time.perf_counter()
+        exhausted = self._pool.freesize == 0 and self._pool.size >= self._pool.maxsize
+        try:
+            async with asyncio.timeout(self._timeout):
+                connection = await self._pool.acquire()
+        finally:
+            self._record_checkout(time.perf_counter() - started, exhausted)
+
+        try:
+            yield connection
+        finally:
+            self._pool.release(connection)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Connection]:
+        """
+        Runs a block of code as a single unit of work on one connection.
+
+        Works like `MySQLConnectionManager.transaction`: every repository method decorated with
+        `with_async_db_connection` and awaited inside the block by the same task reuses this connection,
+        the transaction is committed when the block completes and rolled back if it raises, and a nested
+        call joins the transaction that is already open. Tasks started inside the block inherit the context of
+        the task that opened the transaction, but they do not join it: they get connections of their own,
+        as an aiomysql connection cannot run queries for two tasks at a time.
+
+        :return: The connection used by the unit of work.
+        """
+        connection = self.current_transaction()
+        if connection is not None:
+            yield connection
+            return
+
+        after_commit: list[Callable[[], Any]] = []
+        async with self.get_connection() as connection:
+            token = _transaction.set((self, asyncio.current_task(), connection, after_commit))
+            try:
+                yield connection
+                await connection.commit()
+            except Exception:
+                await connection.rollback()
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            finally:
+                _transaction.reset(token)
+
+        for callback in after_commit:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+    def current_transaction(self) -> Connection | None:
+        """
+        Returns the connection of the unit of work open in the current task.
+
+        :return: The connection of the open transaction, or None if no transaction is open for this manager
+                 in the current task.
+        """
+        transaction = self._own_transaction()
+        return transaction[2] if transaction is not None else None
+
+    def after_commit(self, callback: Callable[[], Any]) -> None:
+        """
+        Runs a callback once the changes made so far are committed.
+
+        Inside a transaction the callback may also be a coroutine function, which the transaction awaits after
+        it commits; outside a transaction the callback is called immediately, so it must be a plain function.
+
+        :param callback: The function to call, without arguments.
+        """
+        transaction = self._own_transaction()
+        if transaction is None:
+            callback()
+        else:
+            transaction[3].append(callback)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the connection pool.
+
+        :return: A dictionary with the pool size, the number of idle connections, the number of checkouts,
+                 how many of them found the pool exhausted, and the average and maximum wait time in milliseconds.
+        """
+        return {
+            'pool_size': self._pool_size,
+            'idle_connections': self._pool.freesize if self._pool is not None else 0,
+            'checkouts': self._checkouts,
+            'exhausted': self._exhausted,
+            'avg_wait_ms': self._total_wait / self._checkouts * 1000 if self._checkouts else 0.0,
+            'max_wait_ms': self._max_wait * 1000
+        }
+
+    async def is_healthy(self) -> bool:
+        """
+        Checks whether a connection can be obtained from the pool and the server responds to a ping.
+
+        :return: True if the database is reachable, False otherwise.
+        """
+        try:
+            async with self.get_connection() as connection:
+                await connection.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """
+        Closes the pool and waits for its connections to be closed.
+
+        Meant to be called once when the server stops, after the last request has been served.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    def _own_transaction(self) -> tuple[Any, asyncio.Task | None, Connection, list[Callable[[], Any]]] | None:
+        """
+        Returns the transaction of this manager opened by the current task.
+
+        Tasks copy the context of the task that creates them, so a transaction seen in the context
+        may belong to the parent task; it is ignored then.
+
+        :return: The manager, task, connection and after-commit callbacks of the transaction, or None.
+        """
+        transaction = _transaction.get()
+        if transaction is None or transaction[0] is not self or transaction[1] is not asyncio.current_task():
+            return None
+        return transaction
+
+    def _record_checkout(self, wait: float, exhausted: bool) -> None:
+        """
+        Records a single connection checkout in the pool statistics.
+
+        All tasks run on the thread of the event loop, so no lock is needed.
+
+        :param wait: Time in seconds spent waiting for the connection.
+        :param exhausted: Whether the pool had no idle connection when the checkout started.
+        """
+        self._checkouts += 1
+        self._exhausted += exhausted
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+
+def with_async_db_connection(func: Callable) -> Callable:
+    """
+    Decorator to manage the database connection and cursor of a coroutine method.
+
+    The asyncio counterpart of `with_db_connection`. Repositories are shared by concurrent tasks,
+    so the cursor is passed to the wrapped method as its first argument after `self` instead of being
+    stored on the instance. Inside `AsyncMySQLConnectionManager.transaction` the connection of the
+    transaction is reused and committing or rolling back is left to the transaction.
+
+    :param func: The coroutine function to wrap, which takes the cursor after `self`.
+    :return: The wrapped coroutine function.
+    """
+    @wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Wrapper function that passes a database cursor to the wrapped coroutine function.
+
+        :param self: Instance of the class containing the wrapped method.
+        :param args: Positional arguments for the wrapped function.
+        :param kwargs: Keyword arguments for the wrapped function.
+        :return: The result of the wrapped function.
+        :raises Exception: Propagates any exceptions after rolling back the transaction; a cancelled call
+                           closes the connection instead, as the state of its protocol is unknown.
+        """
+        transaction_connection = self._connection_manager.current_transaction()
+        if transaction_connection is not None:
+            async with transaction_connection.cursor() as cursor:
+                return await func(self, cursor, *args, **kwargs)
+
+        async with self._connection_manager.get_connection() as connection:
+            try:
+                async with connection.cursor() as cursor:
+                    result = await func(self, cursor, *args, **kwargs)
+                await connection.commit()
+                return result
+            except Exception:
+                await connection.rollback()
+                raise
+            except BaseException:
+                connection.close()
+                raise
+
+    return wrapper
+
+
+def async_transactional(func: Callable) -> Callable:
+    """
+    Decorator to run a coroutine service method as a single unit of work.
+
+    :param func: The coroutine function to wrap, which expects access to `self._connection_manager`.
+    :return: The wrapped coroutine function.
+    """
+    @wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Wrapper function that runs the wrapped coroutine function inside a transaction.
+
+        :param self: Instance of the class containing the wrapped method.
+        :param args: Positional arguments for the wrapped function.
+        :param kwargs: Keyword arguments for the wrapped function.
+        :return: The result of the wrapped function.
+        """
+        async with self._connection_manager.transaction():
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
@@ -0,0 +1,591 @@
+from app.src.entity import Entity, Client, Locker, ParcelLocker, Package
+from app.src.async_database import with_async_db_connection, AsyncMySQLConnectionManager
+from app.src.mapper import mapper_for
+from app.src.cache import Cache
+from app.src import queries
+from aiomysql import Connection, Cursor, SSCursor
+from itertools import batched
+from functools import partial
+from copy import copy
+from datetime import datetime, timedelta
+from typing import Type, Iterable, AsyncIterator, Any
+
+import logging
+
+
+class AsyncCrudRepository[T: Entity]:
+    """
+    A generic repository class for performing CRUD operations on entities from asyncio code.
+
+    The asyncio counterpart of `CrudRepository`, sharing its `EntityMapper` and entity caches. Repositories
+    are created once per application and shared by all concurrent requests, so the cursor of a call
+    is passed to the decorated methods as an argument instead of being kept on the instance.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager, entity_type: Type[T],
+                 cache: Cache | None = None):
+        """
+        Initializes the repository with a database connection manager and an entity type.
+
+        :param connection_manager: An instance of `AsyncMySQLConnectionManager` for managing database connections.
+        :param entity_type: The type of the entity the repository will manage (e.g., Client, Package, etc.).
+        :param cache: An optional cache serving `find_by_id`, invalidated by the writes of this repository.
+        """
+        self._connection_manager = connection_manager
+        self._entity_type = entity_type
+        self._mapper = mapper_for(entity_type)
+        self._cache = cache
+
+    @with_async_db_connection
+    async def find_all(self, cursor: Cursor) -> list[T]:
+        """
+        Retrieves all records from the database for the entity type.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :return: A list of entity instances populated with data from the database.
+        """
+        await cursor.execute(self._mapper.find_all_sql)
+        from_row = self._mapper.from_row
+        return [from_row(*row) for row in await cursor.fetchall()]
+
+    def iter_page(self, after_id: int = 0, limit: int = 100, conditions: Iterable[tuple[str, str, Any]] = (),
+                  batch_size: int = 1000) -> AsyncIterator[T]:
+        """
+        Streams a page of records ordered by ID, using keyset pagination.
+
+        Works like `CrudRepository.iter_page`: the rows are read through an unbuffered cursor on a connection
+        of its own, one batch at a time, and closing the stream early discards the unread rows.
+
+        :param after_id: The ID after which the page starts (default: 0, the first page).
+        :param limit: The maximum number of entities on the page.
+        :param conditions: Filters as (column, operator, value) tuples, combined with AND.
+        :param batch_size: The number of rows fetched from the server at a time.
+        :return: An asynchronous generator of entity instances.
+        """
+        sql, params = self._mapper.page_query(after_id, limit, conditions)
+        return self._stream(sql, params, batch_size)
+
+    async def find_by_id(self, item_id: int) -> T | None:
+        """
+        Retrieves a single entity by its ID, from the cache of the repository if it has one, or from the database.
+
+        :param item_id: The ID of the entity to retrieve.
+        :return: An entity instance or `None` if not found.
+        """
+        if self._cache is None or self._connection_manager.current_transaction() is not None:
+            return await self._select_by_id(item_id)
+
+        key = self._cache_key(item_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return copy(cached)
+
+        item = await self._select_by_id(item_id)
+        if item is not None:
+            self._cache.set(key, copy(item))
+        return item
+
+    async def find_by_ids(self, item_ids: Iterable[int], chunk_size: int = 1000) -> dict[int, T]:
+        """
+        Retrieves several entities by their IDs at once, like `CrudRepository.find_by_ids`.
+
+        :param item_ids: The IDs of the entities to retrieve; duplicates are ignored.
+        :param chunk_size: The maximum number of IDs in a single query.
+        :return: A dictionary mapping the ID of every entity found to the entity, in the order of `item_ids`.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        use_cache = self._cache is not None and self._connection_manager.current_transaction() is None
+
+        found: dict[int, T] = {}
+        if use_cache:
+            keys = {self._cache_key(item_id): item_id for item_id in item_ids}
+            found = {keys[key]: copy(item) for key, item in self._cache.get_many(keys).items()}
+
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing:
+            selected = await self._select_by_ids(missing, chunk_size)
+            if use_cache:
+                for item_id, item in selected.items():
+                    self._cache.set(self._cache_key(item_id), copy(item))
+            found.update(selected)
+
+        return {item_id: found[item_id] for item_id in item_ids if item_id in found}
+
+    async def insert(self, item: T) -> int:
+        """
+        Inserts a new entity into the database.
+
+        :param item: The entity to insert.
+        :return: The ID of the newly inserted entity.
+        """
+        item_id = await self._insert(item)
+        self._invalidate(item_id)
+        return item_id
+
+    async def insert_many(self, items: Iterable[T], chunk_size: int = 1000) -> int:
+        """
+        Inserts multiple entities into the database in chunks.
+
+        Unlike `CrudRepository.insert_many`, the chunks are written in a single transaction, or in the
+        transaction already open in the current task, so a failure leaves none of them in place. Like it,
+        the IDs of the inserted entities are not returned, as MySQL does not guarantee they are consecutive.
+
+        :param items: The entities to insert.
+        :param chunk_size: The maximum number of entities written by a single statement.
+        :return: The number of inserted entities.
+        """
+        async with self._connection_manager.transaction() as connection:
+            return await self._insert_chunks(connection, items, chunk_size)
+
+    async def update(self, item_id: int, item: T) -> None:
+        """
+        Updates an existing entity in the database.
+
+        :param item_id: The ID of the entity to update.
+        :param item: The updated entity data.
+        """
+        await self._update(item_id, item)
+        self._invalidate(item_id)
+
+    async def delete(self, item_id: int) -> int:
+        """
+        Deletes an entity from the database by its ID.
+
+        :param item_id: The ID of the entity to delete.
+        :return: The ID of the deleted entity.
+        """
+        await self._delete(item_id)
+        self._invalidate(item_id)
+        return item_id
+
+    def table_name(self) -> str:
+        """
+        Returns the name of the table of the entity type, i.e. the entity type name in snake_case.
+
+        :return: The name of the table corresponding to the entity type.
+        """
+        return self._mapper.table_name
+
+    @with_async_db_connection
+    async def _select_by_id(self, cursor: Cursor, item_id: int) -> T | None:
+        """
+        Retrieves a single entity by its ID from the database.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param item_id: The ID of the entity to retrieve.
+        :return: An entity instance or `None` if not found.
+        """
+        await cursor.execute(self._mapper.find_by_id_sql, (item_id,))
+        item = await cursor.fetchone()
+        return self._mapper.from_row(*item) if item else None
+
+    @with_async_db_connection
+    async def _select_by_ids(self, cursor: Cursor, item_ids: list[int], chunk_size: int) -> dict[int, T]:
+        """
+        Retrieves entities by their IDs from the database, chunk by chunk.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param item_ids: The IDs of the entities to retrieve.
+        :param chunk_size: The maximum number of IDs in a single query.
+        :return: A dictionary mapping the ID of every entity found to the entity.
+        """
+        from_row = self._mapper.from_row
+        items: dict[int, T] = {}
+        for chunk in batched(item_ids, chunk_size):
+            await cursor.execute(self._mapper.find_by_ids_sql(len(chunk)), chunk)
+            for row in await cursor.fetchall():
+                items[row[0]] = from_row(*row)
+        return items
+
+    @with_async_db_connection
+    async def _insert(self, cursor: Cursor, item: T) -> int:
+        """
+        Writes a new entity to the database.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param item: The entity to insert.
+        :return: The ID of the newly inserted entity.
+        """
+        await cursor.execute(self._mapper.insert_sql, self._mapper.values(item))
+        return cursor.lastrowid
+
+    @with_async_db_connection
+    async def _update(self, cursor: Cursor, item_id: int, item: T) -> None:
+        """
+        Writes the data of an existing entity to the database.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param item_id: The ID of the entity to update.
+        :param item: The updated entity data.
+        """
+        await cursor.execute(self._mapper.update_sql, (*self._mapper.values(item), item_id))
+
+    @with_async_db_connection
+    async def _delete(self, cursor: Cursor, item_id: int) -> None:
+        """
+        Removes an entity from the database.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param item_id: The ID of the entity to delete.
+        """
+        await cursor.execute(self._mapper.delete_sql, (item_id,))
+
+    def _cache_key(self, item_id: int) -> str:
+        """
+        Builds the cache key of an entity; the same key as in `CrudRepository`.
+
+        :param item_id: The ID of the entity.
+        :return: The key of the entity in the cache.
+        """
+        return f'{self._mapper.table_name}:{item_id}'
+
+    def _invalidate(self, item_id: int) -> None:
+        """
+        Removes an entity from the cache once the change made to it is committed.
+
+        :param item_id: The ID of the changed entity.
+        """
+        if self._cache is not None:
+            self._connection_manager.after_commit(partial(self._cache.delete, self._cache_key(item_id)))
+
+    async def _stream(self, sql: str, params: tuple, batch_size: int) -> AsyncIterator[T]:
+        """
+        Executes a query on a connection of its own and yields its rows as entities, one batch at a time.
+
+        :param sql: The query selecting the columns of the entity in field order.
+        :param params: The query parameters.
+        :param batch_size: The number of rows fetched from the server at a time.
+        :return: An asynchronous generator of entity instances.
+        """
+        from_row = self._mapper.from_row
+        async with self._connection_manager.get_connection() as connection:
+            try:
+                async with connection.cursor(SSCursor) as cursor:
+                    await cursor.execute(sql, params)
+                    while rows := await cursor.fetchmany(batch_size):
+                        for row in rows:
+                            yield from_row(*row)
+            finally:
+                await connection.rollback()
+
+    async def _insert_chunks(self, connection: Connection, items: Iterable[T], chunk_size: int) -> int:
+        """
+        Writes entities chunk by chunk on a single connection, one multi-row insert per chunk.
+
+        :param connection: The connection to write on.
+        :param items: The entities to insert.
+        :param chunk_size: The maximum number of entities written by a single statement.
+        :return: The number of inserted entities.
+        """
+        inserted = 0
+        async with connection.cursor() as cursor:
+            for chunk in batched(items, chunk_size):
+                await cursor.executemany(self._mapper.insert_sql, list(map(self._mapper.values, chunk)))
+                inserted += len(chunk)
+        return inserted
+
+
+class AsyncClientRepository(AsyncCrudRepository[Client]):
+    """
+    Repository class for performing CRUD operations on `Client` entities from asyncio code.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager, cache: Cache | None = None):
+        super().__init__(connection_manager, Client, cache)
+
+
+class AsyncPackageRepository(AsyncCrudRepository[Package]):
+    """
+    Repository class for performing CRUD operations on `Package` entities from asyncio code.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager):
+        super().__init__(connection_manager, Package)
+
+    @with_async_db_connection
+    async def find_ids_in_lockers(self, cursor: Cursor, locker_ids: list[int],
+                                  chunk_size: int = 1000) -> dict[int, int]:
+        """
+        Finds the packages put in many lockers, like `PackageRepository.find_ids_in_lockers`.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param locker_ids: The IDs of the lockers.
+        :param chunk_size: The maximum number of lockers looked up by a single query.
+        :return: A dictionary mapping the ID of every locker holding a package to the ID of the package.
+        """
+        package_ids: dict[int, int] = {}
+        for chunk in batched(locker_ids, chunk_size):
+            await cursor.execute(queries.packages_in_lockers(len(chunk)), chunk)
+            package_ids.update(await cursor.fetchall())
+        return package_ids
+
+
+class AsyncParcelLockerRepository(AsyncCrudRepository[ParcelLocker]):
+    """
+    Repository class for performing CRUD operations on `ParcelLocker` entities from asyncio code.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager, client_repo: AsyncClientRepository,
+                 cache: Cache | None = None):
+        """
+        Initializes the repository.
+
+        :param connection_manager: An instance of `AsyncMySQLConnectionManager` for managing database connections.
+        :param client_repo: Repository used to look up the location of clients.
+        :param cache: An optional cache of parcel lockers serving `find_by_id`.
+        """
+        super().__init__(connection_manager, ParcelLocker, cache)
+        self._client_repo = client_repo
+
+    async def find_nearest_parcel_lockers(self, client_id: int, max_distance: float) -> list[tuple[int, ...]]:
+        """
+        Finds the nearest parcel lockers to a client within a specified maximum distance.
+
+        :param client_id: The ID of the client.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        client_location = await self._client_repo.find_by_id(client_id)
+        return await self.find_parcel_lockers_within(client_location.latitude, client_location.longitude,
+                                                     max_distance)
+
+    @with_async_db_connection
+    async def find_parcel_lockers_within(self, cursor: Cursor, latitude: float, longitude: float,
+                                         max_distance: float) -> list[tuple[int, ...]]:
+        """
+        Finds the parcel lockers within a specified maximum distance from a point using MySQL.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        await cursor.execute(queries.parcel_lockers_within(),
+                             queries.parcel_lockers_within_params(latitude, longitude, max_distance))
+        return list(await cursor.fetchall())
+
+    @with_async_db_connection
+    async def find_available_parcel_lockers_within(self, cursor: Cursor, latitude: float, longitude: float,
+                                                   max_distance: float, size: str, limit: int = 5,
+                                                   counted: bool = True) -> list[tuple[int, ...]]:
+        """
+        Finds the nearest parcel lockers to a point that have a free locker of the specified size, in a single query,
+        like `ParcelLockerRepository.find_available_parcel_lockers_within`.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param latitude: Latitude of the point.
+        :param longitude: Longitude of the point.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param size: Size of the locker (e.g., small, medium, large).
+        :param limit: The maximum number of parcel lockers to return.
+        :param counted: Whether to read the free lockers from the counters instead of the `locker` table.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        await cursor.execute(queries.parcel_lockers_within(available=True, counted=counted),
+                             queries.parcel_lockers_within_params(latitude, longitude, max_distance, size, limit))
+        return list(await cursor.fetchall())
+
+
+class AsyncLockerRepository(AsyncCrudRepository[Locker]):
+    """
+    Repository class for performing CRUD operations on `Locker` entities from asyncio code.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager):
+        super().__init__(connection_manager, Locker)
+
+    @with_async_db_connection
+    async def reserve_lockers(self, cursor: Cursor, size: str, parcel_locker: int, count: int) -> list[int]:
+        """
+        Locks up to `count` free lockers of the specified size in a parcel locker, like
+        `LockerRepository.reserve_lockers`.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param parcel_locker: The ID of the parcel locker to reserve lockers in.
+        :param count: The maximum number of lockers to reserve.
+        :return: The IDs of the reserved lockers; fewer than `count` if the parcel locker has fewer free lockers.
+        """
+        await cursor.execute(queries.RESERVE_LOCKERS, (parcel_locker, size, count))
+        return [row[0] for row in await cursor.fetchall()]
+
+    @with_async_db_connection
+    async def assign_lockers(self, cursor: Cursor, assignments: list[tuple[int, int, int]],
+                             chunk_size: int = 500) -> None:
+        """
+        Occupies many lockers, each with its own package and receiver, with one statement per chunk.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param assignments: Tuples containing the ID of a locker, the ID of its package and the ID of the receiver.
+        :param chunk_size: The maximum number of lockers updated by a single statement.
+        """
+        for chunk in batched(assignments, chunk_size):
+            await cursor.execute(queries.assign_lockers(len(chunk)), queries.assign_lockers_params(list(chunk)))
+
+
+class AsyncLockerAvailabilityRepository:
+    """
+    Repository class for the `locker_availability` summary table, from asyncio code.
+
+    Correcting the counters is a maintenance task left to `LockerAvailabilityRepository.reconcile`.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager):
+        """
+        Initializes the repository with a database connection manager.
+
+        :param connection_manager: An instance of `AsyncMySQLConnectionManager` for managing database connections.
+        """
+        self._connection_manager = connection_manager
+
+    async def adjust(self, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes the number of free lockers of a size in a parcel locker, after the transaction open in the current
+        task commits, like `LockerAvailabilityRepository.adjust`.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        if self._connection_manager.current_transaction() is None:
+            await self._adjust(parcel_locker, size, delta)
+        else:
+            self._connection_manager.after_commit(partial(self._adjust_after_commit, parcel_locker, size, delta))
+
+    @with_async_db_connection
+    async def find_by_parcel_locker(self, cursor: Cursor, parcel_locker: int) -> dict[str, int]:
+        """
+        Retrieves the number of free lockers of each size in a parcel locker.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param parcel_locker: The ID of the parcel locker.
+        :return: A dictionary mapping locker sizes to the number of free lockers; empty if nothing is recorded.
+        """
+        await cursor.execute(queries.FIND_AVAILABILITY, (parcel_locker,))
+        return {size: free_count for size, free_count in await cursor.fetchall()}
+
+    @with_async_db_connection
+    async def _adjust(self, cursor: Cursor, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes the number of free lockers of a size in a parcel locker with a single statement.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        await cursor.execute(queries.ADJUST_AVAILABILITY, (parcel_locker, size, delta, delta))
+
+    async def _adjust_after_commit(self, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes a counter once the transaction that changed its lockers has committed, logging a failure instead
+        of raising it, like `LockerAvailabilityRepository._adjust_after_commit`.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        try:
+            await self._adjust(parcel_locker, size, delta)
+        except Exception as error:
+            logging.warning('Free locker counter of parcel locker %s, size %s, missed %+d: %r',
+                            parcel_locker, size, delta, error)
+
+
+class AsyncIdempotencyKeyRepository:
+    """
+    Repository class for the `idempotency_key` table, from asyncio code, like `IdempotencyKeyRepository`.
+
+    Purging expired keys is a maintenance task left to `IdempotencyKeyRepository.purge`.
+    """
+
+    def __init__(self, connection_manager: AsyncMySQLConnectionManager, cache: Cache | None = None,
+                 window: float = 86400.0):
+        """
+        Initializes the repository with a database connection manager.
+
+        :param connection_manager: An instance of `AsyncMySQLConnectionManager` for managing database connections.
+        :param cache: An optional cache serving `find` for completed keys.
+        :param window: The number of seconds a key is remembered after it is first used.
+        """
+        self._connection_manager = connection_manager
+        self._cache = cache
+        self._window = timedelta(seconds=window)
+
+    async def find(self, key: str) -> tuple[str, int] | None:
+        """
+        Retrieves the request fingerprint and the package of a completed key, from the cache if possible.
+
+        :param key: The idempotency key.
+        :return: A tuple containing the fingerprint of the request and the ID of the package it created,
+                 or None if the key was not used within the window or its request is still in progress.
+        """
+        if self._cache is None:
+            return await self._select(key)
+
+        cached = self._cache.get(self._cache_key(key))
+        if cached is not None:
+            return cached
+
+        stored = await self._select(key)
+        if stored is not None:
+            self._cache.set(self._cache_key(key), stored)
+        return stored
+
+    @with_async_db_connection
+    async def claim(self, cursor: Cursor, key: str, fingerprint: str) -> tuple[str, int | None]:
+        """
+        Records the first use of a key, or locks the record of its earlier use, like
+        `IdempotencyKeyRepository.claim`.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param key: The idempotency key.
+        :param fingerprint: The fingerprint of the request.
+        :return: A tuple containing the fingerprint of the request that used the key first and the ID of the
+                 package it created, or None instead of the ID if the key is claimed by this transaction.
+        """
+        now = datetime.now()
+        expired_before = now - self._window
+        await cursor.execute(queries.CLAIM_IDEMPOTENCY_KEY,
+                             (key, fingerprint, now, expired_before, expired_before, expired_before))
+        await cursor.execute(queries.LOCK_IDEMPOTENCY_KEY, (key,))
+        stored_fingerprint, package_id = await cursor.fetchone()
+        return stored_fingerprint, package_id
+
+    @with_async_db_connection
+    async def complete(self, cursor: Cursor, key: str, fingerprint: str, package_id: int) -> None:
+        """
+        Records the package created for a claimed key, and caches it once the transaction commits.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param key: The idempotency key.
+        :param fingerprint: The fingerprint of the request.
+        :param package_id: The ID of the created package.
+        """
+        await cursor.execute(queries.COMPLETE_IDEMPOTENCY_KEY, (package_id, key))
+        if self._cache is not None:
+            self._connection_manager.after_commit(partial(self._cache.set, self._cache_key(key),
+                                                          (fingerprint, package_id)))
+
+    @with_async_db_connection
+    async def _select(self, cursor: Cursor, key: str) -> tuple[str, int] | None:
+        """
+        Reads a completed key used within the window from the database.
+
+        :param cursor: The cursor passed by `with_async_db_connection`.
+        :param key: The idempotency key.
+        :return: A tuple containing the fingerprint of the request and the ID of the package, or None.
+        """
+        await cursor.execute(queries.FIND_IDEMPOTENCY_KEY, (key, datetime.now() - self._window))
+        row = await cursor.fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def _cache_key(self, key: str) -> str:
+        """
+        Builds the cache key of an idempotency key.
+
+        :param key: The idempotency key.
+        :return: The key of the record in the cache.
+        """
+        return f'idempotency_key:{key}'
@@ -0,0 +1,408 @@
+from app.src.async_repository import (
+    AsyncLockerRepository,
+    AsyncClientRepository,
+    AsyncParcelLockerRepository,
+    AsyncPackageRepository,
+    AsyncLockerAvailabilityRepository,
+    AsyncIdempotencyKeyRepository,
+)
+from app.src.async_database import AsyncMySQLConnectionManager, async_transactional
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.entity import Package, ParcelLocker, Locker, Size
+from app.src.service import (
+    package_filters,
+    locker_filters,
+    request_fingerprint,
+    plan_packages,
+    build_packages,
+    IdempotencyKeyReused,
+)
+from enum import Enum
+from datetime import datetime
+from typing import AsyncIterator
+
+import asyncio
+
+
+class AsyncParcelLockerService:
+    """
+    Service class for managing parcel locker operations from asyncio code.
+
+    The asyncio counterpart of `ParcelLockerService`, with the same operations and the same errors.
+    Database calls suspend the current request instead of blocking the worker, and the NumPy calculations
+    of the nearest parcel locker engine run in a worker thread, so they do not stall the event loop.
+    """
+
+    def __init__(self, locker_repo: AsyncLockerRepository, client_repo: AsyncClientRepository,
+                 package_repo: AsyncPackageRepository, parcel_locker_repo: AsyncParcelLockerRepository,
+                 connection_manager: AsyncMySQLConnectionManager,
+                 nearest_engine: NearestParcelLockerEngine | None = None,
+                 availability_repo: AsyncLockerAvailabilityRepository | None = None,
+                 idempotency_repo: AsyncIdempotencyKeyRepository | None = None):
+        """
+        Initializes the AsyncParcelLockerService with repository and connection manager dependencies.
+
+        :param locker_repo: Repository for managing lockers.
+        :param client_repo: Repository for managing client data.
+        :param package_repo: Repository for managing packages.
+        :param parcel_locker_repo: Repository for managing parcel lockers.
+        :param connection_manager: Database connection manager.
+        :param nearest_engine: Engine for batch nearest parcel locker queries; a private one is created if not given.
+        :param availability_repo: Repository for the free locker counters; created from the connection
+                                  manager if not given.
+        :param idempotency_repo: Repository for the idempotency keys of sent packages; created from the
+                                 connection manager, without a cache, if not given.
+        """
+        self.locker_repo = locker_repo
+        self.client_repo = client_repo
+        self.package_repo = package_repo
+        self.parcel_locker_repo = parcel_locker_repo
+        self._connection_manager = connection_manager
+        self.nearest_engine = nearest_engine if nearest_engine is not None else NearestParcelLockerEngine()
+        self.availability_repo = availability_repo if availability_repo is not None \
+            else AsyncLockerAvailabilityRepository(connection_manager)
+        self.idempotency_repo = idempotency_repo if idempotency_repo is not None \
+            else AsyncIdempotencyKeyRepository(connection_manager)
+        self._engine_lock = asyncio.Lock()
+
+    async def find_client_location(self, client_id: int) -> tuple[float, float]:
+        """
+        Finds the geographical location of a client by ID.
+
+        :param client_id: The ID of the client.
+        :return: A tuple containing the latitude and longitude of the client.
+        """
+        client = await self.client_repo.find_by_id(client_id)
+        return client.latitude, client.longitude
+
+    async def find_nearest_parcel_lockers_batch(self, client_ids: list[int], k: int,
+                                                max_distance: float | None = None) -> dict[int, list[tuple] | None]:
+        """
+        Finds the k nearest parcel lockers for many clients at once.
+
+        Concurrent requests arriving before the engine is loaded wait for a single load instead of each
+        reading all parcel lockers.
+
+        :param client_ids: The IDs of the clients.
+        :param k: The maximum number of parcel lockers to return for each client.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers), or None for no limit.
+        :return: A dictionary mapping each client ID to a list of tuples containing the ID, city, and distance
+                 of a parcel locker, nearest first, or to None if the client or their location is not found.
+        """
+        if not self.nearest_engine.is_built:
+            async with self._engine_lock:
+                if not self.nearest_engine.is_built:
+                    parcel_lockers = await self.parcel_locker_repo.find_all()
+                    await asyncio.to_thread(self.nearest_engine.rebuild, parcel_lockers)
+
+        clients = await self.client_repo.find_by_ids(client_ids)
+        located = [client for client in clients.values()
+                   if client.latitude is not None and client.longitude is not None]
+        nearest = await asyncio.to_thread(self.nearest_engine.find_nearest,
+                                          [(client.latitude, client.longitude) for client in located],
+                                          k, max_distance)
+
+        result: dict[int, list[tuple] | None] = dict.fromkeys(client_ids)
+        result.update({client.id_: parcel_lockers for client, parcel_lockers in zip(located, nearest)})
+        return result
+
+    @async_transactional
+    async def send_package(self, client_id: int, receiver_id: int, max_distance: float, size: Enum) -> int:
+        """
+        Sends a package to the nearest parcel locker with available slots, like `ParcelLockerService.send_package`.
+
+        :param client_id: The ID of the sender.
+        :param receiver_id: The ID of the receiver.
+        :param max_distance: The maximum distance to search for parcel lockers.
+        :param size: Size of the package.
+        :return: The ID of the created package.
+        :raises ValueError: If the sender or the receiver, or parcel lockers or available slots are not found.
+        """
+        size = size.value if isinstance(size, Enum) else size
+        clients = await self.client_repo.find_by_ids([client_id, receiver_id])
+        if client_id not in clients:
+            raise ValueError("No sender found")
+        if receiver_id not in clients:
+            raise ValueError("No receiver found")
+
+        sender = clients[client_id]
+        async for parcel_locker_id in self._available_parcel_lockers(sender.latitude, sender.longitude,
+                                                                     max_distance, size):
+            locker_ids = await self.locker_repo.reserve_lockers(size, parcel_locker_id, 1)
+            if locker_ids:
+                await self.availability_repo.adjust(parcel_locker_id, size, -1)
+                package = Package(
+                    sender_id=client_id,
+                    receiver_id=receiver_id,
+                    parcel_locker_id=parcel_locker_id,
+                    locker_id=locker_ids[0],
+                    status="In locker",
+                    size=size,
+                    created_at=datetime.now()
+                )
+                package = await self.package_repo.insert(package)
+                await self.locker_repo.assign_lockers([(locker_ids[0], package, receiver_id)])
+                return package
+
+        if not await self.parcel_locker_repo.find_parcel_lockers_within(sender.latitude, sender.longitude,
+                                                                         max_distance):
+            raise ValueError("No parcel lockers found")
+        raise ValueError("No available slots found")
+
+    @async_transactional
+    async def send_packages(self, requests: list[tuple[int, int, float, Enum | str]]
+                            ) -> list[tuple[int | None, str | None]]:
+        """
+        Sends many packages at once in a single transaction, like `ParcelLockerService.send_packages`.
+
+        :param requests: Tuples containing the ID of the sender, the ID of the receiver, the maximum distance to
+                         search for parcel lockers and the size of a package.
+        :return: One tuple per request, in the same order, containing the ID of the created package and None,
+                 or None and the reason the package was not sent.
+        """
+        requests = [(client_id, receiver_id, max_distance, size.value if isinstance(size, Enum) else size)
+                    for client_id, receiver_id, max_distance, size in requests]
+        clients = await self.client_repo.find_by_ids([client_id for request in requests for client_id in request[:2]])
+        results, groups = plan_packages(requests, clients)
+
+        reservations: list[tuple[int, int, int]] = []
+        for (latitude, longitude, max_distance, size), indexes in groups.items():
+            async for parcel_locker_id in self._available_parcel_lockers(latitude, longitude, max_distance, size,
+                                                                         len(indexes)):
+                locker_ids = await self.locker_repo.reserve_lockers(size, parcel_locker_id, len(indexes))
+                if locker_ids:
+                    await self.availability_repo.adjust(parcel_locker_id, size, -len(locker_ids))
+                    reservations.extend(zip(indexes, [parcel_locker_id] * len(locker_ids), locker_ids))
+                    indexes = indexes[len(locker_ids):]
+                if not indexes:
+                    break
+
+            if indexes:
+                error = "No available slots found" if await self.parcel_locker_repo.find_parcel_lockers_within(
+                    latitude, longitude, max_distance) else "No parcel lockers found"
+                for index in indexes:
+                    results[index] = (None, error)
+
+        if not reservations:
+            return results
+
+        await self.package_repo.insert_many(build_packages(requests, reservations))
+        package_ids = await self.package_repo.find_ids_in_lockers([locker_id for _, _, locker_id in reservations])
+        await self.locker_repo.assign_lockers([(locker_id, package_ids[locker_id], requests[index][1])
+                                               for index, _, locker_id in reservations])
+        for index, _, locker_id in reservations:
+            results[index] = (package_ids[locker_id], None)
+        return results
+
+    async def send_package_once(self, idempotency_key: str, client_id: int, receiver_id: int, max_distance: float,
+                                size: Enum) -> tuple[int, bool]:
+        """
+        Sends a package at most once per idempotency key, like `ParcelLockerService.send_package_once`.
+
+        :param idempotency_key: The Idempotency-Key header of the request.
+        :param client_id: The ID of the sender.
+        :param receiver_id: The ID of the receiver.
+        :param max_distance: The maximum distance to search for parcel lockers.
+        :param size: Size of the package.
+        :return: A tuple containing the ID of the package and whether it was created by an earlier request.
+        :raises IdempotencyKeyReused: If the key was used for a different request.
+        :raises ValueError: If the sender or the receiver, or parcel lockers or available slots are not found.
+        """
+        size = size.value if isinstance(size, Enum) else size
+        fingerprint = request_fingerprint(client_id, receiver_id, max_distance, size)
+        stored = await self.idempotency_repo.find(idempotency_key)
+        if stored is None:
+            return await self._send_package_once(idempotency_key, fingerprint, client_id, receiver_id,
+                                                 max_distance, size)
+
+        stored_fingerprint, package_id = stored
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("The idempotency key was used for a different request")
+        return package_id, True
+
+    @async_transactional
+    async def _send_package_once(self, idempotency_key: str, fingerprint: str, client_id: int, receiver_id: int,
+                                 max_distance: float, size: str) -> tuple[int, bool]:
+        """
+        Claims an idempotency key and sends the package in the same transaction, unless the key was used before.
+
+        :param idempotency_key: The Idempotency-Key header of the request.
+        :param fingerprint: The fingerprint of the request.
+        :param client_id: The ID of the sender.
+        :param receiver_id: The ID of the receiver.
+        :param max_distance: The maximum distance to search for parcel lockers.
+        :param size: Size of the package.
+        :return: A tuple containing the ID of the package and whether it was created by an earlier request.
+        :raises IdempotencyKeyReused: If the key was used for a different request.
+        """
+        stored_fingerprint, package_id = await self.idempotency_repo.claim(idempotency_key, fingerprint)
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("The idempotency key was used for a different request")
+        if package_id is not None:
+            return package_id, True
+
+        package_id = await self.send_package(client_id, receiver_id, max_distance, size)
+        await self.idempotency_repo.complete(idempotency_key, fingerprint, package_id)
+        return package_id, False
+
+    async def _available_parcel_lockers(self, latitude: float, longitude: float, max_distance: float, size: str,
+                                        limit: int = 5) -> AsyncIterator[int]:
+        """
+        Yields the IDs of the parcel lockers within a distance from a point that have a free locker of a size,
+        nearest first, like `ParcelLockerService._available_parcel_lockers`.
+
+        :param latitude: Latitude of the point.
+        :param longitude: Longitude of the point.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param size: Size of the locker (e.g., small, medium, large).
+        :param limit: The number of parcel lockers read by the first query.
+        :return: An asynchronous generator of parcel locker IDs.
+        """
+        yielded: set[int] = set()
+        for counted in (True, False):
+            batch = limit
+            while True:
+                parcel_lockers = await self.parcel_locker_repo.find_available_parcel_lockers_within(
+                    latitude, longitude, max_distance, size, batch, counted
+                )
+                for parcel_locker in parcel_lockers:
+                    if parcel_locker[0] not in yielded:
+                        yielded.add(parcel_locker[0])
+                        yield parcel_locker[0]
+                if len(parcel_lockers) < batch:
+                    break
+                batch *= 4
+
+    @async_transactional
+    async def receive_package(self, package_id: int) -> None:
+        """
+        Marks a package as received and updates the locker status to available, in a single transaction.
+
+        :param package_id: The ID of the package to receive.
+        :raises ValueError: If the package or its associated locker is not found.
+        """
+        package = await self.package_repo.find_by_id(package_id)
+        if not package:
+            raise ValueError("No package found")
+
+        locker_to_use = await self.locker_repo.find_by_id(package.locker_id)
+        if not locker_to_use:
+            raise ValueError("No locker_to_use found")
+
+        package.status = "Received"
+        package.delivered_at = datetime.now()
+        await self.package_repo.update(package_id, package)
+
+        if locker_to_use.status != "Available":
+            await self.availability_repo.adjust(locker_to_use.parcel_locker_id, locker_to_use.size, 1)
+        locker_to_use.status = "Available"
+        locker_to_use.package_id = None
+        locker_to_use.client_id = None
+        await self.locker_repo.update(locker_to_use.id_, locker_to_use)
+
+    async def add_parcel_locker(self, city: str, postal_code: str, latitude: float, longitude: float) -> int:
+        """
+        Creates a new ParcelLocker object and inserts it into the database and the nearest parcel locker engine.
+
+        :param city: The name of the city where the parcel locker is located
+        :param postal_code: The postal code of the parcel locker
+        :param latitude: The latitude coordinate
+        :param longitude: The longitude coordinate
+        :return: The ID of the newly added record in the database
+        """
+        parcel_locker = ParcelLocker(
+            city=city,
+            postal_code=postal_code,
+            latitude=latitude,
+            longitude=longitude
+        )
+
+        new_parcel_locker = await self.parcel_locker_repo.insert(parcel_locker)
+        parcel_locker.id_ = new_parcel_locker
+        self.nearest_engine.add(parcel_locker)
+        return new_parcel_locker
+
+    @async_transactional
+    async def add_locker(self, parcel_locker_id: int, package_id: int | None, client_id: int | None, size: str,
+                         status: str) -> int:
+        """
+        Creates a new Locker object and inserts it into the database, counting it as free if it is available.
+
+        :param parcel_locker_id: The ID of the parcel locker this locker belongs to.
+        :param package_id: The ID of the package inside this locker (optional).
+        :param client_id: The ID of the client (optional).
+        :param size: The size of the locker (e.g., S, M, L).
+        :param status: The status of the locker (e.g., 'EMPTY', 'OCCUPIED').
+        :return: The ID of the newly added record in the database.
+        """
+        locker = Locker(
+            parcel_locker_id=parcel_locker_id,
+            package_id=package_id,
+            client_id=client_id,
+            size=size,
+            status=status
+        )
+
+        new_locker = await self.locker_repo.insert(locker)
+        if status == "Available":
+            await self.availability_repo.adjust(parcel_locker_id, size, 1)
+        return new_locker
+
+    async def find_availability(self, parcel_locker_id: int) -> dict[str, int] | None:
+        """
+        Finds the number of free lockers of each size in a parcel locker.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :return: A dictionary mapping every locker size to the number of free lockers,
+                 or None if the parcel locker does not exist.
+        """
+        availability = await self.availability_repo.find_by_parcel_locker(parcel_locker_id)
+        if not availability and await self.parcel_locker_repo.find_by_id(parcel_locker_id) is None:
+            return None
+        return {size.value: availability.get(size.value, 0) for size in Size}
+
+    def iter_packages(self, after_id: int = 0, limit: int = 100, status: str | None = None, size: str | None = None,
+                      receiver_id: int | None = None, created_from: datetime | None = None,
+                      created_to: datetime | None = None) -> AsyncIterator[Package]:
+        """
+        Streams a page of packages ordered by ID, optionally filtered.
+
+        :param after_id: The ID of the last package of the previous page (default: 0, the first page).
+        :param limit: The maximum number of packages on the page.
+        :param status: Only packages with this status.
+        :param size: Only packages of this size.
+        :param receiver_id: Only packages sent to this client.
+        :param created_from: Only packages created at or after this time.
+        :param created_to: Only packages created before this time.
+        :return: An asynchronous generator of packages.
+        """
+        conditions = package_filters(status, size, receiver_id, created_from, created_to)
+        return self.package_repo.iter_page(after_id, limit, conditions)
+
+    def iter_parcel_lockers(self, after_id: int = 0, limit: int = 100,
+                            city: str | None = None) -> AsyncIterator[ParcelLocker]:
+        """
+        Streams a page of parcel lockers ordered by ID, optionally filtered by city.
+
+        :param after_id: The ID of the last parcel locker of the previous page (default: 0, the first page).
+        :param limit: The maximum number of parcel lockers on the page.
+        :param city: Only parcel lockers in this city.
+        :return: An asynchronous generator of parcel lockers.
+        """
+        conditions = [('city', '=', city)] if city is not None else []
+        return self.parcel_locker_repo.iter_page(after_id, limit, conditions)
+
+    def iter_lockers(self, parcel_locker_id: int, after_id: int = 0, limit: int = 100, status: str | None = None,
+                     size: str | None = None) -> AsyncIterator[Locker]:
+        """
+        Streams a page of the lockers of a parcel locker ordered by ID, optionally filtered.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :param after_id: The ID of the last locker of the previous page (default: 0, the first page).
+        :param limit: The maximum number of lockers on the page.
+        :param status: Only lockers with this status.
+        :param size: Only lockers of this size.
+        :return: An asynchronous generator of lockers.
+        """
+        conditions = locker_filters(parcel_locker_id, status, size)
+        return self.locker_repo.iter_page(after_id, limit, conditions)
@@ -0,0 +1,162 @@
+from app.src.entity import ParcelLocker
+from app.src.geo import EARTH_RADIUS
+from typing import Iterable, Sequence
+
+import numpy as np
+import threading
+
+
+class NearestParcelLockerEngine:
+    """
+    Finds the nearest parcel lockers for many points at once with vectorised NumPy calculations.
+
+    Parcel locker locations are kept as contiguous arrays of unit vectors. The cosine of the angle between
+    a point and a parcel locker is the dot product of their unit vectors, so ranking all parcel lockers
+    for a chunk of points is a single matrix product. The exact haversine distance is then calculated only
+    for the k best candidates of each point. Points are processed in chunks small enough to keep the matrix
+    under a size limit, which bounds memory usage.
+
+    The arrays and the cities are replaced together as one immutable snapshot, which queries read once,
+    so a query running during `rebuild` or `add` sees either the old or the new parcel lockers, never a mix.
+    """
+
+    def __init__(self, max_matrix_size: int = 1_000_000):
+        """
+        Initializes an empty engine; call `rebuild` before querying it.
+
+        :param max_matrix_size: The maximum number of point and parcel locker pairs ranked at once.
+        """
+        self._max_matrix_size = max_matrix_size
+        self._lock = threading.Lock()
+        self._snapshot: tuple[np.ndarray, np.ndarray, np.ndarray, list[str]] | None = None
+
+    @property
+    def is_built(self) -> bool:
+        """
+        Tells whether the engine has been loaded with parcel lockers.
+
+        :return: True if `rebuild` has been called.
+        """
+        return self._snapshot is not None
+
+    def rebuild(self, parcel_lockers: Iterable[ParcelLocker]) -> None:
+        """
+        Loads the locations of all parcel lockers into the engine.
+
+        :param parcel_lockers: All parcel lockers to search.
+        """
+        parcel_lockers = list(parcel_lockers)
+        snapshot = (*self._to_arrays(parcel_lockers), [parcel_locker.city for parcel_locker in parcel_lockers])
+        with self._lock:
+            self._snapshot = snapshot
+
+    def add(self, parcel_locker: ParcelLocker) -> None:
+        """
+        Adds a single parcel locker to an engine that has already been built.
+
+        :param parcel_locker: The parcel locker to add; it must have an ID.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return
+            *arrays, cities = self._snapshot
+            added = self._to_arrays([parcel_locker])
+            self._snapshot = (*(np.concatenate((current, new)) for current, new in zip(arrays, added)),
+                              [*cities, parcel_locker.city])
+
+    def find_nearest(self, points: Sequence[tuple[float, float]], k: int,
+                     max_distance: float | None = None) -> list[list[tuple[int, str, float]]]:
+        """
+        Finds the k nearest parcel lockers for each point.
+
+        :param points: A sequence of (latitude, longitude) pairs in degrees.
+        :param k: The maximum number of parcel lockers to return for each point.
+        :param max_distance: The maximum distance in kilometers, or None for no limit.
+        :return: For each point, a list of tuples containing the ID, city, and distance of a parcel locker,
+                 nearest first.
+        :raises ValueError: If the engine has not been built.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise ValueError("The nearest parcel locker engine has not been built")
+
+        ids, coordinates, vectors, cities = snapshot
+        if not len(points) or not len(ids):
+            return [[] for _ in points]
+
+        k = min(k, len(ids))
+        point_coordinates = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        point_vectors = _unit_vectors(point_coordinates)
+        min_cosine = -np.inf if max_distance is None else np.cos(min(max_distance / EARTH_RADIUS, np.pi))
+        chunk_size = max(1, self._max_matrix_size // len(ids))
+        results: list[list[tuple[int, str, float]]] = []
+
+        for start in range(0, len(point_vectors), chunk_size):
+            cosines = point_vectors[start:start + chunk_size] @ vectors.T
+            if k < len(ids):
+                nearest = np.argpartition(cosines, len(ids) - k, axis=1)[:, len(ids) - k:]
+            else:
+                nearest = np.broadcast_to(np.arange(len(ids)), cosines.shape)
+            in_range = np.take_along_axis(cosines, nearest, axis=1) > min_cosine
+
+            chunk_coordinates = point_coordinates[start:start + chunk_size, None, :]
+            distances = _haversine(chunk_coordinates[..., 0], chunk_coordinates[..., 1],
+                                   coordinates[nearest, 0], coordinates[nearest, 1])
+            if max_distance is not None:
+                in_range &= distances < max_distance
+            distances[~in_range] = np.inf
+            order = np.argsort(distances, axis=1, kind='stable')
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            distances = np.take_along_axis(distances, order, axis=1)
+
+            for row_indexes, row_distances in zip(nearest.tolist(), distances.tolist()):
+                results.append([(int(ids[i]), cities[i], distance)
+                                for i, distance in zip(row_indexes, row_distances) if distance != np.inf])
+        return results
+
+    @staticmethod
+    def _to_arrays(parcel_lockers: list[ParcelLocker]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Converts parcel lockers to arrays of IDs, coordinates in radians and unit vectors.
+
+        :param parcel_lockers: The parcel lockers to convert.
+        :return: A tuple of the three arrays.
+        """
+        ids = np.fromiter((parcel_locker.id_ for parcel_locker in parcel_lockers), dtype=np.int64,
+                          count=len(parcel_lockers))
+        coordinates = np.radians(np.array(
+            [(parcel_locker.latitude, parcel_locker.longitude) for parcel_locker in parcel_lockers],
+            dtype=np.float64
+        ).reshape(-1, 2))
+        return ids, coordinates, _unit_vectors(coordinates)
+
+
+def _unit_vectors(coordinates: np.ndarray) -> np.ndarray:
+    """
+    Converts coordinates to unit vectors in three dimensions.
+
+    :param coordinates: An array of (latitude, longitude) rows in radians.
+    :return: An array of (x, y, z) rows.
+    """
+    latitudes, longitudes = coordinates[:, 0], coordinates[:, 1]
+    return np.ascontiguousarray(np.column_stack((
+        np.cos(latitudes) * np.cos(longitudes),
+        np.cos(latitudes) * np.sin(longitudes),
+        np.sin(latitudes)
+    )))
+
+
+def _haversine(latitudes_1: np.ndarray, longitudes_1: np.ndarray,
+               latitudes_2: np.ndarray, longitudes_2: np.ndarray) -> np.ndarray:
+    """
+    Calculates great-circle distances element-wise, using the same formula as `app.src.geo.haversine`.
+
+    :param latitudes_1: Latitudes of the first points in radians.
+    :param longitudes_1: Longitudes of the first points in radians.
+    :param latitudes_2: Latitudes of the second points in radians.
+    :param longitudes_2: Longitudes of the second points in radians.
+    :return: The distances in kilometers.
+    """
+    a = (np.sin((latitudes_1 - latitudes_2) / 2) ** 2 +
+         np.cos(latitudes_1) * np.cos(latitudes_2) * np.sin((longitudes_1 - longitudes_2) / 2) ** 2)
+    return EARTH_RADIUS * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,306 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Iterable, override
+
+import pickle
+import threading
+import time
+import os
+
+
+class Cache(ABC):
+    """
+    Abstract base class for the entity caches used by repositories.
+
+    A cache maps string keys to values for a limited time and keeps hit, miss and eviction counters.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieves a value from the cache.
+
+        :param key: The key of the value.
+        :return: The cached value, or None if the key is missing or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value in the cache.
+
+        :param key: The key of the value.
+        :param value: The value to store; must not be None.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Removes a value from the cache, if it is there.
+
+        :param key: The key of the value.
+        """
+        pass
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Retrieves several values from the cache.
+
+        :param keys: The keys of the values.
+        :return: A dictionary with the cached values of the keys that were found.
+        """
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the cache.
+
+        :return: A dictionary with at least the number of hits, misses and evictions.
+        """
+        pass
+
+
+class LRUCache(Cache):
+    """
+    In-process cache with a maximum size and a time to live, evicting the least recently used values first.
+
+    The cache is shared by all threads of a worker process and guarded by a lock.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 60.0):
+        """
+        Initializes an empty cache.
+
+        :param max_size: The maximum number of values kept in the cache.
+        :param ttl: The number of seconds a value is served from the cache after it is stored.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._values: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @override
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieves a value from the cache and marks it as recently used; expired values are dropped.
+
+        :param key: The key of the value.
+        :return: The cached value, or None if the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._values[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._values.move_to_end(key)
+            self._hits += 1
+            return value
+
+    @override
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value in the cache, evicting the least recently used values if the cache is full.
+
+        :param key: The key of the value.
+        :param value: The value to store; must not be None.
+        """
+        with self._lock:
+            self._values[key] = (time.monotonic() + self._ttl, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self._max_size:
+                self._values.popitem(last=False)
+                self._evictions += 1
+
+    @override
+    def delete(self, key: str) -> None:
+        """
+        Removes a value from the cache, if it is there.
+
+        :param key: The key of the value.
+        """
+        with self._lock:
+            self._values.pop(key, None)
+
+    @override
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the cache.
+
+        :return: A dictionary with the size of the cache, the number of hits and misses, the hit ratio,
+                 and the number of values evicted to make room and dropped after expiring.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'lru',
+                'size': len(self._values),
+                'max_size': self._max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+    def __len__(self) -> int:
+        """
+        Returns the number of values in the cache, including expired ones that were not dropped yet.
+
+        :return: The number of cached values.
+        """
+        return len(self._values)
+
+
+class RedisCache(Cache):
+    """
+    Cache kept in a shared key-value store, so all workers and instances of the service see the same values.
+
+    The store is accessed through a client with the interface of redis-py (`get`, `set` with `ex`,
+    `delete` and `mget`); values are pickled. Expiry and eviction are left to the store,
+    so evictions are not counted.
+    """
+
+    def __init__(self, client: Any, ttl: float = 60.0, prefix: str = 'parcel_lockers:'):
+        """
+        Initializes the cache on top of a store client.
+
+        :param client: A redis-py compatible client.
+        :param ttl: The number of seconds a value is kept in the store after it is stored.
+        :param prefix: A prefix added to every key, separating these values from other data in the store.
+        """
+        self._client = client
+        self._ttl = ttl
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @override
+    def get(self, key: str) -> Any | None:
+        """
+        Retrieves a value from the store.
+
+        :param key: The key of the value.
+        :return: The cached value, or None if the key is missing or expired.
+        """
+        data = self._client.get(self._prefix + key)
+        self._count(hits=data is not None)
+        return pickle.loads(data) if data is not None else None
+
+    @override
+    def set(self, key: str, value: Any) -> None:
+        """
+        Stores a value in the store with the time to live of the cache.
+
+        :param key: The key of the value.
+        :param value: The value to store; must not be None.
+        """
+        self._client.set(self._prefix + key, pickle.dumps(value), ex=max(1, int(self._ttl)))
+
+    @override
+    def delete(self, key: str) -> None:
+        """
+        Removes a value from the store, if it is there.
+
+        :param key: The key of the value.
+        """
+        self._client.delete(self._prefix + key)
+
+    @override
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Retrieves several values from the store in a single round trip.
+
+        :param keys: The keys of the values.
+        :return: A dictionary with the cached values of the keys that were found.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        values = {key: pickle.loads(data)
+                  for key, data in zip(keys, self._client.mget([self._prefix + key for key in keys]))
+                  if data is not None}
+        with self._lock:
+            self._hits += len(values)
+            self._misses += len(keys) - len(values)
+        return values
+
+    @override
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the cache as seen by this process.
+
+        :return: A dictionary with the number of hits and misses and the hit ratio.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'redis',
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': 0
+            }
+
+    def _count(self, hits: bool) -> None:
+        """
+        Records a single lookup in the statistics.
+
+        :param hits: Whether the lookup found a value.
+        """
+        with self._lock:
+            if hits:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+
+def create_entity_caches() -> dict[str, Cache]:
+    """
+    Creates the entity caches configured by the environment, as described in `ServiceContainer`.
+
+    The 'idempotency_key' cache keeps the completed idempotency keys for as long as they are remembered.
+
+    :return: A dictionary with the 'client', 'parcel_locker' and 'idempotency_key' caches,
+             empty if ENTITY_CACHE is 'none'.
+    :raises ValueError: If ENTITY_CACHE names an unknown backend.
+    """
+    backend = os.getenv('ENTITY_CACHE', 'lru')
+    ttls = {
+        'client': float(os.getenv('CLIENT_CACHE_TTL', 60)),
+        'parcel_locker': float(os.getenv('PARCEL_LOCKER_CACHE_TTL', 3600)),
+        'idempotency_key': float(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))
+    }
+    match backend:
+        case 'none':
+            return {}
+        case 'lru':
+            max_size = int(os.getenv('ENTITY_CACHE_SIZE', 10_000))
+            return {name: LRUCache(max_size, ttl) for name, ttl in ttls.items()}
+        case 'redis':
+            import redis
+            client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+            return {name: RedisCache(client, ttl) for name, ttl in ttls.items()}
+        case _:
+            raise ValueError(f'Unknown entity cache backend: {backend}')
@@ -4,26 +4,205 @@ from app.src.repository import (
     ClientRepository,
     PackageRepository,
     ParcelLockerRepository,
+    IdempotencyKeyRepository,
 )
 from app.src.service import ParcelLockerService
+from app.src.geo_index import ParcelLockerIndex, GridParcelLockerIndex
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.cache import Cache, create_entity_caches
+from typing import Any
+
+import threading
+import os
+
+
+class ServiceContainer:
+    """
+    Application-scoped container for the long-lived dependencies of the parcel lockers service.
+
+    The MySQL connection pool, the optional parcel locker index and the batch nearest parcel locker engine
+    are created lazily, once per worker process, and shared by every request handled by that worker. Repositories and services are lightweight
+    and keep per-call cursor state, so they are still built per request on top of the shared resources.
+
+    Environment variables used:
+    - PARCEL_LOCKER_INDEX: Set to 'grid' to answer nearest parcel locker queries from an in-memory index.
+    - PARCEL_LOCKER_INDEX_CELL_SIZE: Size of a grid cell of the index in degrees (default: 0.25).
+    - ENTITY_CACHE: Backend of the client and parcel locker caches: 'lru' (default), 'redis' or 'none'.
+    - ENTITY_CACHE_SIZE: Maximum number of entities kept by each in-process cache (default: 10000).
+    - CLIENT_CACHE_TTL: Seconds a client is served from the cache (default: 60).
+    - PARCEL_LOCKER_CACHE_TTL: Seconds a parcel locker is served from the cache (default: 3600).
+    - REDIS_URL: URL of the Redis server used by the 'redis' cache backend.
+    - IDEMPOTENCY_KEY_TTL: Seconds an Idempotency-Key of a sent package is remembered (default: 86400).
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty container; the shared resources are created on first use.
+        """
+        self._lock = threading.RLock()
+        self._connection_manager: MySQLConnectionManager | None = None
+        self._parcel_locker_index: ParcelLockerIndex | None = None
+        self._nearest_engine: NearestParcelLockerEngine | None = None
+        self._caches: dict[str, Cache] | None = None
+        self._pid: int | None = None
+
+    @property
+    def connection_manager(self) -> MySQLConnectionManager:
+        """
+        Returns the connection manager of the current worker process, creating it on first access.
+
+        A pool inherited through fork() shares sockets with the parent process, so a new pool
+        is created whenever the container is used from a different process than the one that built it.
+
+        :return: The shared `MySQLConnectionManager` instance.
+        """
+        if self._connection_manager is None or self._pid != os.getpid():
+            with self._lock:
+                self._reset_after_fork()
+                if self._connection_manager is None:
+                    self._connection_manager = MySQLConnectionManager()
+        return self._connection_manager
+
+    @property
+    def parcel_locker_index(self) -> ParcelLockerIndex | None:
+        """
+        Returns the in-memory parcel locker index, building it from the database on first access.
+
+        :return: The shared index, or None if PARCEL_LOCKER_INDEX is not set to 'grid'.
+        """
+        if os.getenv('PARCEL_LOCKER_INDEX') != 'grid':
+            return None
+
+        if self._parcel_locker_index is None or self._pid != os.getpid():
+            with self._lock:
+                self._reset_after_fork()
+                if self._parcel_locker_index is None:
+                    index = GridParcelLockerIndex(float(os.getenv('PARCEL_LOCKER_INDEX_CELL_SIZE', 0.25)))
+                    index.rebuild(ParcelLockerRepository(self.connection_manager,
+                                                         ClientRepository(self.connection_manager)).find_all())
+                    self._parcel_locker_index = index
+        return self._parcel_locker_index
+
+    @property
+    def nearest_engine(self) -> NearestParcelLockerEngine:
+        """
+        Returns the engine for batch nearest parcel locker queries; it is loaded on its first query.
+
+        :return: The shared `NearestParcelLockerEngine` instance.
+        """
+        if self._nearest_engine is None or self._pid != os.getpid():
+            with self._lock:
+                self._reset_after_fork()
+                if self._nearest_engine is None:
+                    self._nearest_engine = NearestParcelLockerEngine()
+        return self._nearest_engine
+
+    @property
+    def caches(self) -> dict[str, Cache]:
+        """
+        Returns the entity caches of the current worker process, creating them on first access.
+
+        :return: A dictionary with the 'client', 'parcel_locker' and 'idempotency_key' caches,
+                 empty if ENTITY_CACHE is 'none'.
+        """
+        if self._caches is None or self._pid != os.getpid():
+            with self._lock:
+                self._reset_after_fork()
+                if self._caches is None:
+                    self._caches = create_entity_caches()
+        return self._caches
+
+    def create_parcel_locker_service(self) -> ParcelLockerService:
+        """
+        Creates an instance of ParcelLockerService backed by the shared connection pool and caches.
+
+        :return: An instance of ParcelLockerService.
+        """
+        connection_manager = self.connection_manager
+        caches = self.caches
+        locker_repo = LockerRepository(connection_manager)
+        client_repo = ClientRepository(connection_manager, caches.get('client'))
+        package_repo = PackageRepository(connection_manager)
+        parcel_locker_repo = ParcelLockerRepository(connection_manager, client_repo, self.parcel_locker_index,
+                                                    caches.get('parcel_locker'))
+
+        return ParcelLockerService(
+            locker_repo=locker_repo,
+            client_repo=client_repo,
+            package_repo=package_repo,
+            parcel_locker_repo=parcel_locker_repo,
+            connection_manager=connection_manager,
+            nearest_engine=self.nearest_engine,
+            idempotency_repo=IdempotencyKeyRepository(connection_manager, caches.get('idempotency_key'),
+                                                      float(os.getenv('IDEMPOTENCY_KEY_TTL', 86400)))
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns health and usage statistics of the shared resources.
+
+        :return: A dictionary describing the database connection pool, or only its status
+                 if the pool has not been created yet, the size of the parcel locker index if it is built,
+                 and the statistics of the entity caches if they are created.
+        """
+        if self._connection_manager is None or self._pid != os.getpid():
+            return {'database': {'status': 'not initialized'}}
+
+        healthy = self._connection_manager.is_healthy()
+        stats: dict[str, Any] = {
+            'database': {
+                'status': 'up' if healthy else 'down',
+                **self._connection_manager.stats()
+            }
+        }
+        if self._parcel_locker_index is not None:
+            stats['parcel_locker_index'] = {'size': len(self._parcel_locker_index)}
+        if self._caches:
+            stats['caches'] = {name: cache.stats() for name, cache in self._caches.items()}
+        return stats
+
+    def warm_up(self) -> None:
+        """
+        Creates the shared resources eagerly, so the first request does not have to wait for them.
+        """
+        _ = self.connection_manager
+        _ = self.parcel_locker_index
+
+    def shutdown(self) -> None:
+        """
+        Closes the connection pool of the current worker process and drops the shared resources.
+        """
+        with self._lock:
+            if self._connection_manager is not None and self._pid == os.getpid():
+                self._connection_manager.close()
+            self._connection_manager = None
+            self._parcel_locker_index = None
+            self._nearest_engine = None
+            self._caches = None
+            self._pid = None
+
+    def _reset_after_fork(self) -> None:
+        """
+        Drops the resources inherited from a parent process, so they are recreated in the current one.
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            self._connection_manager = None
+            self._parcel_locker_index = None
+            self._nearest_engine = None
+            self._caches = None
+            self._pid = pid
+
+
+container = ServiceContainer()
 
 
 def create_parcel_locker_service() -> ParcelLockerService:
     """
     Creates and returns an instance of ParcelLockerService with initialized repositories.
 
+    All services returned by this function share the connection pool of the application-scoped container.
+
     :return: An instance of ParcelLockerService.
     """
-    connection_manager = MySQLConnectionManager()
-    locker_repo = LockerRepository(connection_manager)
-    client_repo = ClientRepository(connection_manager)
-    package_repo = PackageRepository(connection_manager)
-    parcel_locker_repo = ParcelLockerRepository(connection_manager, client_repo)
-
-    return ParcelLockerService(
-        locker_repo=locker_repo,
-        client_repo=client_repo,
-        package_repo=package_repo,
-        parcel_locker_repo=parcel_locker_repo,
-        connection_manager=connection_manager
-    )
+    return container.create_parcel_locker_service()
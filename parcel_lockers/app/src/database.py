@@ -1,11 +1,21 @@
 from dotenv import load_dotenv
 from mysql.connector import pooling, MySQLConnection
-from typing import Callable, Any
+from mysql.connector.errors import PoolError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator, Any
 
+import threading
+import logging
+import time
 import os
 
 load_dotenv()
 
+_transaction: ContextVar[tuple['MySQLConnectionManager', MySQLConnection, list[Callable[[], None]]] | None] = \
+    ContextVar('transaction', default=None)
+
 
 class MySQLConnectionManager:
     """
@@ -26,6 +36,11 @@ class MySQLConnectionManager:
         - DB_USER: Username for database authentication.
         - DB_PASSWORD: Password for database authentication.
         - DB_PORT: Port for connecting to the database (default: 3307).
+        - DB_POOL_TIMEOUT: Seconds to wait for a free connection when the pool is exhausted (default: 5).
+        - DB_PREPARED_STATEMENTS: Set to 'true' to execute queries through server-side prepared statements
+          (default: false). Every repository call opens a new cursor and pooled connections are reset
+          when they are returned, so a statement is prepared again on each call and this only pays off
+          for calls that execute the same statement many times on one cursor.
         """
         self._pool = pooling.MySQLConnectionPool(
             pool_name='mysql_pool',
@@ -36,14 +51,183 @@ class MySQLConnectionManager:
             password=os.getenv('DB_PASSWORD'),
             port=int(os.getenv('DB_PORT', 3307))
         )
+        self._timeout = float(os.getenv('DB_POOL_TIMEOUT', 5))
+        self.prepared_statements = os.getenv('DB_PREPARED_STATEMENTS', 'false').lower() == 'true'
+        self._stats_lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+        self._exhausted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
 
     def get_connection(self) -> MySQLConnection:
         """
         Retrieves a connection from the pool.
 
+        When every pooled connection is in use, the call waits for one to be returned
+        for up to DB_POOL_TIMEOUT seconds (default: 5) before giving up. The connection is returned to the pool
+        by closing it, which the manager counts to know how many pooled connections are idle.
+
         :return: A MySQLConnection instance.
+        :raises PoolError: If no connection becomes available within the timeout.
+        """
+        started = time.perf_counter()
+        deadline = started + self._timeout
+        exhausted = False
+        while True:
+            try:
+                connection = self._pool.get_connection()
+                break
+            except PoolError:
+                exhausted = True
+                if time.perf_counter() >= deadline:
+                    self._record_checkout(time.perf_counter() - started, exhausted)
+                    raise
+                time.sleep(0.005)
+
+        self._record_checkout(time.perf_counter() - started, exhausted)
+        connection.close = self._counting_close(connection.close)
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[MySQLConnection]:
+        """
+        Runs a block of code as a single unit of work on one connection.
+
+        Every repository method decorated with `with_db_connection` and called inside the block
+        reuses this connection instead of checking out its own, and nothing is committed until
+        the block ends. The transaction is committed when the block completes and rolled back
+        if it raises. A nested call joins the transaction that is already open.
+
+        :return: The connection used by the unit of work.
+        """
+        connection = self.current_transaction()
+        if connection is not None:
+            yield connection
+            return
+
+        after_commit: list[Callable[[], None]] = []
+        with self.get_connection() as connection:
+            token = _transaction.set((self, connection, after_commit))
+            try:
+                yield connection
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                _transaction.reset(token)
+
+        for callback in after_commit:
+            callback()
+
+    def current_transaction(self) -> MySQLConnection | None:
         """
-        return self._pool.get_connection()
+        Returns the connection of the unit of work open in the current context.
+
+        :return: The connection of the open transaction, or None if no transaction is open for this manager.
+        """
+        transaction = _transaction.get()
+        if transaction is None or transaction[0] is not self:
+            return None
+        return transaction[1]
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Runs a callback once the changes made so far are committed.
+
+        Inside a transaction the callback runs after the transaction commits, and is dropped if it rolls back;
+        outside a transaction every change is already committed, so the callback runs immediately.
+
+        :param callback: The function to call, without arguments.
+        """
+        transaction = _transaction.get()
+        if transaction is None or transaction[0] is not self:
+            callback()
+        else:
+            transaction[2].append(callback)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the connection pool.
+
+        :return: A dictionary with the pool size, the number of idle connections, the number of checkouts,
+                 how many of them found the pool exhausted, and the average and maximum wait time in milliseconds.
+        """
+        with self._stats_lock:
+            return {
+                'pool_size': self._pool.pool_size,
+                'idle_connections': self._pool.pool_size - self._in_use,
+                'checkouts': self._checkouts,
+                'exhausted': self._exhausted,
+                'avg_wait_ms': self._total_wait / self._checkouts * 1000 if self._checkouts else 0.0,
+                'max_wait_ms': self._max_wait * 1000
+            }
+
+    def is_healthy(self) -> bool:
+        """
+        Checks whether a connection can be obtained from the pool and the server responds to a ping.
+
+        :return: True if the database is reachable, False otherwise.
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """
+        Closes all idle connections held by the pool.
+
+        Meant to be called once on worker shutdown, after the last request has been served. mysql-connector-python
+        has no public method for it, so this relies on `MySQLConnectionPool._remove_connections` of the version
+        pinned in Pipfile.lock (26.7.0); if a later version drops it, the connections are left to be closed
+        when the worker exits.
+        """
+        remove_connections = getattr(self._pool, '_remove_connections', None)
+        if remove_connections is None:
+            logging.warning('Cannot close the connections of pool %s with this mysql-connector-python version',
+                            self._pool.pool_name)
+            return
+        remove_connections()
+
+    def _counting_close(self, close: Callable[[], None]) -> Callable[[], None]:
+        """
+        Wraps the `close` method of a checked-out connection, so returning it to the pool is counted once.
+
+        :param close: The `close` method of the pooled connection.
+        :return: The method replacing it.
+        """
+        with self._stats_lock:
+            self._in_use += 1
+        returned = False
+
+        def counting_close() -> None:
+            nonlocal returned
+            try:
+                close()
+            finally:
+                if not returned:
+                    returned = True
+                    with self._stats_lock:
+                        self._in_use -= 1
+
+        return counting_close
+
+    def _record_checkout(self, wait: float, exhausted: bool) -> None:
+        """
+        Records a single connection checkout in the pool statistics.
+
+        :param wait: Time in seconds spent waiting for the connection.
+        :param exhausted: Whether the pool had no idle connection when the checkout started.
+        """
+        with self._stats_lock:
+            self._checkouts += 1
+            self._exhausted += exhausted
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
 
 
 def with_db_connection(func: Callable) -> Callable:
@@ -52,10 +236,13 @@ def with_db_connection(func: Callable) -> Callable:
 
     This decorator wraps a function, providing it with a database connection and cursor.
     It ensures proper connection management, including committing transactions or rolling back in case of exceptions.
+    Inside `MySQLConnectionManager.transaction` the connection of the transaction is reused and committing
+    or rolling back is left to the transaction.
 
     :param func: The function to wrap, which expects access to `self._conn` and `self._cursor`.
     :return: The wrapped function.
     """
+    @wraps(func)
     def wrapper(self, *args: Any, **kwargs: Any) -> Any:
         """
         Wrapper function that injects a database connection and cursor into the wrapped function.
@@ -66,8 +253,19 @@ def with_db_connection(func: Callable) -> Callable:
         :return: The result of the wrapped function.
         :raises Exception: Propagates any exceptions after rolling back the transaction.
         """
+        transaction_connection = self._connection_manager.current_transaction()
+        if transaction_connection is not None:
+            previous_conn, previous_cursor = getattr(self, '_conn', None), getattr(self, '_cursor', None)
+            with transaction_connection.cursor(prepared=self._connection_manager.prepared_statements) as cursor:
+                try:
+                    self._conn = transaction_connection
+                    self._cursor = cursor
+                    return func(self, *args, **kwargs)
+                finally:
+                    self._conn, self._cursor = previous_conn, previous_cursor
+
         with (self._connection_manager.get_connection() as conn,
-              conn.cursor() as cursor):
+              conn.cursor(prepared=self._connection_manager.prepared_statements) as cursor):
             try:
                 self._conn = conn
                 self._cursor = cursor
@@ -81,3 +279,28 @@ def with_db_connection(func: Callable) -> Callable:
 
     return wrapper
 
+
+def transactional(func: Callable) -> Callable:
+    """
+    Decorator to run a service method as a single unit of work.
+
+    All repository calls made by the wrapped method share one connection and are committed together,
+    or rolled back together if the method raises.
+
+    :param func: The function to wrap, which expects access to `self._connection_manager`.
+    :return: The wrapped function.
+    """
+    @wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Wrapper function that runs the wrapped function inside a transaction.
+
+        :param self: Instance of the class containing the wrapped method.
+        :param args: Positional arguments for the wrapped function.
+        :param kwargs: Keyword arguments for the wrapped function.
+        :return: The result of the wrapped function.
+        """
+        with self._connection_manager.transaction():
+            return func(self, *args, **kwargs)
+
+    return wrapper
@@ -1,33 +1,36 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from abc import ABC, abstractmethod
-from typing import Self, override
+from abc import ABC
+from typing import Self
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity(ABC):
     """
     Abstract base class for all entities in the system.
 
     Provides a common structure for entities, including an optional ID field and
-    an abstract method for creating instances from database rows.
+    a method for creating instances from database rows. Entities are slotted, so they
+    do not carry a per-instance `__dict__`.
     """
     id_: int | None = None
 
     @classmethod
-    @abstractmethod
     def from_row(cls, *args) -> Self:
         """
-        Abstract method to construct an entity instance from a database row.
+        Constructs an entity instance from a database row.
+
+        The row must list the columns in the order of the entity fields, starting with the ID,
+        as selected by `EntityMapper`; the driver already returns them as the field types.
 
         :param args: The row data from the database.
         :return: An instance of the entity.
         """
-        pass
+        return cls(*args)
 
 
-@dataclass
+@dataclass(slots=True)
 class Client(Entity):
     """
     Represents a client in the system.
@@ -41,27 +44,8 @@ class Client(Entity):
     latitude: float | None = None
     longitude: float | None = None
 
-    @classmethod
-    @override
-    def from_row(cls, *args) -> Self:
-        """
-        Creates a Client instance from a database row.
 
-        :param args: The row data from the database.
-        :return: A Client instance.
-        """
-        return cls(
-            id_=int(args[0]),
-            first_name=args[1],
-            last_name=args[2],
-            email=args[3],
-            phone_number=args[4],
-            latitude=float(args[5]),
-            longitude=float(args[6])
-        )
-
-
-@dataclass
+@dataclass(slots=True)
 class ParcelLocker(Entity):
     """
     Represents a parcel locker in the system.
@@ -73,25 +57,8 @@ class ParcelLocker(Entity):
     latitude: float | None = None
     longitude: float | None = None
 
-    @classmethod
-    @override
-    def from_row(cls, *args) -> Self:
-        """
-        Creates a ParcelLocker instance from a database row.
-
-        :param args: The row data from the database.
-        :return: A ParcelLocker instance.
-        """
-        return cls(
-            id_=int(args[0]),
-            city=args[1],
-            postal_code=args[2],
-            latitude=float(args[3]),
-            longitude=float(args[4])
-        )
-
 
-@dataclass
+@dataclass(slots=True)
 class Package(Entity):
     """
     Represents a package in the system.
@@ -107,30 +74,8 @@ class Package(Entity):
     delivered_at: datetime | None = None
     created_at: datetime = field(default_factory=datetime.now)
 
-    @classmethod
-    @override
-    def from_row(cls, *args) -> Self:
-        """
-        Creates a Package instance from a database row.
 
-        :param args: The row data from the database.
-        :return: A Package instance.
-        """
-        print(f"Row data received in from_row: {args}")
-        return cls(
-            id_=int(args[0]),
-            sender_id=int(args[1]),
-            receiver_id=int(args[2]),
-            parcel_locker_id=int(args[3]),
-            locker_id=int(args[4]) if args[4] is not None else None,
-            status=args[8],
-            size=args[5],
-            delivered_at=args[7],
-            created_at=args[6]
-        )
-
-
-@dataclass
+@dataclass(slots=True)
 class Locker(Entity):
     """
     Represents a locker in a parcel locker system.
@@ -143,24 +88,6 @@ class Locker(Entity):
     size: str | None = None
     status: str | None = None
 
-    @classmethod
-    @override
-    def from_row(cls, *args) -> Self:
-        """
-        Creates a Locker instance from a database row.
-
-        :param args: The row data from the database.
-        :return: A Locker instance.
-        """
-        return cls(
-            id_=int(args[0]),
-            parcel_locker_id=int(args[1]),
-            package_id=int(args[2]) if args[2] is not None else None,
-            client_id=int(args[3]) if args[3] is not None else None,
-            size=args[4],
-            status=args[5]
-        )
-
 
 class Size(Enum):
     """
@@ -0,0 +1,50 @@
+from math import radians, degrees, sin, cos, asin, sqrt, pi
+
+EARTH_RADIUS = 6371.0
+
+
+def haversine(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+    """
+    Calculates the great-circle distance between two points, using the same formula as the SQL queries.
+
+    :param latitude_1: Latitude of the first point in degrees.
+    :param longitude_1: Longitude of the first point in degrees.
+    :param latitude_2: Latitude of the second point in degrees.
+    :param longitude_2: Longitude of the second point in degrees.
+    :return: The distance between the points in kilometers.
+    """
+    return EARTH_RADIUS * 2 * asin(sqrt(
+        sin((radians(latitude_1) - radians(latitude_2)) / 2) ** 2 +
+        cos(radians(latitude_1)) * cos(radians(latitude_2)) *
+        sin((radians(longitude_1) - radians(longitude_2)) / 2) ** 2
+    ))
+
+
+def bounding_box(latitude: float, longitude: float, max_distance: float) -> tuple[float, float, float, float]:
+    """
+    Calculates the smallest latitude/longitude rectangle containing every point within a distance.
+
+    The longitude range spans the whole globe when the circle contains a pole or crosses the antimeridian.
+
+    :param latitude: Latitude of the center in degrees.
+    :param longitude: Longitude of the center in degrees.
+    :param max_distance: The radius of the circle in kilometers.
+    :return: A tuple of minimum latitude, maximum latitude, minimum longitude and maximum longitude in degrees.
+    """
+    angular_distance = max_distance / EARTH_RADIUS
+    min_latitude = latitude - degrees(angular_distance)
+    max_latitude = latitude + degrees(angular_distance)
+
+    if min_latitude <= -90 or max_latitude >= 90 or angular_distance >= pi / 2:
+        return max(min_latitude, -90.0), min(max_latitude, 90.0), -180.0, 180.0
+
+    ratio = sin(angular_distance) / cos(radians(latitude))
+    if ratio >= 1:
+        return min_latitude, max_latitude, -180.0, 180.0
+
+    delta_longitude = degrees(asin(ratio))
+    min_longitude, max_longitude = longitude - delta_longitude, longitude + delta_longitude
+    if min_longitude < -180 or max_longitude > 180:
+        return min_latitude, max_latitude, -180.0, 180.0
+
+    return min_latitude, max_latitude, min_longitude, max_longitude
@@ -0,0 +1,210 @@
+from app.src.entity import ParcelLocker
+from app.src.geo import haversine, bounding_box
+from abc import ABC, abstractmethod
+from typing import Iterable, override
+from math import floor
+
+import threading
+
+
+class ParcelLockerIndex(ABC):
+    """
+    Abstract base class for in-memory nearest-neighbour indexes of parcel locker locations.
+
+    Results have the same shape as `ParcelLockerRepository.find_nearest_parcel_lockers`:
+    tuples of ID, city and distance in kilometers, nearest first.
+    """
+
+    @abstractmethod
+    def rebuild(self, parcel_lockers: Iterable[ParcelLocker]) -> None:
+        """
+        Replaces the content of the index.
+
+        :param parcel_lockers: All parcel lockers to index.
+        """
+        pass
+
+    @abstractmethod
+    def add(self, parcel_locker: ParcelLocker) -> None:
+        """
+        Adds a single parcel locker to the index.
+
+        :param parcel_locker: The parcel locker to add; it must have an ID.
+        """
+        pass
+
+    @abstractmethod
+    def find_within(self, latitude: float, longitude: float, max_distance: float,
+                    limit: int | None = None) -> list[tuple[int, str, float]]:
+        """
+        Finds the parcel lockers closer than a distance to a point.
+
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param max_distance: The maximum distance in kilometers.
+        :param limit: The maximum number of parcel lockers to return, or None for all of them.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        pass
+
+    @abstractmethod
+    def location(self, parcel_locker_id: int) -> tuple[float, float] | None:
+        """
+        Returns the indexed location of a parcel locker.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :return: A tuple of latitude and longitude, or None if the parcel locker is not indexed.
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Returns the number of indexed parcel lockers.
+
+        :return: The number of indexed parcel lockers.
+        """
+        pass
+
+    def find_nearest(self, latitude: float, longitude: float, k: int) -> list[tuple[int, str, float]]:
+        """
+        Finds the k parcel lockers nearest to a point, regardless of distance.
+
+        The search radius starts small and doubles until k parcel lockers are found or the whole globe is covered.
+
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param k: The number of parcel lockers to return.
+        :return: A list of at most k tuples, each containing the ID, city, and distance of a parcel locker.
+        """
+        max_distance = 10.0
+        while True:
+            nearest = self.find_within(latitude, longitude, max_distance, k)
+            if len(nearest) >= min(k, len(self)) or max_distance > 20_100:
+                return nearest
+            max_distance *= 2
+
+
+class GridParcelLockerIndex(ParcelLockerIndex):
+    """
+    Parcel locker index that buckets locations into a grid of latitude/longitude cells.
+
+    A query only calculates distances to parcel lockers in the cells overlapping the bounding box
+    of the search circle.
+    """
+
+    def __init__(self, cell_size: float = 0.25):
+        """
+        Initializes an empty index.
+
+        :param cell_size: The size of a grid cell in degrees.
+        """
+        self._cell_size = cell_size
+        self._lock = threading.Lock()
+        self._cells: dict[tuple[int, int], list[tuple[int, str, float, float]]] = {}
+        self._locations: dict[int, tuple[float, float]] = {}
+
+    @override
+    def rebuild(self, parcel_lockers: Iterable[ParcelLocker]) -> None:
+        """
+        Builds a new grid and swaps it in, so queries running meanwhile still see the previous content.
+
+        :param parcel_lockers: All parcel lockers to index.
+        """
+        cells: dict[tuple[int, int], list[tuple[int, str, float, float]]] = {}
+        locations: dict[int, tuple[float, float]] = {}
+        for parcel_locker in parcel_lockers:
+            self._insert(cells, locations, parcel_locker)
+
+        with self._lock:
+            self._cells, self._locations = cells, locations
+
+    @override
+    def add(self, parcel_locker: ParcelLocker) -> None:
+        """
+        Adds a single parcel locker to its grid cell.
+
+        :param parcel_locker: The parcel locker to add; it must have an ID.
+        """
+        with self._lock:
+            self._insert(self._cells, self._locations, parcel_locker)
+
+    @override
+    def find_within(self, latitude: float, longitude: float, max_distance: float,
+                    limit: int | None = None) -> list[tuple[int, str, float]]:
+        """
+        Finds the parcel lockers closer than a distance to a point by scanning the overlapping grid cells.
+
+        When the bounding box spans more cells than the grid holds, the occupied cells are filtered instead.
+
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param max_distance: The maximum distance in kilometers.
+        :param limit: The maximum number of parcel lockers to return, or None for all of them.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(latitude, longitude, max_distance)
+        min_row, max_row = self._cell(min_latitude), self._cell(max_latitude)
+        min_column, max_column = self._cell(min_longitude), self._cell(max_longitude)
+        cells = self._cells
+
+        if (max_row - min_row + 1) * (max_column - min_column + 1) > len(cells):
+            candidates = [cell for (row, column), cell in cells.items()
+                          if min_row <= row <= max_row and min_column <= column <= max_column]
+        else:
+            candidates = [cells[(row, column)]
+                          for row in range(min_row, max_row + 1)
+                          for column in range(min_column, max_column + 1)
+                          if (row, column) in cells]
+
+        result = []
+        for cell in candidates:
+            for parcel_locker_id, city, parcel_locker_latitude, parcel_locker_longitude in cell:
+                distance = haversine(latitude, longitude, parcel_locker_latitude, parcel_locker_longitude)
+                if distance < max_distance:
+                    result.append((parcel_locker_id, city, distance))
+
+        result.sort(key=lambda x: x[2])
+        return result if limit is None else result[:limit]
+
+    @override
+    def location(self, parcel_locker_id: int) -> tuple[float, float] | None:
+        """
+        Returns the indexed location of a parcel locker.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :return: A tuple of latitude and longitude, or None if the parcel locker is not indexed.
+        """
+        return self._locations.get(parcel_locker_id)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of indexed parcel lockers.
+
+        :return: The number of indexed parcel lockers.
+        """
+        return len(self._locations)
+
+    def _cell(self, degrees: float) -> int:
+        """
+        Converts a latitude or longitude to the number of its grid row or column.
+
+        :param degrees: Latitude or longitude in degrees.
+        :return: The row or column number.
+        """
+        return floor(degrees / self._cell_size)
+
+    def _insert(self, cells: dict[tuple[int, int], list[tuple[int, str, float, float]]],
+                locations: dict[int, tuple[float, float]], parcel_locker: ParcelLocker) -> None:
+        """
+        Puts a parcel locker into its grid cell.
+
+        :param cells: The grid cells to insert into.
+        :param locations: The locations of indexed parcel lockers by ID.
+        :param parcel_locker: The parcel locker to insert.
+        """
+        key = (self._cell(parcel_locker.latitude), self._cell(parcel_locker.longitude))
+        cells.setdefault(key, []).append(
+            (parcel_locker.id_, parcel_locker.city, parcel_locker.latitude, parcel_locker.longitude)
+        )
+        locations[parcel_locker.id_] = (parcel_locker.latitude, parcel_locker.longitude)
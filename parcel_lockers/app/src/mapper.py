@@ -0,0 +1,102 @@
+from app.src.entity import Entity
+from dataclasses import dataclass, fields
+from functools import cache
+from operator import attrgetter
+from typing import Callable, Iterable, Self, Any
+import inflection
+
+
+@dataclass(frozen=True)
+class EntityMapper[T: Entity]:
+    """
+    Compiled mapping between an entity type and its database table.
+
+    Everything a repository needs to read and write an entity is derived from the entity type once,
+    so the CRUD methods do not have to reflect on the entity on every call or for every row.
+    """
+    entity_type: type[T]
+    table_name: str
+    columns: tuple[str, ...]
+    values: Callable[[T], tuple]
+    from_row: Callable[..., T]
+    find_all_sql: str
+    find_by_id_sql: str
+    find_page_sql: str
+    insert_sql: str
+    update_sql: str
+    delete_sql: str
+
+    @classmethod
+    def build(cls, entity_type: type[T]) -> Self:
+        """
+        Builds the mapper of an entity type.
+
+        The written columns are the dataclass fields of the entity, excluding the ID field, and the table name
+        is the snake_case name of the entity type. Queries select the columns in the order of the entity fields,
+        so a row is turned into an entity by passing it straight to the entity constructor.
+
+        :param entity_type: The type of the entity to map.
+        :return: An `EntityMapper` instance.
+        """
+        table_name = inflection.underscore(entity_type.__name__)
+        columns = tuple(field.name for field in fields(entity_type) if field.name != 'id_')
+        select = f'SELECT id_, {", ".join(columns)} FROM {table_name}'
+        return cls(
+            entity_type=entity_type,
+            table_name=table_name,
+            columns=columns,
+            values=attrgetter(*columns) if len(columns) > 1 else lambda item: (getattr(item, columns[0]),),
+            from_row=entity_type,
+            find_all_sql=select,
+            find_by_id_sql=f'{select} WHERE id_ = %s',
+            find_page_sql=f'{select} WHERE id_ > %s ORDER BY id_ LIMIT %s',
+            insert_sql=(f'INSERT INTO {table_name} ({", ".join(columns)}) '
+                        f'VALUES ({", ".join(["%s"] * len(columns))})'),
+            update_sql=(f'UPDATE {table_name} SET {", ".join(f"{column} = %s" for column in columns)} '
+                        f'WHERE id_ = %s'),
+            delete_sql=f'DELETE FROM {table_name} WHERE id_ = %s'
+        )
+
+    def page_query(self, after_id: int, limit: int,
+                   conditions: Iterable[tuple[str, str, Any]] = ()) -> tuple[str, tuple]:
+        """
+        Builds a keyset pagination query with optional filters.
+
+        :param after_id: The ID after which the page starts.
+        :param limit: The maximum number of rows on the page.
+        :param conditions: Filters as (column, operator, value) tuples, combined with AND.
+        :return: The query and its parameters.
+        :raises ValueError: If a filter uses an unknown column or an unsupported operator.
+        """
+        conditions = list(conditions)
+        if not conditions:
+            return self.find_page_sql, (after_id, limit)
+
+        filters, values = [], []
+        for column, operator, value in conditions:
+            if column not in self.columns or operator not in ('=', '<', '<=', '>', '>='):
+                raise ValueError(f'Unsupported filter: {column} {operator}')
+            filters.append(f' AND {column} {operator} %s')
+            values.append(value)
+        sql = f'{self.find_all_sql} WHERE id_ > %s{"".join(filters)} ORDER BY id_ LIMIT %s'
+        return sql, (after_id, *values, limit)
+
+    def find_by_ids_sql(self, count: int) -> str:
+        """
+        Builds the query selecting the entities with any of `count` IDs.
+
+        :param count: The number of IDs passed as parameters.
+        :return: The query.
+        """
+        return f'{self.find_all_sql} WHERE id_ IN ({", ".join(["%s"] * count)})'
+
+
+@cache
+def mapper_for[T: Entity](entity_type: type[T]) -> EntityMapper[T]:
+    """
+    Returns the mapper of an entity type, building it on first use.
+
+    :param entity_type: The type of the entity to map.
+    :return: The `EntityMapper` shared by every repository of the entity type.
+    """
+    return EntityMapper.build(entity_type)
@@ -0,0 +1,120 @@
+from app.src.geo import bounding_box, EARTH_RADIUS
+
+RESERVE_LOCKERS = ("SELECT id_ FROM locker WHERE parcel_locker_id = %s AND size = %s "
+                   "AND status = 'Available' ORDER BY id_ LIMIT %s FOR UPDATE SKIP LOCKED;")
+
+ADJUST_AVAILABILITY = ("INSERT INTO locker_availability (parcel_locker_id, size, free_count) VALUES (%s, %s, %s) "
+                       "ON DUPLICATE KEY UPDATE free_count = free_count + %s;")
+
+FIND_AVAILABILITY = "SELECT size, free_count FROM locker_availability WHERE parcel_locker_id = %s;"
+
+CLAIM_IDEMPOTENCY_KEY = ("INSERT INTO idempotency_key (idempotency_key, request_hash, created_at) VALUES (%s, %s, %s) "
+                         "ON DUPLICATE KEY UPDATE "
+                         "request_hash = IF(created_at < %s, VALUES(request_hash), request_hash), "
+                         "package_id = IF(created_at < %s, NULL, package_id), "
+                         "created_at = IF(created_at < %s, VALUES(created_at), created_at);")
+
+LOCK_IDEMPOTENCY_KEY = "SELECT request_hash, package_id FROM idempotency_key WHERE idempotency_key = %s FOR UPDATE;"
+
+FIND_IDEMPOTENCY_KEY = ("SELECT request_hash, package_id FROM idempotency_key "
+                        "WHERE idempotency_key = %s AND created_at >= %s AND package_id IS NOT NULL;")
+
+COMPLETE_IDEMPOTENCY_KEY = "UPDATE idempotency_key SET package_id = %s WHERE idempotency_key = %s;"
+
+PURGE_IDEMPOTENCY_KEYS = "DELETE FROM idempotency_key WHERE created_at < %s;"
+
+
+def assign_lockers(count: int) -> str:
+    """
+    Builds the statement occupying many lockers at once, each with its own package and receiver.
+
+    Its parameters are built by `assign_lockers_params`.
+
+    :param count: The number of lockers.
+    :return: A single UPDATE statement setting the status, package and client of the lockers.
+    """
+    cases = ' '.join(['WHEN %s THEN %s'] * count)
+    return (f"UPDATE locker SET status = 'Occupied', package_id = CASE id_ {cases} END, "
+            f"client_id = CASE id_ {cases} END "
+            f"WHERE id_ IN ({', '.join(['%s'] * count)});")
+
+
+def assign_lockers_params(assignments: list[tuple[int, int, int]]) -> tuple:
+    """
+    Builds the parameters of the statement returned by `assign_lockers`.
+
+    :param assignments: Tuples containing the ID of a locker, the ID of its package and the ID of the receiver.
+    :return: The statement parameters.
+    """
+    packages = [value for locker_id, package_id, _ in assignments for value in (locker_id, package_id)]
+    clients = [value for locker_id, _, client_id in assignments for value in (locker_id, client_id)]
+    return (*packages, *clients, *(locker_id for locker_id, _, _ in assignments))
+
+
+def packages_in_lockers(count: int) -> str:
+    """
+    Builds the query finding the package put in each of many lockers, e.g. to read back the IDs of packages
+    written with a multi-row insert.
+
+    Received packages keep the ID of their locker, so only packages still in a locker are considered,
+    and the newest one of each locker is returned.
+
+    :param count: The number of lockers.
+    :return: A query selecting the ID of every locker with a package and the ID of its package.
+    """
+    return (f"SELECT locker_id, MAX(id_) FROM package WHERE status = 'In locker' "
+            f"AND locker_id IN ({', '.join(['%s'] * count)}) GROUP BY locker_id;")
+
+
+def parcel_lockers_within(available: bool = False, counted: bool = True) -> str:
+    """
+    Builds the query finding the parcel lockers within a distance from a point, nearest first.
+
+    Only parcel lockers inside the bounding box of the search circle are considered, which lets MySQL
+    use the index on (latitude, longitude) instead of calculating the distance for every parcel locker.
+    The query is shared by the synchronous and the asynchronous repositories; its parameters are built
+    by `parcel_lockers_within_params`.
+
+    :param available: Whether to return only parcel lockers with a free locker of a size, and at most a given
+                      number of them.
+    :param counted: Whether free lockers are read from the counters of the `locker_availability` table, which
+                    are approximate, or looked up in the `locker` table.
+    :return: The query selecting the ID, city and distance of every parcel locker found.
+    """
+    availability = free_lockers = ""
+    if available and counted:
+        availability = ("JOIN locker_availability ON locker_availability.parcel_locker_id = parcel_locker.id_ "
+                        "AND locker_availability.size = %s AND locker_availability.free_count > 0 ")
+    elif available:
+        free_lockers = ("EXISTS (SELECT 1 FROM locker WHERE locker.parcel_locker_id = parcel_locker.id_ "
+                        "AND locker.size = %s AND locker.status = 'Available') AND ")
+    return (f"WITH DistanceCalc AS ( "
+            f"SELECT parcel_locker.id_, parcel_locker.city, "
+            f"({EARTH_RADIUS} * 2 * ASIN(SQRT(POWER(SIN((RADIANS(%s) - RADIANS(latitude)) / 2), 2) + "
+            f"COS(RADIANS(%s)) * COS(RADIANS(latitude)) * "
+            f"POWER(SIN((RADIANS(%s) - RADIANS(longitude)) / 2), 2)))) AS distance "
+            f"FROM parcel_locker "
+            f"{availability}"
+            f"WHERE {free_lockers}latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s ) "
+            f"SELECT id_, city, distance FROM DistanceCalc WHERE distance < %s "
+            f"ORDER BY distance{' LIMIT %s' if available else ''};")
+
+
+def parcel_lockers_within_params(latitude: float, longitude: float, max_distance: float,
+                                 size: str | None = None, limit: int | None = None) -> tuple:
+    """
+    Builds the parameters of the query returned by `parcel_lockers_within`.
+
+    :param latitude: Latitude of the point in degrees.
+    :param longitude: Longitude of the point in degrees.
+    :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+    :param size: The size of the free locker, for the query of available parcel lockers.
+    :param limit: The maximum number of parcel lockers, for the query of available parcel lockers.
+    :return: The query parameters.
+    """
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(latitude, longitude, max_distance)
+    if size is None:
+        return (latitude, latitude, longitude,
+                min_latitude, max_latitude, min_longitude, max_longitude, max_distance)
+    return (latitude, latitude, longitude, size,
+            min_latitude, max_latitude, min_longitude, max_longitude, max_distance, limit)
@@ -1,8 +1,19 @@
 from app.src.entity import Entity, Client, Locker, ParcelLocker, Package
 from app.src.database import with_db_connection, MySQLConnectionManager
-from typing import Type
+from app.src.geo import haversine
+from app.src import queries
+from app.src.geo_index import ParcelLockerIndex
+from app.src.mapper import mapper_for
+from app.src.cache import Cache
+from mysql.connector import MySQLConnection
+from itertools import batched
+from functools import partial
+from copy import copy
+from datetime import datetime, timedelta
+from typing import Type, Iterable, Iterator, Any
 from enum import Enum
-import inflection
+
+import logging
 
 
 class CrudRepository[T: Entity]:
@@ -11,17 +22,23 @@ class CrudRepository[T: Entity]:
 
     This class provides methods to interact with a MySQL database for the
     basic Create, Read, Update, and Delete operations on a given entity type.
+    Values are always passed to the driver as query parameters; the statements, the columns
+    and the value extractor come from the `EntityMapper` compiled once per entity type.
     """
 
-    def __init__(self, connection_manager: MySQLConnectionManager, entity_type: Type[T]):
+    def __init__(self, connection_manager: MySQLConnectionManager, entity_type: Type[T],
+                 cache: Cache | None = None):
         """
         Initializes the repository with a database connection manager and an entity type.
 
         :param connection_manager: An instance of `MySQLConnectionManager` for managing database connections.
         :param entity_type: The type of the entity the repository will manage (e.g., Client, Package, etc.).
+        :param cache: An optional cache serving `find_by_id`, invalidated by the writes of this repository.
         """
         self._connection_manager = connection_manager
         self._entity_type = entity_type
+        self._mapper = mapper_for(entity_type)
+        self._cache = cache
 
     @with_db_connection
     def find_all(self) -> list[T]:
@@ -30,24 +47,113 @@ class CrudRepository[T: Entity]:
 
         :return: A list of entity instances populated with data from the database.
         """
-        sql = f"SELECT * FROM {self.table_name()}"
-        self._cursor.execute(sql)
-        return [self._entity_type.from_row(*row) for row in self._cursor.fetchall()]
+        self._cursor.execute(self._mapper.find_all_sql)
+        from_row = self._mapper.from_row
+        return [from_row(*row) for row in self._cursor.fetchall()]
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[T]:
+        """
+        Streams all records from the database for the entity type, ordered by ID.
+
+        The rows are read through an unbuffered cursor in batches of `batch_size`, so only one batch
+        is held in memory at a time. The stream uses a connection of its own for as long as it is consumed,
+        also when it is started inside a unit of work. Closing the stream early discards the unread rows.
+
+        :param batch_size: The number of rows fetched from the server at a time.
+        :return: A generator of entity instances.
+        """
+        return self._stream(f'{self._mapper.find_all_sql} ORDER BY id_', (), batch_size)
 
     @with_db_connection
+    def find_page(self, after_id: int = 0, limit: int = 100,
+                  conditions: Iterable[tuple[str, str, Any]] = ()) -> list[T]:
+        """
+        Retrieves a page of records ordered by ID, using keyset pagination.
+
+        Pass the ID of the last entity of a page as `after_id` to get the next page. Every page is read with
+        an index range scan on the primary key, however deep it is.
+
+        :param after_id: The ID after which the page starts (default: 0, the first page).
+        :param limit: The maximum number of entities on the page.
+        :param conditions: Filters as (column, operator, value) tuples, combined with AND.
+        :return: A list of entity instances, empty after the last page.
+        """
+        sql, params = self._mapper.page_query(after_id, limit, conditions)
+        self._cursor.execute(sql, params)
+        from_row = self._mapper.from_row
+        return [from_row(*row) for row in self._cursor.fetchall()]
+
+    def iter_page(self, after_id: int = 0, limit: int = 100, conditions: Iterable[tuple[str, str, Any]] = (),
+                  batch_size: int = 1000) -> Iterator[T]:
+        """
+        Streams a page of records ordered by ID, using keyset pagination.
+
+        Works like `find_page`, but the rows are read through an unbuffered cursor like in `iter_all`,
+        so the size of the page does not affect the memory used to read it.
+
+        :param after_id: The ID after which the page starts (default: 0, the first page).
+        :param limit: The maximum number of entities on the page.
+        :param conditions: Filters as (column, operator, value) tuples, combined with AND.
+        :param batch_size: The number of rows fetched from the server at a time.
+        :return: A generator of entity instances.
+        """
+        sql, params = self._mapper.page_query(after_id, limit, conditions)
+        return self._stream(sql, params, batch_size)
+
     def find_by_id(self, item_id: int) -> T:
         """
-        Retrieves a single entity by its ID from the database.
+        Retrieves a single entity by its ID, from the cache of the repository if it has one, or from the database.
+
+        Entities read from the database are added to the cache, except inside a unit of work, which always
+        reads from the database so it sees its own uncommitted changes. The cache hands out copies,
+        so changing a returned entity does not change the cached one.
 
         :param item_id: The ID of the entity to retrieve.
         :return: An entity instance or `None` if not found.
         """
-        sql = f"SELECT * FROM {self.table_name()} where id_ = {item_id}"
-        self._cursor.execute(sql)
-        item = self._cursor.fetchone()
-        return self._entity_type.from_row(*item) if item else None
+        if self._cache is None or self._connection_manager.current_transaction() is not None:
+            return self._select_by_id(item_id)
+
+        key = self._cache_key(item_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return copy(cached)
+
+        item = self._select_by_id(item_id)
+        if item is not None:
+            self._cache.set(key, copy(item))
+        return item
+
+    def find_by_ids(self, item_ids: Iterable[int], chunk_size: int = 1000) -> dict[int, T]:
+        """
+        Retrieves several entities by their IDs at once.
+
+        IDs found in the cache of the repository are not read from the database; the others are read with
+        one `WHERE id_ IN (...)` query per chunk of `chunk_size` IDs, on a single connection, and added
+        to the cache like in `find_by_id`.
+
+        :param item_ids: The IDs of the entities to retrieve; duplicates are ignored.
+        :param chunk_size: The maximum number of IDs in a single query.
+        :return: A dictionary mapping the ID of every entity found to the entity, in the order of `item_ids`.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        use_cache = self._cache is not None and self._connection_manager.current_transaction() is None
+
+        found: dict[int, T] = {}
+        if use_cache:
+            keys = {self._cache_key(item_id): item_id for item_id in item_ids}
+            found = {keys[key]: copy(item) for key, item in self._cache.get_many(keys).items()}
+
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing:
+            selected = self._select_by_ids(missing, chunk_size)
+            if use_cache:
+                for item_id, item in selected.items():
+                    self._cache.set(self._cache_key(item_id), copy(item))
+            found.update(selected)
+
+        return {item_id: found[item_id] for item_id in item_ids if item_id in found}
 
-    @with_db_connection
     def insert(self, item: T) -> int:
         """
         Inserts a new entity into the database.
@@ -55,27 +161,38 @@ class CrudRepository[T: Entity]:
         :param item: The entity to insert.
         :return: The ID of the newly inserted entity.
         """
-        sql = (f'insert into {self.table_name()} '
-               f'({self._column_names_for_insert()}) '
-               f'values ({self._column_values_for_insert(item)})')
-        self._cursor.execute(sql)
-        return self._cursor.lastrowid
+        item_id = self._insert(item)
+        self._invalidate(item_id)
+        return item_id
 
-    @with_db_connection
-    def insert_many(self, items: list[T]) -> None:
+    def insert_many(self, items: Iterable[T], chunk_size: int = 1000) -> int:
         """
-        Inserts multiple entities into the database in a single operation.
+        Inserts multiple entities into the database in chunks.
+
+        The entities are consumed lazily, so any iterable or generator can be loaded with bounded memory.
+        Every chunk is written as a single multi-row insert and committed on its own, so a failure leaves
+        the chunks written before it in place. Inside `MySQLConnectionManager.transaction` the chunks are
+        written on the connection of the transaction and committing is left to the transaction.
 
-        :param items: A list of entities to insert.
+        The IDs of the inserted entities are not returned: MySQL does not guarantee that the rows of
+        a multi-row insert get consecutive IDs, e.g. with `innodb_autoinc_lock_mode = 2` or an
+        `auto_increment_increment` above 1, so callers that need them have to read them back.
+
+        :param items: The entities to insert.
+        :param chunk_size: The maximum number of entities written by a single statement.
+        :return: The number of inserted entities.
         """
-        if not items:
-            return
+        transaction_connection = self._connection_manager.current_transaction()
+        if transaction_connection is not None:
+            return self._insert_chunks(transaction_connection, items, chunk_size, commit=False)
 
-        sql = (f'insert into {self.table_name()} ({self._column_names_for_insert()}) '
-               f'values {", ".join(self._values_for_insert_many(items))}')
-        self._cursor.execute(sql)
+        with self._connection_manager.get_connection() as connection:
+            try:
+                return self._insert_chunks(connection, items, chunk_size, commit=True)
+            except Exception:
+                connection.rollback()
+                raise
 
-    @with_db_connection
     def update(self, item_id: int, item: T) -> None:
         """
         Updates an existing entity in the database.
@@ -83,10 +200,9 @@ class CrudRepository[T: Entity]:
         :param item_id: The ID of the entity to update.
         :param item: The updated entity data.
         """
-        sql = f'update {self.table_name()} set {self._column_names_and_values_for_update(item)} where id_ = {item_id}'
-        self._cursor.execute(sql)
+        self._update(item_id, item)
+        self._invalidate(item_id)
 
-    @with_db_connection
     def delete(self, item_id: int) -> int:
         """
         Deletes an entity from the database by its ID.
@@ -94,64 +210,138 @@ class CrudRepository[T: Entity]:
         :param item_id: The ID of the entity to delete.
         :return: The ID of the deleted entity.
         """
-        sql = f'delete from {self.table_name()} where id_ = {item_id}'
-        self._cursor.execute(sql)
+        self._delete(item_id)
+        self._invalidate(item_id)
         return item_id
 
     def table_name(self) -> str:
         """
-        Converts the entity type name to a table name using snake_case.
+        Returns the name of the table of the entity type, i.e. the entity type name in snake_case.
 
         :return: The name of the table corresponding to the entity type.
         """
-        return inflection.underscore(self._entity_type.__name__)
+        return self._mapper.table_name
+
+    @with_db_connection
+    def _select_by_id(self, item_id: int) -> T | None:
+        """
+        Retrieves a single entity by its ID from the database.
+
+        :param item_id: The ID of the entity to retrieve.
+        :return: An entity instance or `None` if not found.
+        """
+        self._cursor.execute(self._mapper.find_by_id_sql, (item_id,))
+        item = self._cursor.fetchone()
+        return self._mapper.from_row(*item) if item else None
+
+    @with_db_connection
+    def _select_by_ids(self, item_ids: list[int], chunk_size: int) -> dict[int, T]:
+        """
+        Retrieves entities by their IDs from the database, chunk by chunk.
+
+        :param item_ids: The IDs of the entities to retrieve.
+        :param chunk_size: The maximum number of IDs in a single query.
+        :return: A dictionary mapping the ID of every entity found to the entity.
+        """
+        from_row = self._mapper.from_row
+        items: dict[int, T] = {}
+        for chunk in batched(item_ids, chunk_size):
+            self._cursor.execute(self._mapper.find_by_ids_sql(len(chunk)), chunk)
+            for row in self._cursor.fetchall():
+                items[row[0]] = from_row(*row)
+        return items
+
+    @with_db_connection
+    def _insert(self, item: T) -> int:
+        """
+        Writes a new entity to the database.
 
-    def _column_names_for_insert(self) -> str:
+        :param item: The entity to insert.
+        :return: The ID of the newly inserted entity.
+        """
+        self._cursor.execute(self._mapper.insert_sql, self._mapper.values(item))
+        return self._cursor.lastrowid
+
+    @with_db_connection
+    def _update(self, item_id: int, item: T) -> None:
+        """
+        Writes the data of an existing entity to the database.
+
+        :param item_id: The ID of the entity to update.
+        :param item: The updated entity data.
         """
-        Retrieves the column names for an insert statement, excluding the ID field.
+        self._cursor.execute(self._mapper.update_sql, (*self._mapper.values(item), item_id))
 
-        :return: A comma-separated string of column names.
+    @with_db_connection
+    def _delete(self, item_id: int) -> None:
         """
-        return ', '.join([field for field in self._entity_type.__annotations__.keys() if field != '_id'])
+        Removes an entity from the database.
 
-    def _column_values_for_insert(self, item: T) -> str:
+        :param item_id: The ID of the entity to delete.
         """
-        Prepares the values for an insert statement, converting each field to a string.
+        self._cursor.execute(self._mapper.delete_sql, (item_id,))
 
-        :param item: The entity instance to insert.
-        :return: A comma-separated string of values to insert.
+    def _cache_key(self, item_id: int) -> str:
         """
-        fields = [field for field in self._entity_type.__annotations__.keys() if field != '_id']
-        values = [
-            "NULL" if getattr(item, field) is None else
-            str(getattr(item, field)) if isinstance(getattr(item, field), (int, float))
-            else f"'{getattr(item, field)}'"
-            for field in fields
-        ]
-        return ', '.join(values)
+        Builds the cache key of an entity.
 
-    def _column_names_and_values_for_update(self, item: T) -> str:
+        :param item_id: The ID of the entity.
+        :return: The key of the entity in the cache.
         """
-        Prepares the column names and values for an update statement.
+        return f'{self._mapper.table_name}:{item_id}'
 
-        :param item: The entity instance to update.
-        :return: A comma-separated string of column-value assignments for the update.
+    def _invalidate(self, item_id: int) -> None:
         """
-        return ', '.join([
-            f"{field} = {('NULL' if getattr(item, field) is None else str(getattr(item, field)) if isinstance(getattr(item, field), (int, float))
-            else f"'{getattr(item, field)}'")}"
-            for field in self._entity_type.__annotations__.keys()
-            if field != 'id_'
-        ])
+        Removes an entity from the cache once the change made to it is committed, so readers
+        outside the unit of work cannot cache the previous version again in the meantime.
 
-    def _values_for_insert_many(self, items: list[T]) -> list[str]:
+        :param item_id: The ID of the changed entity.
         """
-        Prepares the values for inserting multiple entities in a single operation.
+        if self._cache is not None:
+            self._connection_manager.after_commit(partial(self._cache.delete, self._cache_key(item_id)))
 
-        :param items: A list of entity instances to insert.
-        :return: A list of string values for each entity to be inserted.
+    def _stream(self, sql: str, params: tuple, batch_size: int) -> Iterator[T]:
         """
-        return [f"({self._column_values_for_insert(item)})" for item in items]
+        Executes a query on a connection of its own and yields its rows as entities, one batch at a time.
+
+        :param sql: The query selecting the columns of the entity in field order.
+        :param params: The query parameters.
+        :param batch_size: The number of rows fetched from the server at a time.
+        :return: A generator of entity instances.
+        """
+        from_row = self._mapper.from_row
+        with (self._connection_manager.get_connection() as connection,
+              connection.cursor() as cursor):
+            try:
+                cursor.execute(sql, params)
+                while rows := cursor.fetchmany(batch_size):
+                    for row in rows:
+                        yield from_row(*row)
+            finally:
+                if connection.unread_result:
+                    connection.consume_results()
+
+    def _insert_chunks(self, connection: MySQLConnection, items: Iterable[T], chunk_size: int,
+                       commit: bool) -> int:
+        """
+        Writes entities chunk by chunk on a single connection.
+
+        The chunks are sent through a text protocol cursor, which turns `executemany` into one multi-row insert.
+
+        :param connection: The connection to write on.
+        :param items: The entities to insert.
+        :param chunk_size: The maximum number of entities written by a single statement.
+        :param commit: Whether to commit after every chunk.
+        :return: The number of inserted entities.
+        """
+        inserted = 0
+        with connection.cursor() as cursor:
+            for chunk in batched(items, chunk_size):
+                cursor.executemany(self._mapper.insert_sql, list(map(self._mapper.values, chunk)))
+                inserted += len(chunk)
+                if commit:
+                    connection.commit()
+        return inserted
 
 
 class ClientRepository(CrudRepository[Client]):
@@ -159,8 +349,8 @@ class ClientRepository(CrudRepository[Client]):
     Repository class for performing CRUD operations on `Client` entities.
     """
 
-    def __init__(self, connection_manager: MySQLConnectionManager):
-        super().__init__(connection_manager, Client)
+    def __init__(self, connection_manager: MySQLConnectionManager, cache: Cache | None = None):
+        super().__init__(connection_manager, Client, cache)
 
 
 class PackageRepository(CrudRepository[Package]):
@@ -171,39 +361,143 @@ class PackageRepository(CrudRepository[Package]):
     def __init__(self, connection_manager: MySQLConnectionManager):
         super().__init__(connection_manager, Package)
 
+    @with_db_connection
+    def find_ids_in_lockers(self, locker_ids: list[int], chunk_size: int = 1000) -> dict[int, int]:
+        """
+        Finds the packages put in many lockers, with one query per chunk of lockers.
+
+        Call it in the transaction that wrote the packages while it holds the locks of the lockers,
+        so no other package can be put in them in the meantime.
+
+        :param locker_ids: The IDs of the lockers.
+        :param chunk_size: The maximum number of lockers looked up by a single query.
+        :return: A dictionary mapping the ID of every locker holding a package to the ID of the package.
+        """
+        package_ids: dict[int, int] = {}
+        for chunk in batched(locker_ids, chunk_size):
+            self._cursor.execute(queries.packages_in_lockers(len(chunk)), chunk)
+            package_ids.update(self._cursor.fetchall())
+        return package_ids
+
 
 class ParcelLockerRepository(CrudRepository[ParcelLocker]):
     """
     Repository class for performing CRUD operations on `ParcelLocker` entities.
     """
 
-    def __init__(self, connection_manager: MySQLConnectionManager, client_repo: ClientRepository):
-        super().__init__(connection_manager, ParcelLocker)
+    def __init__(self, connection_manager: MySQLConnectionManager, client_repo: ClientRepository,
+                 index: ParcelLockerIndex | None = None, cache: Cache | None = None):
+        """
+        Initializes the repository.
+
+        :param connection_manager: An instance of `MySQLConnectionManager` for managing database connections.
+        :param client_repo: Repository used to look up the location of clients.
+        :param index: An optional in-memory index answering nearest parcel locker queries instead of MySQL.
+        :param cache: An optional cache of parcel lockers serving `find_by_id`.
+        """
+        super().__init__(connection_manager, ParcelLocker, cache)
         self._client_repo = client_repo
+        self.index = index
 
-    @with_db_connection
     def find_nearest_parcel_lockers(self, client_id: int, max_distance: float) -> list[tuple[int, ...]]:
         """
         Finds the nearest parcel lockers within a specified maximum distance.
 
+        The query is answered by the in-memory index if the repository has one, and by MySQL otherwise.
+
         :param client_id: The ID of the client.
         :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
-        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
         """
         client_location = self._client_repo.find_by_id(client_id)
+        if self.index is not None:
+            return self.index.find_within(client_location.latitude, client_location.longitude, max_distance)
+        return self.find_parcel_lockers_within(client_location.latitude, client_location.longitude, max_distance)
 
-        sql = (f"WITH DistanceCalc AS ( "
-               f"SELECT {self.table_name()}.id_, {self.table_name()}.city, "
-               f"(6371.0 * 2 * ASIN(SQRT(POWER(SIN((RADIANS(%s) - RADIANS(latitude)) / 2), 2) + "
-               f"COS(RADIANS(%s)) * COS(RADIANS(latitude)) * "
-               f"POWER(SIN((RADIANS(%s) - RADIANS(longitude)) / 2), 2)))) AS distance "
-               f"FROM {self.table_name()} ) SELECT id_, city, distance FROM DistanceCalc WHERE distance < %s "
-               f"ORDER BY distance;")
+    @with_db_connection
+    def find_parcel_lockers_within(self, latitude: float, longitude: float,
+                                   max_distance: float) -> list[tuple[int, ...]]:
+        """
+        Finds the parcel lockers within a specified maximum distance from a point using MySQL.
 
-        self._cursor.execute(sql, (client_location.latitude, client_location.latitude, client_location.longitude,
-                                   max_distance))
-        result = self._cursor.fetchall()
-        return sorted(result, key=lambda x: x[2])
+        Only parcel lockers inside the bounding box of the search circle are considered, which lets MySQL
+        use the index on (latitude, longitude) instead of calculating the distance for every parcel locker.
+
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        self._cursor.execute(queries.parcel_lockers_within(),
+                             queries.parcel_lockers_within_params(latitude, longitude, max_distance))
+        return self._cursor.fetchall()
+
+    def find_nearest_available_parcel_lockers(self, client_id: int, max_distance: float, size: str,
+                                              limit: int = 5) -> list[tuple[int, ...]]:
+        """
+        Finds the nearest parcel lockers to a client that have a free locker of the specified size.
+
+        :param client_id: The ID of the client.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param size: Size of the locker (e.g., small, medium, large).
+        :param limit: The maximum number of parcel lockers to return.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        client_location = self._client_repo.find_by_id(client_id)
+        return self.find_available_parcel_lockers_within(client_location.latitude, client_location.longitude,
+                                                         max_distance, size, limit)
+
+    @with_db_connection
+    def find_available_parcel_lockers_within(self, latitude: float, longitude: float, max_distance: float,
+                                             size: str, limit: int = 5, counted: bool = True) -> list[tuple[int, ...]]:
+        """
+        Finds the nearest parcel lockers to a point that have a free locker of the specified size, in a single query.
+
+        By default parcel lockers without a free locker of that size are filtered out by MySQL using the counters
+        of the `locker_availability` table, so the cost does not grow with the number of full parcel lockers
+        around the point, and no `locker` rows are read. The counters are approximate, so a parcel locker whose
+        counter is too low is only found with `counted=False`, which looks the free lockers up in the `locker`
+        table instead.
+
+        :param latitude: Latitude of the point.
+        :param longitude: Longitude of the point.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param size: Size of the locker (e.g., small, medium, large).
+        :param limit: The maximum number of parcel lockers to return.
+        :param counted: Whether to read the free lockers from the counters instead of the `locker` table.
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker, nearest first.
+        """
+        self._cursor.execute(queries.parcel_lockers_within(available=True, counted=counted),
+                             queries.parcel_lockers_within_params(latitude, longitude, max_distance, size, limit))
+        return self._cursor.fetchall()
+
+    def check_index_consistency(self, latitude: float, longitude: float, max_distance: float,
+                                tolerance: float = 0.001) -> list[int]:
+        """
+        Compares the answer of the in-memory index with the answer of MySQL for one query.
+
+        MySQL calculates distances from single precision column values, so parcel lockers lying within
+        `tolerance` of the search radius may legitimately appear in only one of the answers and are ignored.
+
+        :param latitude: Latitude of the point in degrees.
+        :param longitude: Longitude of the point in degrees.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param tolerance: Distance from the search radius (in kilometers) within which differences are ignored.
+        :return: IDs of parcel lockers returned by only one of the implementations; empty if they agree.
+        :raises ValueError: If the repository has no index.
+        """
+        if self.index is None:
+            raise ValueError("The repository has no parcel locker index")
+
+        from_database = {row[0] for row in self.find_parcel_lockers_within(latitude, longitude, max_distance)}
+        from_index = {row[0] for row in self.index.find_within(latitude, longitude, max_distance)}
+
+        inconsistent = []
+        for parcel_locker_id in sorted(from_database ^ from_index):
+            location = self.index.location(parcel_locker_id)
+            if location is None or abs(haversine(latitude, longitude, *location) - max_distance) > tolerance:
+                inconsistent.append(parcel_locker_id)
+        return inconsistent
 
 
 class LockerRepository(CrudRepository[Locker]):
@@ -230,3 +524,272 @@ class LockerRepository(CrudRepository[Locker]):
         self._cursor.execute(sql, (parcel_locker, size))
         result = self._cursor.fetchall()
         return [row[0] for row in result]
+
+    @with_db_connection
+    def reserve_lockers(self, size: str, parcel_locker: int, count: int) -> list[int]:
+        """
+        Locks up to `count` free lockers of the specified size in a parcel locker with a single statement.
+
+        The locker rows are locked with `FOR UPDATE SKIP LOCKED`, so concurrent senders never pick the same
+        locker and do not wait for each other. They stay available until `assign_lockers` occupies them,
+        so call both in the same transaction.
+
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param parcel_locker: The ID of the parcel locker to reserve lockers in.
+        :param count: The maximum number of lockers to reserve.
+        :return: The IDs of the reserved lockers; fewer than `count` if the parcel locker has fewer free lockers.
+        """
+        self._cursor.execute(queries.RESERVE_LOCKERS, (parcel_locker, size, count))
+        return [row[0] for row in self._cursor.fetchall()]
+
+    @with_db_connection
+    def assign_lockers(self, assignments: list[tuple[int, int, int]], chunk_size: int = 500) -> None:
+        """
+        Occupies many lockers, each with its own package and receiver, with one statement per chunk.
+
+        :param assignments: Tuples containing the ID of a locker, the ID of its package and the ID of the receiver.
+        :param chunk_size: The maximum number of lockers updated by a single statement.
+        """
+        for chunk in batched(assignments, chunk_size):
+            self._cursor.execute(queries.assign_lockers(len(chunk)), queries.assign_lockers_params(list(chunk)))
+
+
+class LockerAvailabilityRepository:
+    """
+    Repository class for the `locker_availability` summary table.
+
+    The table keeps the number of free lockers of each size in each parcel locker, so availability can be
+    read without counting rows of the `locker` table. The counters are adjusted once the lockers they describe
+    are committed, so they are approximate, and `reconcile` corrects them from the `locker` table. Senders
+    therefore only use them to find candidate parcel lockers and fall back to the `locker` table.
+    """
+
+    def __init__(self, connection_manager: MySQLConnectionManager):
+        """
+        Initializes the repository with a database connection manager.
+
+        :param connection_manager: An instance of `MySQLConnectionManager` for managing database connections.
+        """
+        self._connection_manager = connection_manager
+
+    def adjust(self, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes the number of free lockers of a size in a parcel locker.
+
+        Inside a transaction the counter is changed after the transaction commits, by a statement of its own,
+        so concurrent senders taking lockers of the same size in the same parcel locker do not queue for the
+        lock of its counter row until their transactions end. A counter therefore lags briefly behind its lockers,
+        and a change whose statement fails after the commit is only logged and left to `reconcile`.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        if self._connection_manager.current_transaction() is None:
+            self._adjust(parcel_locker, size, delta)
+        else:
+            self._connection_manager.after_commit(partial(self._adjust_after_commit, parcel_locker, size, delta))
+
+    @with_db_connection
+    def find_by_parcel_locker(self, parcel_locker: int) -> dict[str, int]:
+        """
+        Retrieves the number of free lockers of each size in a parcel locker.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :return: A dictionary mapping locker sizes to the number of free lockers; empty if nothing is recorded.
+        """
+        self._cursor.execute(queries.FIND_AVAILABILITY, (parcel_locker,))
+        return {size: free_count for size, free_count in self._cursor.fetchall()}
+
+    @with_db_connection
+    def reconcile(self) -> list[tuple[int, str, int, int]]:
+        """
+        Corrects the counters that drifted from the `locker` table and reports them.
+
+        Counters drift when lockers are changed without going through `ParcelLockerService`,
+        e.g. by repository calls or manual SQL, or when an adjustment fails after its transaction committed.
+        The drift is read with a single query, and the difference is then added to the current value of every
+        drifted counter instead of overwriting it, so adjustments made by concurrent senders are not lost.
+        An adjustment of a transaction that committed before the drift was read but is applied after it is still
+        counted twice, so a reconciled counter may be off until the next run.
+
+        :return: A list of tuples, each containing the parcel locker ID, size, recorded and actual
+                 number of free lockers, for every counter that did not match the `locker` table.
+        """
+        actual = (f"SELECT parcel_locker_id, size, CAST(SUM(status = 'Available') AS SIGNED) AS free_count "
+                  f"FROM locker GROUP BY parcel_locker_id, size")
+        self._cursor.execute(
+            f"SELECT actual.parcel_locker_id, actual.size, COALESCE(recorded.free_count, 0), actual.free_count "
+            f"FROM ({actual}) AS actual LEFT JOIN {self.table_name()} AS recorded "
+            f"ON recorded.parcel_locker_id = actual.parcel_locker_id AND recorded.size = actual.size "
+            f"WHERE COALESCE(recorded.free_count, 0) <> actual.free_count "
+            f"UNION ALL "
+            f"SELECT recorded.parcel_locker_id, recorded.size, recorded.free_count, 0 "
+            f"FROM {self.table_name()} AS recorded WHERE recorded.free_count <> 0 AND NOT EXISTS ("
+            f"SELECT 1 FROM locker WHERE locker.parcel_locker_id = recorded.parcel_locker_id "
+            f"AND locker.size = recorded.size) "
+            f"ORDER BY 1, 2;"
+        )
+        drift = [tuple(row) for row in self._cursor.fetchall()]
+
+        for chunk in batched(drift, 500):
+            self._cursor.execute(
+                f"INSERT INTO {self.table_name()} (parcel_locker_id, size, free_count) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(chunk))} "
+                f"ON DUPLICATE KEY UPDATE free_count = free_count + VALUES(free_count);",
+                tuple(value for parcel_locker_id, size, recorded, free_count in chunk
+                      for value in (parcel_locker_id, size, free_count - recorded))
+            )
+        return drift
+
+    @with_db_connection
+    def _adjust(self, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes the number of free lockers of a size in a parcel locker with a single statement.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        self._cursor.execute(queries.ADJUST_AVAILABILITY, (parcel_locker, size, delta, delta))
+
+    def _adjust_after_commit(self, parcel_locker: int, size: str, delta: int) -> None:
+        """
+        Changes a counter once the transaction that changed its lockers has committed, logging a failure instead
+        of raising it, as the lockers are already committed.
+
+        :param parcel_locker: The ID of the parcel locker.
+        :param size: Size of the lockers (e.g., small, medium, large).
+        :param delta: The number of lockers that became free, negative if lockers were taken.
+        """
+        try:
+            self._adjust(parcel_locker, size, delta)
+        except Exception as error:
+            logging.warning('Free locker counter of parcel locker %s, size %s, missed %+d: %r',
+                            parcel_locker, size, delta, error)
+
+    def table_name(self) -> str:
+        """
+        Returns the name of the summary table.
+
+        :return: The name of the table.
+        """
+        return 'locker_availability'
+
+
+class IdempotencyKeyRepository:
+    """
+    Repository class for the `idempotency_key` table.
+
+    The table remembers, for every Idempotency-Key header sent with a new package, a fingerprint of the request
+    and the package it created, so a retried request gets the same package instead of reserving another locker.
+    A key can be reused for a different request once it is older than the window of the repository.
+    Completed keys are also kept in an optional cache, so most retries are answered without a query.
+    """
+
+    def __init__(self, connection_manager: MySQLConnectionManager, cache: Cache | None = None,
+                 window: float = 86400.0):
+        """
+        Initializes the repository with a database connection manager.
+
+        :param connection_manager: An instance of `MySQLConnectionManager` for managing database connections.
+        :param cache: An optional cache serving `find` for completed keys.
+        :param window: The number of seconds a key is remembered after it is first used.
+        """
+        self._connection_manager = connection_manager
+        self._cache = cache
+        self._window = timedelta(seconds=window)
+
+    def find(self, key: str) -> tuple[str, int] | None:
+        """
+        Retrieves the request fingerprint and the package of a completed key, from the cache if possible.
+
+        :param key: The idempotency key.
+        :return: A tuple containing the fingerprint of the request and the ID of the package it created,
+                 or None if the key was not used within the window or its request is still in progress.
+        """
+        if self._cache is None:
+            return self._select(key)
+
+        cached = self._cache.get(self._cache_key(key))
+        if cached is not None:
+            return cached
+
+        stored = self._select(key)
+        if stored is not None:
+            self._cache.set(self._cache_key(key), stored)
+        return stored
+
+    @with_db_connection
+    def claim(self, key: str, fingerprint: str) -> tuple[str, int | None]:
+        """
+        Records the first use of a key, or locks the record of its earlier use.
+
+        The record is locked until the end of the transaction, so a concurrent request with the same key waits
+        for the first one to commit or roll back. Call it inside a transaction, together with `complete`.
+
+        :param key: The idempotency key.
+        :param fingerprint: The fingerprint of the request.
+        :return: A tuple containing the fingerprint of the request that used the key first and the ID of the
+                 package it created, or None instead of the ID if the key is claimed by this transaction.
+        """
+        now = datetime.now()
+        expired_before = now - self._window
+        self._cursor.execute(queries.CLAIM_IDEMPOTENCY_KEY,
+                             (key, fingerprint, now, expired_before, expired_before, expired_before))
+        self._cursor.execute(queries.LOCK_IDEMPOTENCY_KEY, (key,))
+        stored_fingerprint, package_id = self._cursor.fetchone()
+        return stored_fingerprint, package_id
+
+    @with_db_connection
+    def complete(self, key: str, fingerprint: str, package_id: int) -> None:
+        """
+        Records the package created for a claimed key, and caches it once the transaction commits.
+
+        :param key: The idempotency key.
+        :param fingerprint: The fingerprint of the request.
+        :param package_id: The ID of the created package.
+        """
+        self._cursor.execute(queries.COMPLETE_IDEMPOTENCY_KEY, (package_id, key))
+        if self._cache is not None:
+            self._connection_manager.after_commit(partial(self._cache.set, self._cache_key(key),
+                                                          (fingerprint, package_id)))
+
+    @with_db_connection
+    def purge(self) -> int:
+        """
+        Deletes the keys older than the window.
+
+        :return: The number of deleted keys.
+        """
+        self._cursor.execute(queries.PURGE_IDEMPOTENCY_KEYS, (datetime.now() - self._window,))
+        return self._cursor.rowcount
+
+    @with_db_connection
+    def _select(self, key: str) -> tuple[str, int] | None:
+        """
+        Reads a completed key used within the window from the database.
+
+        :param key: The idempotency key.
+        :return: A tuple containing the fingerprint of the request and the ID of the package, or None.
+        """
+        self._cursor.execute(queries.FIND_IDEMPOTENCY_KEY, (key, datetime.now() - self._window))
+        row = self._cursor.fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def _cache_key(self, key: str) -> str:
+        """
+        Builds the cache key of an idempotency key.
+
+        :param key: The idempotency key.
+        :return: The key of the record in the cache.
+        """
+        return f'{self.table_name()}:{key}'
+
+    def table_name(self) -> str:
+        """
+        Returns the name of the table.
+
+        :return: The name of the table.
+        """
+        return 'idempotency_key'
@@ -1,9 +1,26 @@
-from app.src.repository import LockerRepository, ClientRepository, ParcelLockerRepository, PackageRepository
-from app.src.database import MySQLConnectionManager
-from app.src.entity import Package, ParcelLocker, Locker
+from app.src.repository import (
+    LockerRepository,
+    ClientRepository,
+    ParcelLockerRepository,
+    PackageRepository,
+    LockerAvailabilityRepository,
+    IdempotencyKeyRepository,
+)
+from app.src.database import MySQLConnectionManager, transactional
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.entity import Package, ParcelLocker, Locker, Size
 from enum import Enum
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterator, Any
+
+import hashlib
+
+
+class IdempotencyKeyReused(ValueError):
+    """
+    Raised when an idempotency key is sent again with a request different from the one that used it first.
+    """
 
 
 @dataclass
@@ -16,7 +33,10 @@ class ParcelLockerService:
     """
 
     def __init__(self, locker_repo: LockerRepository, client_repo: ClientRepository, package_repo: PackageRepository,
-                 parcel_locker_repo: ParcelLockerRepository, connection_manager: MySQLConnectionManager):
+                 parcel_locker_repo: ParcelLockerRepository, connection_manager: MySQLConnectionManager,
+                 nearest_engine: NearestParcelLockerEngine | None = None,
+                 availability_repo: LockerAvailabilityRepository | None = None,
+                 idempotency_repo: IdempotencyKeyRepository | None = None):
         """
         Initializes the ParcelLockerService with repository and connection manager dependencies.
 
@@ -25,12 +45,23 @@ class ParcelLockerService:
         :param package_repo: Repository for managing packages.
         :param parcel_locker_repo: Repository for managing parcel lockers.
         :param connection_manager: Database connection manager.
+        :param nearest_engine: Engine for batch nearest parcel locker queries, shared between services;
+                               a private one is created if not given.
+        :param availability_repo: Repository for the free locker counters; created from the connection
+                                  manager if not given.
+        :param idempotency_repo: Repository for the idempotency keys of sent packages; created from the
+                                 connection manager, without a cache, if not given.
         """
         self.locker_repo = locker_repo
         self.client_repo = client_repo
         self.package_repo = package_repo
         self.parcel_locker_repo = parcel_locker_repo
         self._connection_manager = connection_manager
+        self.nearest_engine = nearest_engine if nearest_engine is not None else NearestParcelLockerEngine()
+        self.availability_repo = availability_repo if availability_repo is not None \
+            else LockerAvailabilityRepository(connection_manager)
+        self.idempotency_repo = idempotency_repo if idempotency_repo is not None \
+            else IdempotencyKeyRepository(connection_manager)
 
     def find_client_location(self, client_id: int) -> tuple[float, float]:
         """
@@ -42,53 +73,192 @@ class ParcelLockerService:
         client = self.client_repo.find_by_id(client_id)
         return client.latitude, client.longitude
 
+    def find_nearest_parcel_lockers_batch(self, client_ids: list[int], k: int,
+                                          max_distance: float | None = None) -> dict[int, list[tuple] | None]:
+        """
+        Finds the k nearest parcel lockers for many clients at once.
+
+        The distances are calculated in memory by the nearest parcel locker engine, which is loaded
+        with all parcel lockers on first use. The clients are looked up with `find_by_ids`,
+        so only the ones missing from the client cache are read from MySQL.
+
+        :param client_ids: The IDs of the clients.
+        :param k: The maximum number of parcel lockers to return for each client.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers), or None for no limit.
+        :return: A dictionary mapping each client ID to a list of tuples containing the ID, city, and distance
+                 of a parcel locker, nearest first, or to None if the client or their location is not found.
+        """
+        if not self.nearest_engine.is_built:
+            self.nearest_engine.rebuild(self.parcel_locker_repo.find_all())
+
+        clients = self.client_repo.find_by_ids(client_ids)
+        located = [client for client in clients.values()
+                   if client.latitude is not None and client.longitude is not None]
+        nearest = self.nearest_engine.find_nearest([(client.latitude, client.longitude) for client in located],
+                                                   k, max_distance)
+
+        result: dict[int, list[tuple] | None] = dict.fromkeys(client_ids)
+        result.update({client.id_: parcel_lockers for client, parcel_lockers in zip(located, nearest)})
+        return result
+
+    @transactional
     def send_package(self, client_id: int, receiver_id: int, max_distance: float, size: Enum) -> Package:
         """
         Sends a package to the nearest parcel locker with available slots.
 
+        The nearest parcel lockers with a free locker of the requested size are found with a single query,
+        and a locker is locked with `LockerRepository.reserve_lockers`, so concurrent senders never get
+        the same locker. If other senders took the last free lockers of the nearest parcel lockers, the search
+        continues with the farther ones in range. The locker is written once, when `LockerRepository.assign_lockers`
+        occupies it with the package. All database operations run in a single transaction.
+
+        Finding the parcel locker and locking its locker take two queries rather than one: a locking read joining
+        the lockers to the distance sort would lock every free locker it sorts, not only the one it returns, and
+        concurrent senders would skip them all. A send therefore costs one parcel locker query and one
+        `reserve_lockers` query, plus one `reserve_lockers` query for every nearer parcel locker whose lockers
+        were taken meanwhile and one more parcel locker query whenever the search has to widen.
+
         :param client_id: The ID of the sender.
         :param receiver_id: The ID of the receiver.
         :param max_distance: The maximum distance to search for parcel lockers.
         :param size: Size of the package.
         :return: The created Package instance.
-        :raises ValueError: If no parcel lockers or available slots are found.
+        :raises ValueError: If the sender or the receiver, or parcel lockers or available slots are not found.
         """
-        parcel_lockers = self.parcel_locker_repo.find_nearest_parcel_lockers(client_id, max_distance)
-        if not parcel_lockers:
-            raise ValueError("No parcel lockers found")
+        size = size.value if isinstance(size, Enum) else size
+        clients = self.client_repo.find_by_ids([client_id, receiver_id])
+        if client_id not in clients:
+            raise ValueError("No sender found")
+        if receiver_id not in clients:
+            raise ValueError("No receiver found")
 
-        for parcel_locker in parcel_lockers:
-            available_slots = self.locker_repo.has_available_slots(size, parcel_locker[0])
-            if available_slots:
+        sender = clients[client_id]
+        for parcel_locker_id in self._available_parcel_lockers(sender.latitude, sender.longitude, max_distance, size):
+            locker_ids = self.locker_repo.reserve_lockers(size, parcel_locker_id, 1)
+            if locker_ids:
+                self.availability_repo.adjust(parcel_locker_id, size, -1)
                 package = Package(
                     sender_id=client_id,
                     receiver_id=receiver_id,
-                    parcel_locker_id=parcel_locker[0],
-                    locker_id=available_slots[0],
+                    parcel_locker_id=parcel_locker_id,
+                    locker_id=locker_ids[0],
                     status="In locker",
-                    size=str(size),
+                    size=size,
                     created_at=datetime.now()
                 )
                 package = self.package_repo.insert(package)
-                locker_to_use = self.locker_repo.find_by_id(available_slots[0])
-                locker_to_use.status, locker_to_use.package_id, locker_to_use.client_id \
-                    = "Occupied", package, receiver_id
-                self.locker_repo.update(locker_to_use.id_, locker_to_use)
+                self.locker_repo.assign_lockers([(locker_ids[0], package, receiver_id)])
                 return package
+
+        if not self.parcel_locker_repo.find_nearest_parcel_lockers(client_id, max_distance):
+            raise ValueError("No parcel lockers found")
         raise ValueError("No available slots found")
 
+    def send_package_once(self, idempotency_key: str, client_id: int, receiver_id: int, max_distance: float,
+                          size: Enum) -> tuple[int, bool]:
+        """
+        Sends a package at most once per idempotency key, so a client can safely retry a request that timed out.
+
+        A retry of a completed request is answered from the idempotency key cache, or with a single query,
+        without reserving a locker. Otherwise the key is claimed in the transaction sending the package,
+        so a retry arriving while the first request is still running waits for it and gets its package.
+        A request that fails leaves the key unused.
+
+        :param idempotency_key: The Idempotency-Key header of the request.
+        :param client_id: The ID of the sender.
+        :param receiver_id: The ID of the receiver.
+        :param max_distance: The maximum distance to search for parcel lockers.
+        :param size: Size of the package.
+        :return: A tuple containing the ID of the package and whether it was created by an earlier request.
+        :raises IdempotencyKeyReused: If the key was used for a different request.
+        :raises ValueError: If the sender or the receiver, or parcel lockers or available slots are not found.
+        """
+        size = size.value if isinstance(size, Enum) else size
+        fingerprint = request_fingerprint(client_id, receiver_id, max_distance, size)
+        stored = self.idempotency_repo.find(idempotency_key)
+        if stored is None:
+            return self._send_package_once(idempotency_key, fingerprint, client_id, receiver_id, max_distance, size)
+
+        stored_fingerprint, package_id = stored
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("The idempotency key was used for a different request")
+        return package_id, True
+
+    @transactional
+    def send_packages(self, requests: list[tuple[int, int, float, Enum | str]]) -> list[tuple[int | None, str | None]]:
+        """
+        Sends many packages at once, e.g. the manifest of a courier, in a single transaction.
+
+        The packages are grouped by the location of their sender, the maximum distance and the size, and the lockers
+        of every group are planned in one pass: the nearest parcel lockers with free lockers are found with a single
+        query per group, and as many lockers as the group still needs are reserved in each of them with a single
+        statement. The packages are then written with a multi-row insert, their IDs are read back by locker with
+        a single query, as MySQL does not guarantee that they are consecutive, and the lockers are occupied with
+        a single update, so the number of statements depends on the number of groups and parcel lockers used,
+        not on the number of packages. A package that cannot be sent does not stop the others.
+
+        :param requests: Tuples containing the ID of the sender, the ID of the receiver, the maximum distance to
+                         search for parcel lockers and the size of a package.
+        :return: One tuple per request, in the same order, containing the ID of the created package and None,
+                 or None and the reason the package was not sent, as in the errors of `send_package`.
+        """
+        requests = [(client_id, receiver_id, max_distance, size.value if isinstance(size, Enum) else size)
+                    for client_id, receiver_id, max_distance, size in requests]
+        clients = self.client_repo.find_by_ids([client_id for request in requests for client_id in request[:2]])
+        results, groups = plan_packages(requests, clients)
+
+        reservations: list[tuple[int, int, int]] = []
+        for (latitude, longitude, max_distance, size), indexes in groups.items():
+            for parcel_locker_id in self._available_parcel_lockers(latitude, longitude, max_distance, size,
+                                                                   len(indexes)):
+                locker_ids = self.locker_repo.reserve_lockers(size, parcel_locker_id, len(indexes))
+                if locker_ids:
+                    self.availability_repo.adjust(parcel_locker_id, size, -len(locker_ids))
+                    reservations.extend(zip(indexes, [parcel_locker_id] * len(locker_ids), locker_ids))
+                    indexes = indexes[len(locker_ids):]
+                if not indexes:
+                    break
+
+            if indexes:
+                error = "No available slots found" if self.parcel_locker_repo.find_parcel_lockers_within(
+                    latitude, longitude, max_distance) else "No parcel lockers found"
+                for index in indexes:
+                    results[index] = (None, error)
+
+        if not reservations:
+            return results
+
+        self.package_repo.insert_many(build_packages(requests, reservations))
+        package_ids = self.package_repo.find_ids_in_lockers([locker_id for _, _, locker_id in reservations])
+        self.locker_repo.assign_lockers([(locker_id, package_ids[locker_id], requests[index][1])
+                                         for index, _, locker_id in reservations])
+        for index, _, locker_id in reservations:
+            results[index] = (package_ids[locker_id], None)
+        return results
+
+    def purge_idempotency_keys(self) -> int:
+        """
+        Deletes the idempotency keys that are no longer remembered.
+
+        :return: The number of deleted keys.
+        """
+        return self.idempotency_repo.purge()
+
+    @transactional
     def receive_package(self, package_id: int) -> None:
         """
         Marks a package as received and updates the locker status to available.
 
+        All database operations run in a single transaction.
+
         :param package_id: The ID of the package to receive.
         :raises ValueError: If the package or its associated locker is not found.
         """
         package = self.package_repo.find_by_id(package_id)
-        locker_to_use = self.locker_repo.find_by_id(package.locker_id)
-
         if not package:
             raise ValueError("No package found")
+
+        locker_to_use = self.locker_repo.find_by_id(package.locker_id)
         if not locker_to_use:
             raise ValueError("No locker_to_use found")
 
@@ -96,14 +266,78 @@ class ParcelLockerService:
         package.delivered_at = datetime.now()
         self.package_repo.update(package_id, package)
 
+        if locker_to_use.status != "Available":
+            self.availability_repo.adjust(locker_to_use.parcel_locker_id, locker_to_use.size, 1)
         locker_to_use.status = "Available"
         locker_to_use.package_id = None
         locker_to_use.client_id = None
         self.locker_repo.update(locker_to_use.id_, locker_to_use)
 
+    @transactional
+    def _send_package_once(self, idempotency_key: str, fingerprint: str, client_id: int, receiver_id: int,
+                           max_distance: float, size: str) -> tuple[int, bool]:
+        """
+        Claims an idempotency key and sends the package in the same transaction, unless the key was used before.
+
+        :param idempotency_key: The Idempotency-Key header of the request.
+        :param fingerprint: The fingerprint of the request.
+        :param client_id: The ID of the sender.
+        :param receiver_id: The ID of the receiver.
+        :param max_distance: The maximum distance to search for parcel lockers.
+        :param size: Size of the package.
+        :return: A tuple containing the ID of the package and whether it was created by an earlier request.
+        :raises IdempotencyKeyReused: If the key was used for a different request.
+        """
+        stored_fingerprint, package_id = self.idempotency_repo.claim(idempotency_key, fingerprint)
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("The idempotency key was used for a different request")
+        if package_id is not None:
+            return package_id, True
+
+        package_id = self.send_package(client_id, receiver_id, max_distance, size)
+        self.idempotency_repo.complete(idempotency_key, fingerprint, package_id)
+        return package_id, False
+
+    def _available_parcel_lockers(self, latitude: float, longitude: float, max_distance: float, size: str,
+                                  limit: int = 5) -> Iterator[int]:
+        """
+        Yields the IDs of the parcel lockers within a distance from a point that have a free locker of a size,
+        nearest first.
+
+        The nearest `limit` parcel lockers are read first. If the caller asks for more, e.g. because concurrent
+        senders took the last free lockers of those, the search is repeated for four times as many parcel lockers,
+        skipping the ones already yielded, until every parcel locker in range has been yielded.
+
+        The parcel lockers are found by the free locker counters first. The counters are only approximate, e.g.
+        when a change was lost after its transaction committed, so once the counted parcel lockers run out the
+        search is repeated on the `locker` table, and a parcel locker whose counter is too low is still used.
+
+        :param latitude: Latitude of the point.
+        :param longitude: Longitude of the point.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :param size: Size of the locker (e.g., small, medium, large).
+        :param limit: The number of parcel lockers read by the first query.
+        :return: A generator of parcel locker IDs.
+        """
+        yielded: set[int] = set()
+        for counted in (True, False):
+            batch = limit
+            while True:
+                parcel_lockers = self.parcel_locker_repo.find_available_parcel_lockers_within(
+                    latitude, longitude, max_distance, size, batch, counted
+                )
+                for parcel_locker in parcel_lockers:
+                    if parcel_locker[0] not in yielded:
+                        yielded.add(parcel_locker[0])
+                        yield parcel_locker[0]
+                if len(parcel_lockers) < batch:
+                    break
+                batch *= 4
+
     def add_parcel_locker(self, city: str, postal_code: str, latitude: float, longitude: float) -> int:
         """
-        Creates a new ParcelLocker object and inserts it into the database.
+        Creates a new ParcelLocker object and inserts it into the database, the parcel locker index and the
+        nearest parcel locker engine.
 
         :param city: The name of the city where the parcel locker is located
         :param postal_code: The postal code of the parcel locker
@@ -119,12 +353,17 @@ class ParcelLockerService:
         )
 
         new_parcel_locker = self.parcel_locker_repo.insert(parcel_locker)
+        parcel_locker.id_ = new_parcel_locker
+        if self.parcel_locker_repo.index is not None:
+            self.parcel_locker_repo.index.add(parcel_locker)
+        self.nearest_engine.add(parcel_locker)
         return new_parcel_locker
 
+    @transactional
     def add_locker(self, parcel_locker_id: int, package_id: int | None, client_id: int | None, size: str,
                    status: str) -> Locker:
         """
-        Creates a new Locker object and inserts it into the database.
+        Creates a new Locker object and inserts it into the database, counting it as free if it is available.
 
         :param parcel_locker_id: The ID of the parcel locker this locker belongs to.
         :param package_id: The ID of the package inside this locker (optional).
@@ -142,4 +381,174 @@ class ParcelLockerService:
         )
 
         new_locker = self.locker_repo.insert(locker)
+        if status == "Available":
+            self.availability_repo.adjust(parcel_locker_id, size, 1)
         return new_locker
+
+    def find_availability(self, parcel_locker_id: int) -> dict[str, int] | None:
+        """
+        Finds the number of free lockers of each size in a parcel locker.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :return: A dictionary mapping every locker size to the number of free lockers,
+                 or None if the parcel locker does not exist.
+        """
+        availability = self.availability_repo.find_by_parcel_locker(parcel_locker_id)
+        if not availability and self.parcel_locker_repo.find_by_id(parcel_locker_id) is None:
+            return None
+        return {size.value: availability.get(size.value, 0) for size in Size}
+
+    def reconcile_availability(self) -> list[tuple[int, str, int, int]]:
+        """
+        Rebuilds the free locker counters from the lockers and reports the ones that had drifted.
+
+        :return: A list of tuples, each containing the parcel locker ID, size, recorded and actual
+                 number of free lockers, for every counter that was wrong.
+        """
+        return self.availability_repo.reconcile()
+
+    def iter_packages(self, after_id: int = 0, limit: int = 100, status: str | None = None, size: str | None = None,
+                      receiver_id: int | None = None, created_from: datetime | None = None,
+                      created_to: datetime | None = None) -> Iterator[Package]:
+        """
+        Streams a page of packages ordered by ID, optionally filtered.
+
+        :param after_id: The ID of the last package of the previous page (default: 0, the first page).
+        :param limit: The maximum number of packages on the page.
+        :param status: Only packages with this status.
+        :param size: Only packages of this size.
+        :param receiver_id: Only packages sent to this client.
+        :param created_from: Only packages created at or after this time.
+        :param created_to: Only packages created before this time.
+        :return: A generator of packages.
+        """
+        conditions = package_filters(status, size, receiver_id, created_from, created_to)
+        return self.package_repo.iter_page(after_id, limit, conditions)
+
+    def iter_parcel_lockers(self, after_id: int = 0, limit: int = 100,
+                            city: str | None = None) -> Iterator[ParcelLocker]:
+        """
+        Streams a page of parcel lockers ordered by ID, optionally filtered by city.
+
+        :param after_id: The ID of the last parcel locker of the previous page (default: 0, the first page).
+        :param limit: The maximum number of parcel lockers on the page.
+        :param city: Only parcel lockers in this city.
+        :return: A generator of parcel lockers.
+        """
+        conditions = [('city', '=', city)] if city is not None else []
+        return self.parcel_locker_repo.iter_page(after_id, limit, conditions)
+
+    def iter_lockers(self, parcel_locker_id: int, after_id: int = 0, limit: int = 100, status: str | None = None,
+                     size: str | None = None) -> Iterator[Locker]:
+        """
+        Streams a page of the lockers of a parcel locker ordered by ID, optionally filtered.
+
+        :param parcel_locker_id: The ID of the parcel locker.
+        :param after_id: The ID of the last locker of the previous page (default: 0, the first page).
+        :param limit: The maximum number of lockers on the page.
+        :param status: Only lockers with this status.
+        :param size: Only lockers of this size.
+        :return: A generator of lockers.
+        """
+        conditions = locker_filters(parcel_locker_id, status, size)
+        return self.locker_repo.iter_page(after_id, limit, conditions)
+
+
+def package_filters(status: str | None = None, size: str | None = None, receiver_id: int | None = None,
+                    created_from: datetime | None = None,
+                    created_to: datetime | None = None) -> list[tuple[str, str, Any]]:
+    """
+    Builds the filters of a package listing; filters without a value are left out.
+
+    :param status: Only packages with this status.
+    :param size: Only packages of this size.
+    :param receiver_id: Only packages sent to this client.
+    :param created_from: Only packages created at or after this time.
+    :param created_to: Only packages created before this time.
+    :return: The filters as (column, operator, value) tuples.
+    """
+    conditions = [(column, '=', value)
+                  for column, value in (('status', status), ('size', size), ('receiver_id', receiver_id))
+                  if value is not None]
+    if created_from is not None:
+        conditions.append(('created_at', '>=', created_from))
+    if created_to is not None:
+        conditions.append(('created_at', '<', created_to))
+    return conditions
+
+
+def locker_filters(parcel_locker_id: int, status: str | None = None,
+                   size: str | None = None) -> list[tuple[str, str, Any]]:
+    """
+    Builds the filters of a listing of the lockers of a parcel locker; filters without a value are left out.
+
+    :param parcel_locker_id: The ID of the parcel locker.
+    :param status: Only lockers with this status.
+    :param size: Only lockers of this size.
+    :return: The filters as (column, operator, value) tuples.
+    """
+    return [(column, '=', value)
+            for column, value in (('parcel_locker_id', parcel_locker_id), ('status', status), ('size', size))
+            if value is not None]
+
+
+def request_fingerprint(*values: Any) -> str:
+    """
+    Derives the fingerprint of a request from the values it was made with, stored with its idempotency key.
+
+    :param values: The values of the request.
+    :return: A hexadecimal digest of the values.
+    """
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+
+def plan_packages(requests: list[tuple[int, int, float, str]],
+                  clients: dict[int, Any]) -> tuple[list[tuple[int | None, str | None]],
+                                                    dict[tuple[float, float, float, str], list[int]]]:
+    """
+    Checks the senders and receivers of many packages and groups the packages that can share parcel lockers.
+
+    :param requests: Tuples containing the ID of the sender, the ID of the receiver, the maximum distance to
+                     search for parcel lockers and the size of a package.
+    :param clients: The senders and receivers found, keyed by ID.
+    :return: A tuple containing the results of the requests, with the reason for every package whose sender
+             or receiver is not found, and the indexes of the other requests keyed by the location of the sender,
+             the maximum distance and the size.
+    """
+    results: list[tuple[int | None, str | None]] = [(None, None)] * len(requests)
+    groups: dict[tuple[float, float, float, str], list[int]] = {}
+    for index, (client_id, receiver_id, max_distance, size) in enumerate(requests):
+        if client_id not in clients:
+            results[index] = (None, "No sender found")
+        elif receiver_id not in clients:
+            results[index] = (None, "No receiver found")
+        else:
+            sender = clients[client_id]
+            groups.setdefault((sender.latitude, sender.longitude, max_distance, size), []).append(index)
+    return results, groups
+
+
+def build_packages(requests: list[tuple[int, int, float, str]],
+                   reservations: list[tuple[int, int, int]]) -> list[Package]:
+    """
+    Builds the packages of the requests that got a locker.
+
+    :param requests: Tuples containing the ID of the sender, the ID of the receiver, the maximum distance to
+                     search for parcel lockers and the size of a package.
+    :param reservations: Tuples containing the index of a request, the ID of the parcel locker and the ID
+                         of the locker reserved for it.
+    :return: The packages, in the order of the reservations.
+    """
+    created_at = datetime.now()
+    return [
+        Package(
+            sender_id=requests[index][0],
+            receiver_id=requests[index][1],
+            parcel_locker_id=parcel_locker_id,
+            locker_id=locker_id,
+            status="In locker",
+            size=requests[index][3],
+            created_at=created_at
+        )
+        for index, parcel_locker_id, locker_id in reservations
+    ]
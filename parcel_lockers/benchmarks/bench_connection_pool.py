@@ -0,0 +1,43 @@
+from benchmarks.common import measure, report
+from app.src.configuration import ServiceContainer
+from app.src.database import MySQLConnectionManager
+from app.src.repository import ClientRepository
+import argparse
+
+
+def per_request_pool(client_id: int) -> None:
+    """
+    Simulates a request handled the old way, with a new connection pool created for the request.
+
+    :param client_id: The ID of the client to look up.
+    """
+    ClientRepository(MySQLConnectionManager()).find_by_id(client_id)
+
+
+def main() -> None:
+    """
+    Compares per-request latency of a client lookup with a per-request pool and with the shared pool.
+
+    Uses the DB_* environment variables to connect to the database, e.g. the test database
+    started by docker-compose.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--client-id', type=int, default=1)
+    args = parser.parse_args()
+
+    container = ServiceContainer()
+    results = {
+        'new pool per request': measure(lambda: per_request_pool(args.client_id), args.requests),
+        'shared pool (container)': measure(
+            lambda: container.create_parcel_locker_service().client_repo.find_by_id(args.client_id),
+            args.requests
+        )
+    }
+    report('Client lookup latency per request', results)
+    print(container.stats())
+    container.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+from app.src.database import MySQLConnectionManager
+from app.src.entity import Client
+from app.src.repository import ClientRepository
+from typing import Callable, Iterable, Any
+import argparse
+import time
+import tracemalloc
+
+
+def measure_memory(func: Callable[[], Iterable[Any]]) -> dict[str, float]:
+    """
+    Consumes the entities returned by a function and records the peak of the memory allocated meanwhile.
+
+    :param func: The function returning the entities, called without arguments.
+    :return: A dictionary with the number of entities, the elapsed time and the peak memory in MiB.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = sum(1 for _ in func())
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'entities': count, 'seconds': elapsed, 'peak_mib': peak / 2 ** 20}
+
+
+def paged(repository: ClientRepository, limit: int) -> Iterable[Client]:
+    """
+    Reads every client page by page with keyset pagination.
+
+    :param repository: The repository to read from.
+    :param limit: The number of clients per page.
+    :return: A generator of clients.
+    """
+    after_id = 0
+    while page := repository.find_page(after_id, limit):
+        yield from page
+        after_id = page[-1].id_
+
+
+def main() -> None:
+    """
+    Compares the peak memory of reading a whole table with find_all, iter_all and keyset pagination.
+
+    Inserts --rows synthetic clients first and deletes them afterwards, using the DB_* environment
+    variables to connect to the database.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    connection_manager = MySQLConnectionManager()
+    repository = ClientRepository(connection_manager)
+    repository.insert_many(
+        Client(first_name='Bench', last_name=f'Client{i}', email=f'bench-find-all-{i}@example.com',
+               phone_number=f'{i:09d}', latitude=52.0, longitude=21.0)
+        for i in range(args.rows)
+    )
+
+    try:
+        results = {
+            'find_all': measure_memory(repository.find_all),
+            f'iter_all, batches of {args.batch_size}': measure_memory(lambda: repository.iter_all(args.batch_size)),
+            f'find_page, pages of {args.batch_size}': measure_memory(lambda: paged(repository, args.batch_size))
+        }
+    finally:
+        with connection_manager.transaction() as connection, connection.cursor() as cursor:
+            cursor.execute("DELETE FROM client WHERE email LIKE 'bench-find-all-%'")
+        connection_manager.close()
+
+    print(f'Reading the client table ({args.rows} synthetic rows)')
+    print(f"{'variant':<40}{'entities':>10}{'seconds':>10}{'peak MiB':>10}")
+    for variant, result in results.items():
+        print(f"{variant:<40}{result['entities']:>10}{result['seconds']:>10.2f}{result['peak_mib']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+from benchmarks.common import measure, report
+from app.src.database import MySQLConnectionManager
+from app.src.entity import Client
+from app.src.mapper import mapper_for
+from app.src.repository import ClientRepository
+import argparse
+
+
+def reflected_values(clients: list[Client]) -> list[str]:
+    """
+    Prepares the rows of insert_many the way the repository did before it used an entity mapper,
+    walking the entity annotations and calling getattr three times per field for every row.
+
+    :param clients: The clients to insert.
+    :return: The rows rendered as SQL value lists.
+    """
+    def column_values(item: Client) -> str:
+        names = [name for name in Client.__annotations__.keys() if name != '_id']
+        return ', '.join([
+            "NULL" if getattr(item, name) is None else
+            str(getattr(item, name)) if isinstance(getattr(item, name), (int, float))
+            else f"'{getattr(item, name)}'"
+            for name in names
+        ])
+    return [f"({column_values(item)})" for item in clients]
+
+
+def mapped_values(clients: list[Client]) -> list[tuple]:
+    """
+    Prepares the parameters of insert_many with the compiled entity mapper.
+
+    :param clients: The clients to insert.
+    :return: One parameter tuple per client.
+    """
+    return list(map(mapper_for(Client).values, clients))
+
+
+def synthetic_clients(count: int) -> list[Client]:
+    """
+    Generates clients with unique e-mail addresses, so they can be inserted and removed again.
+
+    :param count: The number of clients to generate.
+    :return: A list of clients without IDs.
+    """
+    return [
+        Client(first_name='Bench', last_name=f'Client{i}', email=f'bench-insert-many-{i}@example.com',
+               phone_number=f'{i:09d}', latitude=52.0 + i % 1000 / 1000, longitude=21.0 + i % 997 / 1000)
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    """
+    Measures the cost of preparing and inserting many clients at once.
+
+    Without --database only the Python side of insert_many is measured. With --database the rows are
+    also inserted with ClientRepository.insert_many in chunks of --chunk-size rows and deleted afterwards, using the DB_* environment
+    variables to connect to the database.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--database', action='store_true')
+    args = parser.parse_args()
+
+    clients = synthetic_clients(args.rows)
+    report(f'insert_many row preparation, {args.rows} rows', {
+        'reflected annotations': measure(lambda: reflected_values(clients), args.repeat, warmup=1),
+        'entity mapper': measure(lambda: mapped_values(clients), args.repeat, warmup=1)
+    })
+
+    if args.database:
+        connection_manager = MySQLConnectionManager()
+        repository = ClientRepository(connection_manager)
+
+        def insert_and_clean_up() -> None:
+            repository.insert_many(clients, args.chunk_size)
+            with connection_manager.transaction() as connection, connection.cursor() as cursor:
+                cursor.execute("DELETE FROM client WHERE email LIKE 'bench-insert-many-%'")
+
+        report(f'insert_many round trip, {args.rows} rows',
+               {'insert_many + delete of the rows': measure(insert_and_clean_up, args.repeat, warmup=1)})
+        connection_manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+from benchmarks.common import report
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+
+
+async def run_load(base_url: str, paths: list[str], requests: int, concurrency: int,
+                   timeout: float) -> dict[str, float]:
+    """
+    Sends GET requests to a deployment from many concurrent clients and summarizes the responses.
+
+    :param base_url: The URL of the deployment, e.g. http://localhost:81.
+    :param paths: The paths requested in turn, e.g. /clients/1.
+    :param requests: The total number of requests.
+    :param concurrency: The number of requests in flight at the same time.
+    :param timeout: Seconds after which a request counts as failed.
+    :return: A dictionary with the latency percentiles in milliseconds, the throughput in requests per second
+             and the number of failed requests, i.e. timeouts, connection errors and 5xx responses.
+    """
+    targets = itertools.islice(itertools.cycle(paths), requests)
+    samples: list[float] = []
+    errors = 0
+
+    async def client(session: httpx.AsyncClient) -> None:
+        """
+        Sends requests one after another until all requests are sent.
+
+        :param session: The HTTP client shared by all concurrent clients.
+        """
+        nonlocal errors
+        for path in targets:
+            started = time.perf_counter()
+            try:
+                response = await session.get(path)
+                await response.aread()
+                failed = response.status_code >= 500
+            except httpx.HTTPError:
+                failed = True
+            samples.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        'max_ms': samples[-1],
+        'throughput': len(samples) / elapsed,
+        'errors': errors
+    }
+
+
+def main() -> None:
+    """
+    Compares the throughput and latency of the sync and the asyncio deployments of the service under load.
+
+    Every target is loaded in turn with the same requests, e.g. the Flask application behind nginx
+    (http://localhost:81) and the Quart application (http://localhost:8101), which docker-compose only
+    publishes on the host with the docker-compose.bench.yml override.
+    Raise --concurrency to see how each deployment copes with many requests in flight at once.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--target', action='append', metavar='NAME=URL',
+                        help='A deployment to load; may be repeated (default: sync and async from docker-compose)')
+    parser.add_argument('--path', action='append',
+                        help='A path to request; may be repeated (default: /clients/1)')
+    parser.add_argument('--requests', type=int, default=5_000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    targets = dict(target.split('=', 1) for target in
+                   args.target or ['sync=http://localhost:81', 'async=http://localhost:8101'])
+    paths = args.path or ['/clients/1']
+
+    results = {}
+    for name, url in targets.items():
+        results[f'{name} ({args.concurrency} in flight)'] = asyncio.run(
+            run_load(url, paths, args.requests, args.concurrency, args.timeout)
+        )
+
+    report(f'Latency of {args.requests} requests to {", ".join(paths)}', results)
+    print(f"{'variant':<32}{'req/s':>10}{'p99 ms':>10}{'errors':>10}")
+    for variant, summary in results.items():
+        print(f"{variant:<32}{summary['throughput']:>10.1f}{summary['p99_ms']:>10.3f}{summary['errors']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+from app.src.entity import Package
+from app.src.mapper import mapper_for
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Any, Self
+import argparse
+import os
+import time
+import tracemalloc
+
+
+@dataclass
+class DictPackage:
+    """
+    The package entity as it was before entities were slotted, with its column-converting `from_row`.
+    """
+    id_: int | None = None
+    sender_id: int | None = None
+    receiver_id: int | None = None
+    parcel_locker_id: int | None = None
+    locker_id: int | None = None
+    status: str | None = None
+    size: str | None = None
+    delivered_at: datetime | None = None
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def from_row(cls, *args) -> Self:
+        """
+        Creates a package from a row in table column order, converting every column.
+
+        :param args: The row data from the database.
+        :return: A DictPackage instance.
+        """
+        return cls(
+            id_=int(args[0]),
+            sender_id=int(args[1]),
+            receiver_id=int(args[2]),
+            parcel_locker_id=int(args[3]),
+            locker_id=int(args[4]) if args[4] is not None else None,
+            status=args[8],
+            size=args[5],
+            delivered_at=args[7],
+            created_at=args[6]
+        )
+
+
+def measure_materialization(func: Callable[[], list[Any]]) -> dict[str, float]:
+    """
+    Materialises a list of entities and records the time and the memory it takes.
+
+    :param func: The function building the entities, called without arguments.
+    :return: A dictionary with the elapsed time in seconds and the peak and retained memory in MiB.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    entities = func()
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities
+    return {'seconds': elapsed, 'peak_mib': peak / 2 ** 20, 'retained_mib': retained / 2 ** 20}
+
+
+def main() -> None:
+    """
+    Compares materialising packages from cursor rows with the old and the current entity mapping.
+
+    The old mapping builds dataclasses with a per-instance __dict__, converts every column and printed every
+    row; the print is sent to os.devnull here. The current mapping passes rows selected in field order
+    straight to the slotted entity constructor.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--with-print', action='store_true', help='Include the old print of every row.')
+    args = parser.parse_args()
+
+    created_at = datetime(2024, 1, 1)
+    table_rows = [(i, i % 5000 + 1, i % 4999 + 1, i % 800 + 1, i, 'M', created_at + timedelta(seconds=i), None, 'Sent')
+                  for i in range(1, args.rows + 1)]
+    field_rows = [(i, sender_id, receiver_id, parcel_locker_id, locker_id, status, size, delivered_at, created)
+                  for i, sender_id, receiver_id, parcel_locker_id, locker_id, size, created, delivered_at, status
+                  in table_rows]
+
+    def legacy() -> list[DictPackage]:
+        if not args.with_print:
+            return [DictPackage.from_row(*row) for row in table_rows]
+        with open(os.devnull, 'w') as devnull:
+            packages = []
+            for row in table_rows:
+                print(f"Row data received in from_row: {row}", file=devnull)
+                packages.append(DictPackage.from_row(*row))
+            return packages
+
+    from_row = mapper_for(Package).from_row
+    results = {
+        'dict dataclass + from_row': measure_materialization(legacy),
+        'slotted dataclass + mapper': measure_materialization(lambda: [from_row(*row) for row in field_rows])
+    }
+
+    print(f'Materialising {args.rows} packages')
+    print(f"{'variant':<32}{'seconds':>10}{'peak MiB':>10}{'kept MiB':>10}")
+    for variant, result in results.items():
+        print(f"{variant:<32}{result['seconds']:>10.2f}{result['peak_mib']:>10.1f}{result['retained_mib']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
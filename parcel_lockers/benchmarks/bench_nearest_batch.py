@@ -0,0 +1,70 @@
+from benchmarks.common import measure, report
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.database import MySQLConnectionManager
+from app.src.entity import ParcelLocker
+from app.src.geo_index import GridParcelLockerIndex
+from app.src.repository import ClientRepository, ParcelLockerRepository
+import argparse
+import random
+
+
+def main() -> None:
+    """
+    Compares a batch nearest parcel locker query for many clients with one query per client.
+
+    By default synthetic parcel lockers spread over Poland are searched in memory, and the single queries
+    use the grid index. With --database the parcel lockers are loaded from the database configured by the
+    DB_* environment variables and the single queries go through MySQL, as `find_nearest_parcel_lockers` does.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--parcel-lockers', type=int, default=20_000)
+    parser.add_argument('--clients', type=int, default=1_000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--max-distance', type=float, default=20.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database', action='store_true')
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    points = [(generator.uniform(49.0, 54.8), generator.uniform(14.1, 24.1)) for _ in range(args.clients)]
+    engine = NearestParcelLockerEngine()
+    results = {}
+
+    if args.database:
+        connection_manager = MySQLConnectionManager()
+        repository = ParcelLockerRepository(connection_manager, ClientRepository(connection_manager))
+        engine.rebuild(repository.find_all())
+
+        def sql_single_calls() -> None:
+            for latitude, longitude in points:
+                repository.find_parcel_lockers_within(latitude, longitude, args.max_distance)[:args.k]
+
+        results[f'{args.clients} single calls, MySQL'] = measure(sql_single_calls, args.repeat, warmup=1)
+    else:
+        parcel_lockers = [
+            ParcelLocker(id_=parcel_locker_id, city='Synthetic', postal_code='00-000',
+                         latitude=generator.uniform(49.0, 54.8), longitude=generator.uniform(14.1, 24.1))
+            for parcel_locker_id in range(1, args.parcel_lockers + 1)
+        ]
+        engine.rebuild(parcel_lockers)
+        index = GridParcelLockerIndex()
+        index.rebuild(parcel_lockers)
+
+        def index_single_calls() -> None:
+            for latitude, longitude in points:
+                index.find_within(latitude, longitude, args.max_distance, args.k)
+
+        results[f'{args.clients} single calls, grid index'] = measure(index_single_calls, args.repeat, warmup=1)
+
+    def engine_single_calls() -> None:
+        for point in points:
+            engine.find_nearest([point], args.k, args.max_distance)
+
+    results[f'{args.clients} single calls, NumPy'] = measure(engine_single_calls, args.repeat, warmup=1)
+    results['one batch call, NumPy'] = measure(lambda: engine.find_nearest(points, args.k, args.max_distance),
+                                               args.repeat, warmup=1)
+    report(f'Nearest {args.k} parcel lockers for {args.clients} clients', results)
+
+
+if __name__ == '__main__':
+    main()
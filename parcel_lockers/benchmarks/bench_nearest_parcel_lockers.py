@@ -0,0 +1,95 @@
+from benchmarks.common import measure, report
+from app.src.database import MySQLConnectionManager, with_db_connection
+from app.src.entity import Client, ParcelLocker
+from app.src.repository import ClientRepository, ParcelLockerRepository
+import argparse
+import random
+
+BENCHMARK_CITY = 'Benchmark'
+
+
+class FullScanParcelLockerRepository(ParcelLockerRepository):
+    """
+    Parcel locker repository with the previous nearest parcel locker query, which scans the whole table.
+    """
+
+    @with_db_connection
+    def find_nearest_parcel_lockers(self, client_id: int, max_distance: float) -> list[tuple[int, ...]]:
+        """
+        Finds the nearest parcel lockers by calculating the distance to every parcel locker.
+
+        :param client_id: The ID of the client.
+        :param max_distance: The maximum distance to search for parcel lockers (in kilometers).
+        :return: A list of tuples, each containing the ID, city, and distance of a parcel locker.
+        """
+        client_location = self._client_repo.find_by_id(client_id)
+
+        sql = (f"WITH DistanceCalc AS ( "
+               f"SELECT {self.table_name()}.id_, {self.table_name()}.city, "
+               f"(6371.0 * 2 * ASIN(SQRT(POWER(SIN((RADIANS(%s) - RADIANS(latitude)) / 2), 2) + "
+               f"COS(RADIANS(%s)) * COS(RADIANS(latitude)) * "
+               f"POWER(SIN((RADIANS(%s) - RADIANS(longitude)) / 2), 2)))) AS distance "
+               f"FROM {self.table_name()} ) SELECT id_, city, distance FROM DistanceCalc WHERE distance < %s "
+               f"ORDER BY distance;")
+
+        self._cursor.execute(sql, (client_location.latitude, client_location.latitude, client_location.longitude,
+                                   max_distance))
+        result = self._cursor.fetchall()
+        return sorted(result, key=lambda x: x[2])
+
+
+@with_db_connection
+def _delete_benchmark_data(self) -> None:
+    """
+    Deletes the parcel lockers and the client created by the benchmark.
+    """
+    self._cursor.execute("DELETE FROM parcel_locker WHERE city = %s", (BENCHMARK_CITY,))
+    self._cursor.execute("DELETE FROM client WHERE email = %s", ('benchmark@example.com',))
+
+
+def main() -> None:
+    """
+    Compares the latency of the nearest parcel locker query with and without the bounding box pre-filter.
+
+    Inserts synthetic parcel lockers spread over Poland, runs both queries for a client in Warsaw and
+    removes the synthetic data afterwards. Uses the DB_* environment variables to connect to the database.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--parcel-lockers', type=int, default=100_000)
+    parser.add_argument('--max-distance', type=float, default=5.0)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    connection_manager = MySQLConnectionManager()
+    client_repo = ClientRepository(connection_manager)
+    parcel_locker_repo = ParcelLockerRepository(connection_manager, client_repo)
+    random.seed(0)
+
+    try:
+        for start in range(0, args.parcel_lockers, 5000):
+            parcel_locker_repo.insert_many([
+                ParcelLocker(city=BENCHMARK_CITY, postal_code='00-000',
+                             latitude=random.uniform(49.0, 54.8), longitude=random.uniform(14.1, 24.1))
+                for _ in range(min(5000, args.parcel_lockers - start))
+            ])
+        client_id = client_repo.insert(Client(first_name='Bench', last_name='Mark', email='benchmark@example.com',
+                                              phone_number='000000000', latitude=52.2297, longitude=21.0122))
+
+        full_scan_repo = FullScanParcelLockerRepository(connection_manager, client_repo)
+        results = {
+            'full table scan': measure(
+                lambda: full_scan_repo.find_nearest_parcel_lockers(client_id, args.max_distance), args.queries
+            ),
+            'bounding box + index': measure(
+                lambda: parcel_locker_repo.find_nearest_parcel_lockers(client_id, args.max_distance), args.queries
+            )
+        }
+        report(f'find_nearest_parcel_lockers, {args.parcel_lockers} parcel lockers, '
+               f'{args.max_distance} km radius', results)
+    finally:
+        _delete_benchmark_data(parcel_locker_repo)
+        connection_manager.close()
+
+
+if __name__ == '__main__':
+    main()
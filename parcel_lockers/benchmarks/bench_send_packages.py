@@ -0,0 +1,128 @@
+from benchmarks.common import measure, report
+from app.src.configuration import container, create_parcel_locker_service
+from app.src.entity import Client, ParcelLocker, Locker
+from app.src.service import ParcelLockerService, plan_packages, build_packages
+from app.src import queries
+from types import SimpleNamespace
+import argparse
+
+LATITUDE = 0.0
+LONGITUDE = 0.0
+MAX_DISTANCE = 1.0
+
+
+def planning(manifest: int, repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Measures the Python side of sending a manifest at once: grouping the packages, building them and the
+    statement occupying their lockers.
+
+    :param manifest: The number of packages in the manifest.
+    :param repeat: The number of measured calls.
+    :return: Latency summaries keyed by variant.
+    """
+    requests = [(1, 2, MAX_DISTANCE, 'S')] * manifest
+    clients = {client_id: SimpleNamespace(latitude=LATITUDE, longitude=LONGITUDE) for client_id in (1, 2)}
+    reservations = [(index, 1, index + 1) for index in range(manifest)]
+    assignments = [(index + 1, index + 1, 2) for index in range(manifest)]
+
+    def plan() -> None:
+        plan_packages(requests, clients)
+        build_packages(requests, reservations)
+        queries.assign_lockers(len(assignments))
+        queries.assign_lockers_params(assignments)
+
+    return {'plan + build + assign statement': measure(plan, repeat, warmup=1)}
+
+
+def provision(service: ParcelLockerService, lockers: int) -> tuple[int, int, int]:
+    """
+    Creates a sender, a receiver and a parcel locker with free lockers of size S, away from any other
+    parcel locker, so the benchmark does not take lockers of real ones.
+
+    :param service: The service used to write the data.
+    :param lockers: The number of lockers of the parcel locker.
+    :return: A tuple containing the ID of the sender, the ID of the receiver and the ID of the parcel locker.
+    """
+    sender, receiver = (
+        service.client_repo.insert(Client(first_name='Bench', last_name=role, email=f'bench-send-{role}@example.com',
+                                          phone_number=f'bench-{role}', latitude=LATITUDE, longitude=LONGITUDE))
+        for role in ('sender', 'receiver')
+    )
+    parcel_locker = service.parcel_locker_repo.insert(ParcelLocker(city='Bench', postal_code='00-000',
+                                                                   latitude=LATITUDE, longitude=LONGITUDE))
+    service.locker_repo.insert_many(Locker(parcel_locker_id=parcel_locker, package_id=None, client_id=None,
+                                           size='S', status='Available') for _ in range(lockers))
+    service.availability_repo.adjust(parcel_locker, 'S', lockers)
+    return sender, receiver, parcel_locker
+
+
+def clean_up(sender: int, receiver: int, parcel_locker: int) -> None:
+    """
+    Deletes the data created by `provision` and the packages sent by the benchmark.
+
+    :param sender: The ID of the sender.
+    :param receiver: The ID of the receiver.
+    :param parcel_locker: The ID of the parcel locker.
+    """
+    with container.connection_manager.transaction() as connection, connection.cursor() as cursor:
+        cursor.execute("UPDATE locker SET package_id = NULL WHERE parcel_locker_id = %s", (parcel_locker,))
+        cursor.execute("DELETE FROM package WHERE parcel_locker_id = %s", (parcel_locker,))
+        cursor.execute("DELETE FROM locker_availability WHERE parcel_locker_id = %s", (parcel_locker,))
+        cursor.execute("DELETE FROM locker WHERE parcel_locker_id = %s", (parcel_locker,))
+        cursor.execute("DELETE FROM parcel_locker WHERE id_ = %s", (parcel_locker,))
+        cursor.execute("DELETE FROM client WHERE id_ IN (%s, %s)", (sender, receiver))
+
+
+def sending(manifest: int, repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Measures sending a manifest with one send_package call per package and with a single send_packages call.
+
+    Both variants take lockers of the same parcel locker, which has enough of them for every measured call.
+
+    :param manifest: The number of packages in the manifest.
+    :param repeat: The number of measured calls per variant.
+    :return: Latency summaries keyed by variant.
+    """
+    service = create_parcel_locker_service()
+    sender, receiver, parcel_locker = provision(service, 2 * manifest * (repeat + 1))
+    try:
+        def one_by_one() -> None:
+            for _ in range(manifest):
+                service.send_package(sender, receiver, MAX_DISTANCE, 'S')
+
+        def at_once() -> None:
+            results = service.send_packages([(sender, receiver, MAX_DISTANCE, 'S')] * manifest)
+            assert all(error is None for _, error in results), results
+
+        return {
+            'send_package per package': measure(one_by_one, repeat, warmup=1),
+            'send_packages': measure(at_once, repeat, warmup=1)
+        }
+    finally:
+        clean_up(sender, receiver, parcel_locker)
+
+
+def main() -> None:
+    """
+    Compares sending a courier manifest package by package with sending it at once.
+
+    Without --database only the Python side of send_packages is measured. With --database both paths are
+    measured against the database, using the DB_* environment variables to connect to it, and the throughput
+    of each is reported in parcels per second.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--manifest', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database', action='store_true')
+    args = parser.parse_args()
+
+    report(f'send_packages planning, {args.manifest} packages', planning(args.manifest, args.repeat * 20))
+    if args.database:
+        results = sending(args.manifest, args.repeat)
+        report(f'Sending a manifest of {args.manifest} packages', results)
+        for variant, summary in results.items():
+            print(f"{variant:<32}{args.manifest / summary['mean_ms'] * 1000:>10.0f} parcels/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+from benchmarks.common import measure, report
+from app.src.database import MySQLConnectionManager
+from app.src.entity import Client
+from app.src.repository import ClientRepository
+from app.src.mapper import mapper_for
+import argparse
+
+
+def interpolated_update(client_id: int, client: Client) -> str:
+    """
+    Builds an update statement the way the repository did before it used query parameters.
+
+    :param client_id: The ID of the client to update.
+    :param client: The updated client data.
+    :return: The statement with the values interpolated into its text.
+    """
+    assignments = ', '.join([
+        f"{field} = {('NULL' if getattr(client, field) is None else str(getattr(client, field))
+                      if isinstance(getattr(client, field), (int, float)) else f"'{getattr(client, field)}'")}"
+        for field in Client.__annotations__.keys()
+        if field != 'id_'
+    ])
+    return f'update client set {assignments} where id_ = {client_id}'
+
+
+def statement_generation(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Measures the Python side of building an update statement, with and without the statement cache.
+
+    :param repeat: The number of measured calls.
+    :return: Latency summaries keyed by variant.
+    """
+    mapper = mapper_for(Client)
+    client = Client(1, 'Jan', 'Kowalski', 'jan@example.com', '123456789', 52.2297, 21.0122)
+    return {
+        'interpolated update text': measure(lambda: interpolated_update(1, client), repeat),
+        'cached update + parameters': measure(lambda: (mapper.update_sql, (*mapper.values(client), 1)), repeat)
+    }
+
+
+def round_trips(repeat: int, client_id: int) -> dict[str, dict[str, float]]:
+    """
+    Measures find_by_id and update round trips on a single connection.
+
+    Interpolated statements are parsed by the server on every call, parameterised statements sent over the
+    text protocol are parsed as well, and a prepared cursor that is reused parses its statement only once.
+
+    :param repeat: The number of measured calls per variant.
+    :param client_id: The ID of an existing client.
+    :return: Latency summaries keyed by variant.
+    """
+    connection_manager = MySQLConnectionManager()
+    repository = ClientRepository(connection_manager)
+    client = repository.find_by_id(client_id)
+    mapper = mapper_for(Client)
+    results = {}
+
+    with connection_manager.get_connection() as connection:
+        def run(cursor, sql, params=None):
+            cursor.execute(sql, params)
+            if cursor.with_rows:
+                cursor.fetchall()
+
+        with connection.cursor() as cursor:
+            results['find_by_id interpolated'] = measure(
+                lambda: run(cursor, f'SELECT * FROM client where id_ = {client_id}'), repeat)
+            results['update interpolated'] = measure(
+                lambda: run(cursor, interpolated_update(client_id, client)), repeat)
+            results['find_by_id parameterised'] = measure(
+                lambda: run(cursor, mapper.find_by_id_sql, (client_id,)), repeat)
+            results['update parameterised'] = measure(
+                lambda: run(cursor, mapper.update_sql, (*mapper.values(client), client_id)), repeat)
+
+        with connection.cursor(prepared=True) as cursor:
+            results['find_by_id prepared'] = measure(
+                lambda: run(cursor, mapper.find_by_id_sql, (client_id,)), repeat)
+
+        with connection.cursor(prepared=True) as cursor:
+            results['update prepared'] = measure(
+                lambda: run(cursor, mapper.update_sql, (*mapper.values(client), client_id)), repeat)
+
+        connection.rollback()
+
+    connection_manager.close()
+    return results
+
+
+def main() -> None:
+    """
+    Compares interpolated, parameterised and prepared SQL on the hot find_by_id and update paths.
+
+    Without --database only the Python side of statement generation is measured. With --database the
+    round trips are measured as well, using the DB_* environment variables to connect to the database.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--repeat', type=int, default=10_000)
+    parser.add_argument('--database', action='store_true')
+    parser.add_argument('--client-id', type=int, default=1)
+    args = parser.parse_args()
+
+    report('Update statement generation', statement_generation(args.repeat))
+    if args.database:
+        report('Statement round trips', round_trips(min(args.repeat, 2_000), args.client_id))
+
+
+if __name__ == '__main__':
+    main()
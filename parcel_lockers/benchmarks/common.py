@@ -0,0 +1,44 @@
+from typing import Callable, Any
+import statistics
+import time
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 3) -> dict[str, float]:
+    """
+    Calls a function repeatedly and summarizes its latency.
+
+    :param func: The function to measure, called without arguments.
+    :param repeat: The number of measured calls.
+    :param warmup: The number of calls made before measuring starts.
+    :return: A dictionary with the mean, median, 95th percentile and maximum latency in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_ms': samples[-1]
+    }
+
+
+def report(title: str, results: dict[str, dict[str, float]]) -> None:
+    """
+    Prints the results of a benchmark as a table.
+
+    :param title: The name of the benchmark.
+    :param results: Latency summaries keyed by the name of the measured variant.
+    """
+    print(title)
+    print(f"{'variant':<32}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for variant, summary in results.items():
+        print(f"{variant:<32}{summary['mean_ms']:>10.3f}{summary['p50_ms']:>10.3f}"
+              f"{summary['p95_ms']:>10.3f}{summary['max_ms']:>10.3f}")
@@ -2,8 +2,13 @@ from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 from pathlib import Path
 from os import getenv
-from app.routes.customers import clients_blueprint, packages_blueprint
+from app.routes.customers import clients_blueprint, packages_blueprint, package_batches_blueprint
 from app.routes.management import parcel_lockers_blueprint
+from app.routes.health import health_blueprint
+from app.routes.authorization import ENDPOINT_ROLES, configure_authorization
+from jwt_auth.flask_auth import authorize_endpoints
+from app.src.configuration import container, create_parcel_locker_service
+import atexit
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +28,32 @@ def create_app() -> Flask:
 
         app.register_blueprint(clients_blueprint)
         app.register_blueprint(packages_blueprint)
+        app.register_blueprint(package_batches_blueprint)
         app.register_blueprint(parcel_lockers_blueprint)
+        app.register_blueprint(health_blueprint)
+
+        if configure_authorization(app.config):
+            authorize_endpoints(app, ENDPOINT_ROLES)
+
+        @app.cli.command('reconcile-availability')
+        def reconcile_availability_command() -> None:
+            """
+            Rebuilds the free locker counters from the lockers and prints the ones that had drifted.
+            """
+            drift = create_parcel_locker_service().reconcile_availability()
+            for parcel_locker_id, size, recorded, actual in drift:
+                print(f'parcel locker {parcel_locker_id}, size {size}: recorded {recorded}, actual {actual}')
+            print(f'{len(drift)} counters corrected')
+
+        @app.cli.command('purge-idempotency-keys')
+        def purge_idempotency_keys_command() -> None:
+            """
+            Deletes the idempotency keys older than IDEMPOTENCY_KEY_TTL seconds.
+            """
+            print(f'{create_parcel_locker_service().purge_idempotency_keys()} idempotency keys deleted')
+
+        atexit.register(container.shutdown)
+        if getenv('PARCEL_LOCKER_INDEX') == 'grid':
+            container.warm_up()
 
         return app
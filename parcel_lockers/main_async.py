@@ -0,0 +1,71 @@
+from quart import Quart, Response, jsonify, request, g
+from dotenv import load_dotenv
+from pathlib import Path
+from app.routes.async_customers import clients_blueprint, packages_blueprint, package_batches_blueprint
+from app.routes.async_management import parcel_lockers_blueprint
+from app.routes.async_health import health_blueprint
+from app.routes.authorization import ENDPOINT_ROLES, configure_authorization
+from jwt_auth.flask_auth import get_verifier
+from jwt_auth.verifier import AuthorizationError
+from app.src.async_configuration import async_container
+import logging
+
+logging.basicConfig(level=logging.INFO)
+app = Quart(__name__)
+
+
+def create_app() -> Quart:
+    """
+    Configures the asyncio variant of the parcel lockers service, served by an ASGI server, e.g.
+    `hypercorn 'main_async:create_app()'`. It serves the same routes as the Flask application in `main`.
+
+    :return: The Quart application.
+    """
+    ENV_FILENAME = '.env'
+    ENV_PATH = Path.cwd().absolute().joinpath(f'{ENV_FILENAME}')
+    load_dotenv(ENV_PATH)
+
+    @app.errorhandler(Exception)
+    async def handle_error(error: Exception):
+        error_message = error.args[0]
+        return jsonify({'error': error_message}), 500
+
+    @app.before_serving
+    async def open_container() -> None:
+        """
+        Opens the connection pool before the first request is served.
+        """
+        await async_container.open()
+
+    @app.after_serving
+    async def close_container() -> None:
+        """
+        Closes the connection pool after the last request is served.
+        """
+        await async_container.close()
+
+    if configure_authorization(app.config):
+        @app.before_request
+        async def authorize_endpoint() -> Response | None:
+            """
+            Authorizes a request to a protected endpoint, like `authorize_endpoints` does for the Flask application.
+
+            :return: An error response if authorization fails, otherwise None to continue handling the request.
+            """
+            if request.endpoint not in ENDPOINT_ROLES:
+                return None
+
+            try:
+                g.jwt_claims = get_verifier(app).authorize(request.headers.get('Authorization'),
+                                                           ENDPOINT_ROLES[request.endpoint])
+            except AuthorizationError as error:
+                return jsonify({'message': error.message}), error.status_code
+            return None
+
+    app.register_blueprint(clients_blueprint)
+    app.register_blueprint(packages_blueprint)
+    app.register_blueprint(package_batches_blueprint)
+    app.register_blueprint(parcel_lockers_blueprint)
+    app.register_blueprint(health_blueprint)
+
+    return app
@@ -0,0 +1,61 @@
+from app.src.async_database import AsyncMySQLConnectionManager
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import asyncio
+
+
+class StubConnection:
+    """
+    Stands in for an aiomysql connection, recording whether it was committed.
+    """
+
+    def __init__(self):
+        self.committed = False
+
+    async def commit(self) -> None:
+        """
+        Records the commit.
+        """
+        self.committed = True
+
+    async def rollback(self) -> None:
+        """
+        Does nothing, as nothing was written.
+        """
+
+
+class StubConnectionManager(AsyncMySQLConnectionManager):
+    """
+    An `AsyncMySQLConnectionManager` handing out a new stub connection for every checkout, without a pool.
+    """
+
+    @asynccontextmanager
+    async def get_connection(self) -> AsyncIterator[StubConnection]:
+        """
+        Checks out a new stub connection.
+
+        :return: The stub connection.
+        """
+        yield StubConnection()
+
+
+def test_tasks_started_in_transaction_do_not_join_it():
+    """
+    Test that a task created inside a transaction does not reuse its connection, although it inherits its context,
+    while a nested transaction of the same task joins it.
+    """
+    manager = StubConnectionManager()
+
+    async def child_transaction() -> tuple[object, object]:
+        seen = manager.current_transaction()
+        async with manager.transaction() as connection:
+            return seen, connection
+
+    async def run() -> tuple[bool, object, bool, bool]:
+        async with manager.transaction() as connection:
+            async with manager.transaction() as nested_connection:
+                joined = nested_connection is connection
+            seen, child_connection = await asyncio.create_task(child_transaction())
+        return joined, seen, child_connection is connection, child_connection.committed
+
+    assert asyncio.run(run()) == (True, None, False, True)
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from main_async import create_app
+
+
+@pytest.fixture(scope='module')
+def async_app():
+    """
+    Creates the asyncio variant of the application for testing.
+
+    :return: A Quart application instance.
+    """
+    test_app = create_app()
+    test_app.config['TESTING'] = True
+    return test_app
+
+
+def send(app, method: str, path: str, **kwargs) -> tuple[int, dict]:
+    """
+    Sends a single request to the asyncio application, with the connection pool opened and closed around it.
+
+    :param app: The Quart application instance.
+    :param method: The HTTP method of the request.
+    :param path: The path of the request.
+    :param kwargs: Further arguments of the request, e.g. the JSON body.
+    :return: The status code and the JSON body of the response.
+    """
+    async def run() -> tuple[int, dict]:
+        async with app.test_app() as test_app:
+            response = await test_app.test_client().open(path, method=method, **kwargs)
+            return response.status_code, await response.get_json()
+
+    return asyncio.run(run())
+
+
+def test_get_clients_location(async_app):
+    """
+    Test retrieving the location of an existing and of a missing client.
+    """
+    status, data = send(async_app, 'GET', '/clients/1')
+    assert status == 200, data
+    assert len(data['location']) == 2
+
+    status, data = send(async_app, 'GET', '/clients/999')
+    assert status == 404
+    assert data['message'] == 'Client 999 not found'
+
+
+def test_send_package_invalid_size(async_app):
+    """
+    Test sending a package with an invalid size; expects the same 400 response as the sync application.
+    """
+    payload = {'sender_id': 1, 'receiver_id': 2, 'max_distance': 10.0, 'size': 'XL'}
+    status, data = send(async_app, 'POST', '/packages', json=payload)
+    assert status == 400, data
+    assert data['message'] == 'The size must be S, M or L'
+
+
+def test_add_parcel_locker_and_list_it(async_app):
+    """
+    Test adding a parcel locker and finding it on the listing of its city.
+    """
+    payload = {"city": "Async City", "postal_code": "12345", "latitude": 50.1234, "longitude": 19.5678}
+    status, data = send(async_app, 'POST', '/parcel_lockers/parcel_locker', json=payload)
+    assert status == 201, data
+    parcel_locker_id = data['new_parcel_locker_id']
+
+    status, data = send(async_app, 'GET', '/parcel_lockers?city=Async%20City&limit=10')
+    assert status == 200, data
+    assert parcel_locker_id in [parcel_locker['id_'] for parcel_locker in data['items']]
+    assert data['next_cursor'] is None
+
+
+def test_add_parcel_locker_missing_field(async_app):
+    """
+    Test adding a parcel locker without a city; expects a validation error.
+    """
+    payload = {"postal_code": "12-345", "latitude": 50.1234, "longitude": 19.5678}
+    status, data = send(async_app, 'POST', '/parcel_lockers/parcel_locker', json=payload)
+    assert status == 400
+    assert 'body_params' in data['validation_error']
+
+
+def test_concurrent_requests_share_the_pool(async_app):
+    """
+    Test that many concurrent requests are served by the pool of a single application instance.
+    """
+    async def run() -> tuple[list[int], dict]:
+        async with async_app.test_app() as test_app:
+            client = test_app.test_client()
+            responses = await asyncio.gather(*(client.get(f'/clients/{client_id % 3 + 1}')
+                                               for client_id in range(100)))
+            health = await (await client.get('/health')).get_json()
+            return [response.status_code for response in responses], health
+
+    statuses, health = asyncio.run(run())
+    assert statuses == [200] * 100
+    assert health['database']['status'] == 'up'
+    assert health['database']['checkouts'] >= 1
@@ -0,0 +1,73 @@
+import pytest
+import jwt
+from flask import Flask, Blueprint, jsonify
+from app.routes.authorization import ENDPOINT_ROLES, configure_authorization
+from jwt_auth.flask_auth import authorize_endpoints
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    Creates an application with the endpoint names of the service and token verification enabled.
+
+    :param monkeypatch: The fixture used to set the environment variables.
+    :return: A test client of the application.
+    """
+    monkeypatch.setenv('JWT_VERIFY', 'true')
+    monkeypatch.setenv('JWT_AUTHTYPE', 'HS256')
+    monkeypatch.setenv('JWT_SECRET', 'test_secret_of_at_least_32_bytes')
+
+    packages_blueprint = Blueprint('packages', __name__, url_prefix='/packages')
+    health_blueprint = Blueprint('health', __name__, url_prefix='/health')
+
+    @packages_blueprint.route('', methods=['GET'])
+    def list_packages_route():
+        return jsonify({'items': []})
+
+    @health_blueprint.route('', methods=['GET'])
+    def health_route():
+        return jsonify({'status': 'up'})
+
+    app = Flask(__name__)
+    app.register_blueprint(packages_blueprint)
+    app.register_blueprint(health_blueprint)
+    assert configure_authorization(app.config)
+    authorize_endpoints(app, ENDPOINT_ROLES)
+    return app.test_client()
+
+
+def token(role: str) -> str:
+    """
+    Issues an access token the way the users service does.
+
+    :param role: The role of the user.
+    :return: The encoded token.
+    """
+    return jwt.encode({'role': role}, 'test_secret_of_at_least_32_bytes', algorithm='HS256')
+
+
+def test_verification_disabled_by_default(monkeypatch):
+    """
+    Test that the service leaves authorization to the gateway unless JWT_VERIFY is set.
+    """
+    monkeypatch.delenv('JWT_VERIFY', raising=False)
+    assert not configure_authorization({})
+
+
+def test_protected_endpoint(client):
+    """
+    Test that a protected endpoint requires a token with an allowed role.
+    """
+    assert client.get('/packages').status_code == 401
+    assert client.get('/packages', headers={'Authorization': f'Bearer {token("user")}'}).status_code == 403
+
+    response = client.get('/packages', headers={'Authorization': f'Bearer {token("admin")}'})
+    assert response.status_code == 200
+    assert response.json == {'items': []}
+
+
+def test_unlisted_endpoint_is_public(client):
+    """
+    Test that endpoints without roles, e.g. the health check, need no token.
+    """
+    assert client.get('/health').status_code == 200
@@ -0,0 +1,69 @@
+from app.src.batch_nearest import NearestParcelLockerEngine
+from app.src.entity import ParcelLocker
+from app.src.geo import haversine
+import random
+import pytest
+
+
+@pytest.fixture
+def parcel_lockers() -> list[ParcelLocker]:
+    """
+    Fixture to provide parcel lockers at random locations in Poland.
+
+    :return: A list of parcel lockers with IDs.
+    """
+    generator = random.Random(1)
+    return [
+        ParcelLocker(id_=parcel_locker_id, city=f'City {parcel_locker_id}', postal_code='00-000',
+                     latitude=generator.uniform(49.0, 54.8), longitude=generator.uniform(14.1, 24.1))
+        for parcel_locker_id in range(1, 1001)
+    ]
+
+
+@pytest.mark.parametrize('k, max_distance', [(5, None), (5, 20.0), (1000, None), (10, 1.0)])
+def test_find_nearest_matches_single_queries(parcel_lockers, k, max_distance):
+    """
+    Test to verify that the batch engine returns the same parcel lockers as calculating each distance separately.
+
+    The matrix size limit is small, so the points are processed in several chunks.
+
+    :param parcel_lockers: The parcel lockers loaded into the engine.
+    :param k: The number of parcel lockers to return for each point.
+    :param max_distance: The search radius in kilometers.
+    """
+    engine = NearestParcelLockerEngine(max_matrix_size=20_000)
+    engine.rebuild(parcel_lockers)
+    generator = random.Random(2)
+    points = [(generator.uniform(49.0, 54.8), generator.uniform(14.1, 24.1)) for _ in range(100)]
+
+    results = engine.find_nearest(points, k, max_distance)
+
+    assert len(results) == len(points)
+    for (latitude, longitude), result in zip(points, results):
+        expected = sorted((haversine(latitude, longitude, parcel_locker.latitude, parcel_locker.longitude),
+                           parcel_locker.id_) for parcel_locker in parcel_lockers)
+        expected = [row for row in expected if max_distance is None or row[0] < max_distance][:k]
+        assert [row[0] for row in result] == [parcel_locker_id for _, parcel_locker_id in expected]
+        assert [row[2] for row in result] == pytest.approx([distance for distance, _ in expected])
+
+
+def test_add_parcel_locker(parcel_lockers):
+    """
+    Test to verify that a parcel locker added after the engine was built is found by queries.
+
+    :param parcel_lockers: The parcel lockers loaded into the engine.
+    """
+    engine = NearestParcelLockerEngine()
+    engine.rebuild(parcel_lockers)
+
+    engine.add(ParcelLocker(id_=9999, city='Warsaw', postal_code='00-001', latitude=52.2297, longitude=21.0122))
+
+    assert engine.find_nearest([(52.2297, 21.0122)], 1) == [[(9999, 'Warsaw', 0.0)]]
+
+
+def test_find_nearest_not_built():
+    """
+    Test to verify that querying an engine that has not been built raises an exception.
+    """
+    with pytest.raises(ValueError, match="has not been built"):
+        NearestParcelLockerEngine().find_nearest([(52.2297, 21.0122)], 1)
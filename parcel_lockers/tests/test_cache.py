@@ -0,0 +1,89 @@
+from app.src.cache import LRUCache, RedisCache
+from typing import Any
+import pytest
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for a redis-py client, implementing the commands used by `RedisCache`.
+    """
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.expiry: dict[str, int] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    def mget(self, keys: list[str]) -> list[Any]:
+        return [self.data.get(key) for key in keys]
+
+
+@pytest.fixture
+def clock(mocker):
+    """
+    Fixture replacing the monotonic clock used by the caches with one that tests can move forward.
+
+    :param mocker: The mocking object used to patch the clock.
+    :return: A one-element list holding the current time.
+    """
+    now = [1000.0]
+    mocker.patch('app.src.cache.time.monotonic', side_effect=lambda: now[0])
+    return now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Test to verify that a full cache evicts the value that was used least recently and counts the eviction.
+    """
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (3, 1, 1, 2)
+
+
+def test_lru_cache_expires_values(clock):
+    """
+    Test to verify that values are no longer served once their time to live has passed.
+    """
+    cache = LRUCache(max_size=10, ttl=5)
+    cache.set('a', 1)
+
+    clock[0] += 4.9
+    assert cache.get('a') == 1
+
+    clock[0] += 0.2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert len(cache) == 0
+
+
+def test_redis_cache_round_trip():
+    """
+    Test to verify that the shared cache stores pickled values with a time to live under its prefix.
+    """
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30, prefix='test:')
+
+    cache.set('client:1', {'name': 'Jan'})
+    assert client.expiry['test:client:1'] == 30
+    assert cache.get('client:1') == {'name': 'Jan'}
+    assert cache.get_many(['client:1', 'client:2']) == {'client:1': {'name': 'Jan'}}
+
+    cache.delete('client:1')
+    assert cache.get('client:1') is None
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (2, 2)
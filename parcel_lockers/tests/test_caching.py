@@ -0,0 +1,52 @@
+import asyncio
+from flask import Flask, jsonify
+from quart import Quart, jsonify as quart_jsonify
+from app.routes.caching import body_etag, conditional
+from app.routes import async_caching
+
+
+def test_conditional_response():
+    """
+    Test that a conditional response carries validators and is answered with 304 when the client has it.
+    """
+    app = Flask(__name__)
+    document = {'parcel_locker_id': 1, 'availability': {'S': 2, 'M': 0, 'L': 1}}
+
+    @app.route('/availability')
+    def availability():
+        return conditional(jsonify(document), 5)
+
+    client = app.test_client()
+    response = client.get('/availability')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{body_etag(response.data)}"'
+    assert response.headers['Cache-Control'] == 'max-age=5, public'
+
+    revalidated = client.get('/availability', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['Cache-Control'] == 'max-age=5, public'
+
+    document['availability']['M'] = 1
+    changed = client.get('/availability', headers={'If-None-Match': response.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != response.headers['ETag']
+
+
+def test_async_conditional_response():
+    """
+    Test the asyncio counterpart of the conditional response.
+    """
+    app = Quart(__name__)
+
+    @app.route('/clients/1')
+    async def location():
+        return await async_caching.conditional(quart_jsonify({'location': [50.0, 19.9]}), 60, private=True)
+
+    async def run() -> tuple[int, int, str]:
+        client = app.test_client()
+        response = await client.get('/clients/1')
+        revalidated = await client.get('/clients/1', headers={'If-None-Match': response.headers['ETag']})
+        return response.status_code, revalidated.status_code, response.headers['Cache-Control']
+
+    assert asyncio.run(run()) == (200, 304, 'max-age=60, private')
@@ -0,0 +1,102 @@
+from app.src.database import MySQLConnectionManager
+from app.src.entity import Client, Locker, ParcelLocker
+from app.src.repository import LockerRepository, ParcelLockerRepository, ClientRepository, PackageRepository
+from app.src.service import ParcelLockerService
+from concurrent.futures import ThreadPoolExecutor
+import os
+import pytest
+
+WORKERS = 32
+CAPACITY = 50
+ATTEMPTS = 400
+
+
+@pytest.fixture(scope='module')
+def concurrent_connection_manager(connection_manager) -> MySQLConnectionManager:
+    """
+    Provides a connection manager with a pool large enough for one connection per worker thread.
+
+    :param connection_manager: The default test connection manager, which configures the test database.
+    :return: A `MySQLConnectionManager` instance with `WORKERS` pooled connections.
+    """
+    pool_size = os.environ['DB_POOL_SIZE']
+    os.environ['DB_POOL_SIZE'] = str(WORKERS)
+    manager = MySQLConnectionManager()
+    os.environ['DB_POOL_SIZE'] = pool_size
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def stress_service(concurrent_connection_manager) -> ParcelLockerService:
+    """
+    Creates a `ParcelLockerService` sharing the pool of `concurrent_connection_manager` between its threads.
+
+    :param concurrent_connection_manager: The connection manager used to interact with the database.
+    :return: A `ParcelLockerService` instance.
+    """
+    client_repo = ClientRepository(concurrent_connection_manager)
+    return ParcelLockerService(
+        locker_repo=LockerRepository(concurrent_connection_manager),
+        client_repo=client_repo,
+        package_repo=PackageRepository(concurrent_connection_manager),
+        parcel_locker_repo=ParcelLockerRepository(concurrent_connection_manager, client_repo),
+        connection_manager=concurrent_connection_manager
+    )
+
+
+@pytest.fixture
+def crowded_parcel_locker(stress_service) -> tuple[int, int]:
+    """
+    Creates a parcel locker with `CAPACITY` free medium lockers, away from any other parcel locker,
+    and a client next to it.
+
+    :param stress_service: The service used to write the data.
+    :return: A tuple containing the ID of the parcel locker and the ID of the client.
+    """
+    parcel_locker_id = stress_service.add_parcel_locker('Stress City', '00-001', 10.0, 10.0)
+    stress_service.locker_repo.insert_many([
+        Locker(parcel_locker_id=parcel_locker_id, size='M', status='Available') for _ in range(CAPACITY)
+    ])
+    stress_service.availability_repo.adjust(parcel_locker_id, 'M', CAPACITY)
+    client_id = stress_service.client_repo.insert(
+        Client(first_name='Stress', last_name='Sender', email='stress.sender@example.com', phone_number='600700800',
+               latitude=10.0, longitude=10.0)
+    )
+    return parcel_locker_id, client_id
+
+
+def test_concurrent_sends_never_double_book(stress_service, crowded_parcel_locker):
+    """
+    Test to verify that concurrent calls of `send_package` never put two packages in the same locker.
+
+    `ATTEMPTS` packages are sent from `WORKERS` threads to a parcel locker with `CAPACITY` lockers. Exactly
+    `CAPACITY` of them must be sent, each to a different locker, every locker must end up occupied by its own
+    package, and the others must fail because no locker is left.
+
+    :param stress_service: The service sending the packages.
+    :param crowded_parcel_locker: The IDs of the parcel locker the threads compete for and of the sender.
+    """
+    parcel_locker_id, client_id = crowded_parcel_locker
+
+    def send(_: int) -> int | None:
+        try:
+            return stress_service.send_package(client_id, client_id, 1, 'M')
+        except ValueError as error:
+            assert str(error) == "No available slots found"
+            return None
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        sent = [package_id for package_id in executor.map(send, range(ATTEMPTS)) if package_id is not None]
+
+    assert len(sent) == CAPACITY
+    assert len(set(sent)) == CAPACITY
+
+    packages = [stress_service.package_repo.find_by_id(package_id) for package_id in sent]
+    assert len({package.locker_id for package in packages}) == CAPACITY
+    assert all(package.parcel_locker_id == parcel_locker_id for package in packages)
+    for package in packages:
+        locker = stress_service.locker_repo.find_by_id(package.locker_id)
+        assert (locker.status, locker.package_id) == ('Occupied', package.id_)
+
+    assert stress_service.locker_repo.has_available_slots('M', parcel_locker_id) == []
@@ -1,5 +1,6 @@
+import os
 import pytest
-from app.src.configuration import create_parcel_locker_service
+from app.src.configuration import create_parcel_locker_service, container
 
 
 def test_create_parcel_locker_service():
@@ -15,3 +16,32 @@ def test_create_parcel_locker_service():
     assert service._connection_manager is not None
     assert service.client_repo is not None
     assert service.package_repo is not None
+
+
+def test_create_parcel_locker_service_reuses_connection_pool():
+    """
+    Tests that services created for subsequent requests share one connection pool.
+
+    Ensures that the connection manager is created once per worker process instead of
+    opening a new pool for every call of `create_parcel_locker_service`.
+    """
+    first_service = create_parcel_locker_service()
+    second_service = create_parcel_locker_service()
+
+    assert first_service is not second_service
+    assert first_service._connection_manager is second_service._connection_manager
+
+
+def test_container_stats():
+    """
+    Tests that the service container reports the health and usage of its connection pool.
+    """
+    service = create_parcel_locker_service()
+    service.client_repo.find_by_id(1)
+
+    stats = container.stats()['database']
+
+    assert stats['status'] == 'up'
+    assert stats['pool_size'] == int(os.getenv('DB_POOL_SIZE', 5))
+    assert stats['checkouts'] >= 1
+    assert stats['max_wait_ms'] >= stats['avg_wait_ms'] >= 0
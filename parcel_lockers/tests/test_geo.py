@@ -0,0 +1,55 @@
+from app.src.geo import haversine, bounding_box
+from math import radians, degrees, sin, cos, asin, atan2
+import pytest
+
+
+def test_haversine():
+    """
+    Test to verify that the distance between Warsaw and Krakow is calculated correctly.
+    """
+    assert haversine(52.2297, 21.0122, 50.0647, 19.9450) == pytest.approx(252.0, abs=1.0)
+    assert haversine(52.2297, 21.0122, 52.2297, 21.0122) == 0.0
+
+
+@pytest.mark.parametrize('latitude, longitude, max_distance', [
+    (52.2297, 21.0122, 10.0),
+    (-33.8688, 151.2093, 500.0),
+    (64.1466, -21.9426, 1500.0),
+])
+def test_bounding_box_contains_circle(latitude, longitude, max_distance):
+    """
+    Test to verify that every point on the search circle lies inside its bounding box.
+    """
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(latitude, longitude, max_distance)
+
+    for bearing in range(0, 360, 5):
+        point_latitude, point_longitude = _destination(latitude, longitude, bearing, max_distance * 0.999)
+        assert min_latitude <= point_latitude <= max_latitude
+        assert min_longitude <= point_longitude <= max_longitude
+
+
+def test_bounding_box_near_pole_and_antimeridian():
+    """
+    Test to verify that the longitude range spans the globe when the circle contains a pole or the antimeridian.
+    """
+    assert bounding_box(89.9, 0.0, 100.0)[2:] == (-180.0, 180.0)
+    assert bounding_box(0.0, 179.9, 100.0)[2:] == (-180.0, 180.0)
+    assert bounding_box(0.0, 0.0, 1000000.0) == (-90.0, 90.0, -180.0, 180.0)
+
+
+def _destination(latitude: float, longitude: float, bearing: float, distance: float) -> tuple[float, float]:
+    """
+    Calculates the point reached by travelling a distance along a bearing.
+
+    :param latitude: Latitude of the start point in degrees.
+    :param longitude: Longitude of the start point in degrees.
+    :param bearing: The bearing in degrees.
+    :param distance: The distance in kilometers.
+    :return: A tuple of latitude and longitude of the destination in degrees.
+    """
+    angular_distance = distance / 6371.0
+    lat, lon, theta = radians(latitude), radians(longitude), radians(bearing)
+    destination_lat = asin(sin(lat) * cos(angular_distance) + cos(lat) * sin(angular_distance) * cos(theta))
+    destination_lon = lon + atan2(sin(theta) * sin(angular_distance) * cos(lat),
+                                  cos(angular_distance) - sin(lat) * sin(destination_lat))
+    return degrees(destination_lat), degrees(destination_lon)
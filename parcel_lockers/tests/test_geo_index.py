@@ -0,0 +1,78 @@
+from app.src.entity import ParcelLocker
+from app.src.geo import haversine
+from app.src.geo_index import GridParcelLockerIndex
+import random
+import pytest
+
+
+@pytest.fixture
+def parcel_lockers() -> list[ParcelLocker]:
+    """
+    Fixture to provide parcel lockers at random locations in Poland.
+
+    :return: A list of parcel lockers with IDs.
+    """
+    generator = random.Random(0)
+    return [
+        ParcelLocker(id_=parcel_locker_id, city=f'City {parcel_locker_id}', postal_code='00-000',
+                     latitude=generator.uniform(49.0, 54.8), longitude=generator.uniform(14.1, 24.1))
+        for parcel_locker_id in range(1, 2001)
+    ]
+
+
+def _brute_force(parcel_lockers: list[ParcelLocker], latitude: float, longitude: float,
+                 max_distance: float) -> list[int]:
+    """
+    Finds the IDs of parcel lockers within a distance by checking every parcel locker.
+    """
+    distances = [(parcel_locker.id_, haversine(latitude, longitude, parcel_locker.latitude, parcel_locker.longitude))
+                 for parcel_locker in parcel_lockers]
+    return [parcel_locker_id for parcel_locker_id, distance in sorted(distances, key=lambda x: x[1])
+            if distance < max_distance]
+
+
+@pytest.mark.parametrize('max_distance', [5.0, 30.0, 200.0, 1000000.0])
+def test_find_within_matches_brute_force(parcel_lockers, max_distance):
+    """
+    Test to verify that the grid index returns the same parcel lockers as checking every parcel locker.
+
+    :param parcel_lockers: The indexed parcel lockers.
+    :param max_distance: The search radius in kilometers.
+    """
+    index = GridParcelLockerIndex()
+    index.rebuild(parcel_lockers)
+
+    result = index.find_within(52.2297, 21.0122, max_distance)
+
+    assert [row[0] for row in result] == _brute_force(parcel_lockers, 52.2297, 21.0122, max_distance)
+    assert all(row[1] == f'City {row[0]}' for row in result)
+
+
+def test_add_parcel_locker(parcel_lockers):
+    """
+    Test to verify that a parcel locker added after the index was built is found by queries.
+
+    :param parcel_lockers: The indexed parcel lockers.
+    """
+    index = GridParcelLockerIndex()
+    index.rebuild(parcel_lockers)
+
+    index.add(ParcelLocker(id_=9999, city='Warsaw', postal_code='00-001', latitude=52.2297, longitude=21.0122))
+
+    assert index.find_within(52.2297, 21.0122, 1.0, limit=1)[0][0] == 9999
+    assert index.location(9999) == (52.2297, 21.0122)
+    assert len(index) == len(parcel_lockers) + 1
+
+
+def test_find_nearest(parcel_lockers):
+    """
+    Test to verify that the k nearest parcel lockers are found without a search radius.
+
+    :param parcel_lockers: The indexed parcel lockers.
+    """
+    index = GridParcelLockerIndex()
+    index.rebuild(parcel_lockers)
+
+    result = index.find_nearest(0.0, 0.0, 3)
+
+    assert [row[0] for row in result] == _brute_force(parcel_lockers, 0.0, 0.0, float('inf'))[:3]
@@ -0,0 +1,33 @@
+from app.src.entity import Client, Package
+from app.src.mapper import mapper_for
+
+
+def test_mapper_columns_and_statements():
+    """
+    Test to verify that the mapper writes every entity field except the ID, in field order, as query parameters.
+    """
+    mapper = mapper_for(Package)
+
+    assert mapper.table_name == 'package'
+    assert mapper.columns == ('sender_id', 'receiver_id', 'parcel_locker_id', 'locker_id',
+                              'status', 'size', 'delivered_at', 'created_at')
+    assert mapper.insert_sql == ('INSERT INTO package (sender_id, receiver_id, parcel_locker_id, locker_id, '
+                                 'status, size, delivered_at, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)')
+    assert mapper.update_sql.endswith('created_at = %s WHERE id_ = %s')
+    assert mapper.find_by_id_sql == ('SELECT id_, sender_id, receiver_id, parcel_locker_id, locker_id, '
+                                     'status, size, delivered_at, created_at FROM package WHERE id_ = %s')
+
+
+def test_mapper_values_and_rows(capsys):
+    """
+    Test to verify that the mapper extracts the column values of an entity, builds slotted entities from rows
+    and does not write to stdout while doing so.
+    """
+    mapper = mapper_for(Client)
+    client = Client(7, 'Jan', "O'Brien", 'jan@example.com', '123456789', 52.2297, 21.0122)
+
+    assert mapper.values(client) == ('Jan', "O'Brien", 'jan@example.com', '123456789', 52.2297, 21.0122)
+    assert mapper.from_row(7, *mapper.values(client)) == client
+    assert mapper_for(Client) is mapper
+    assert not hasattr(client, '__dict__')
+    assert capsys.readouterr().out == ''
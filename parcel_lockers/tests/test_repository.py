@@ -1,5 +1,8 @@
 from app.src.entity import Package, ParcelLocker, Locker, Client
 from app.src.repository import ClientRepository, PackageRepository, LockerRepository, ParcelLockerRepository
+from app.src.repository import LockerAvailabilityRepository
+from app.src.geo_index import GridParcelLockerIndex
+from app.src.cache import LRUCache
 import pytest
 from datetime import datetime
 
@@ -81,6 +84,119 @@ def test_insert_client(client_repository):
     assert retrieved_client.longitude == expected_longitude
 
 
+def test_update_client_with_quoted_values(client_repository):
+    """
+    Test to verify that values containing quotes are written as query parameters and stored unchanged.
+
+    :param client_repository: The repository used to perform database operations on `Client` entities.
+    """
+    client = Client(first_name='Jan', last_name='Nowak', email='jan.nowak@example.com',
+                    phone_number='232546789', latitude=52.2297, longitude=21.0122)
+    client_id = client_repository.insert(client)
+
+    client.last_name = "O'Brien"
+    client_repository.update(client_id, client)
+
+    retrieved_client = client_repository.find_by_id(client_id)
+    assert retrieved_client.last_name == "O'Brien"
+
+
+def test_insert_many_in_chunks(parcel_locker_repository):
+    """
+    Test to verify that entities produced by a generator are inserted chunk by chunk
+    and that the number of inserted entities is returned.
+
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    """
+    cities = ['Gdansk', 'Sopot', 'Gdynia', 'Rumia', 'Reda']
+    parcel_lockers = (ParcelLocker(city=city, postal_code='80-001', latitude=54.35, longitude=18.65)
+                      for city in cities)
+
+    inserted = parcel_locker_repository.insert_many(parcel_lockers, chunk_size=2)
+
+    assert inserted == len(cities)
+    assert [parcel_locker.city for parcel_locker in parcel_locker_repository.find_page(
+        conditions=[('postal_code', '=', '80-001')])] == cities
+    assert parcel_locker_repository.insert_many([]) == 0
+
+
+def test_iter_all_and_find_page(parcel_locker_repository):
+    """
+    Test to verify that streaming and keyset pagination return the same parcel lockers as `find_all`,
+    and that a stream closed early does not leave unread rows on its connection.
+
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    """
+    parcel_locker_repository.insert_many(
+        ParcelLocker(city=f'Stream {i}', postal_code='00-950', latitude=52.0, longitude=21.0) for i in range(7)
+    )
+    expected = sorted(parcel_locker_repository.find_all(), key=lambda parcel_locker: parcel_locker.id_)
+
+    stream = parcel_locker_repository.iter_all(batch_size=3)
+    assert next(stream) == expected[0]
+    stream.close()
+
+    assert list(parcel_locker_repository.iter_all(batch_size=3)) == expected
+
+    pages, after_id = [], 0
+    while page := parcel_locker_repository.find_page(after_id, limit=3):
+        pages.extend(page)
+        after_id = page[-1].id_
+    assert pages == expected
+
+
+def test_find_by_id_cache(connection_manager):
+    """
+    Test to verify that `find_by_id` is served from the cache of the repository, returns copies,
+    and that an update is visible once it is committed.
+
+    :param connection_manager: The connection manager used to interact with the database.
+    """
+    cache = LRUCache(max_size=100, ttl=60)
+    client_repository = ClientRepository(connection_manager, cache)
+    client_id = client_repository.insert(Client(first_name='Anna', last_name='Cached', email='anna.cached@example.com',
+                                                phone_number='600700801', latitude=52.0, longitude=21.0))
+
+    first = client_repository.find_by_id(client_id)
+    first.last_name = 'Changed locally'
+    assert client_repository.find_by_id(client_id).last_name == 'Cached'
+    assert (cache.stats()['misses'], cache.stats()['hits']) == (1, 1)
+
+    first.last_name = 'Renamed'
+    with connection_manager.transaction():
+        client_repository.update(client_id, first)
+        assert cache.get(f'client:{client_id}').last_name == 'Cached'
+        assert client_repository.find_by_id(client_id).last_name == 'Renamed'
+
+    assert cache.get(f'client:{client_id}') is None
+    assert client_repository.find_by_id(client_id).last_name == 'Renamed'
+
+
+def test_find_by_ids(connection_manager):
+    """
+    Test to verify that `find_by_ids` returns the entities found, keyed by ID in the requested order,
+    and reads only the IDs missing from the cache from the database.
+
+    :param connection_manager: The connection manager used to interact with the database.
+    """
+    cache = LRUCache(max_size=100, ttl=60)
+    parcel_locker_repository = ParcelLockerRepository(connection_manager, ClientRepository(connection_manager),
+                                                      cache=cache)
+    parcel_locker_repository.insert_many(
+        ParcelLocker(city=f'Batch {i}', postal_code='31-001', latitude=50.06, longitude=19.94) for i in range(5)
+    )
+    ids = [parcel_locker.id_ for parcel_locker in parcel_locker_repository.find_page(
+        conditions=[('postal_code', '=', '31-001')])]
+    parcel_locker_repository.find_by_id(ids[0])
+
+    found = parcel_locker_repository.find_by_ids([ids[3], ids[0], 999999, ids[3], ids[1]], chunk_size=2)
+
+    assert list(found) == [ids[3], ids[0], ids[1]]
+    assert [parcel_locker.city for parcel_locker in found.values()] == ['Batch 3', 'Batch 0', 'Batch 1']
+    assert cache.stats()['hits'] == 1
+    assert parcel_locker_repository.find_by_ids([]) == {}
+
+
 def test_insert_parcel_locker(parcel_locker_repository):
     """
     Test to verify the insertion and retrieval of a `ParcelLocker` entity.
@@ -141,3 +257,123 @@ def test_insert_locker(locker_repository):
     assert retrieved_locker.client_id == expected_client_id
     assert retrieved_locker.size == expected_size
     assert retrieved_locker.status == excepted_status
+
+
+def test_find_nearest_parcel_lockers(parcel_locker_repository, client_repository):
+    """
+    Test to verify that only parcel lockers within the distance are returned, nearest first.
+
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    :param client_repository: The repository used to perform database operations on `Client` entities.
+    """
+    client_id = client_repository.insert(Client(
+        first_name='Near', last_name='Est', email='nearest@example.com', phone_number='700800900',
+        latitude=-45.0, longitude=170.0
+    ))
+    near_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Near', postal_code='00-002', latitude=-45.01, longitude=170.0)
+    )
+    nearer_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Nearer', postal_code='00-001', latitude=-45.001, longitude=170.0)
+    )
+    parcel_locker_repository.insert(ParcelLocker(city='Far', postal_code='00-003', latitude=-46.0, longitude=170.0))
+
+    nearest = parcel_locker_repository.find_nearest_parcel_lockers(client_id, 5.0)
+
+    assert [parcel_locker[0] for parcel_locker in nearest] == [nearer_id, near_id]
+    assert nearest[0][2] < nearest[1][2] < 5.0
+
+
+def test_parcel_locker_index_consistency(connection_manager, client_repository):
+    """
+    Test to verify that the in-memory parcel locker index agrees with the SQL implementation.
+
+    :param connection_manager: The connection manager used to interact with the database.
+    :param client_repository: The repository used to perform database operations on `Client` entities.
+    """
+    index = GridParcelLockerIndex()
+    repository = ParcelLockerRepository(connection_manager, client_repository, index)
+    index.rebuild(repository.find_all())
+
+    for latitude, longitude, max_distance in [(-45.0, 170.0, 5.0), (37.7749, -122.4194, 1000.0), (0.0, 0.0, 20000.0)]:
+        assert repository.check_index_consistency(latitude, longitude, max_distance) == []
+
+
+def test_find_nearest_available_parcel_lockers(parcel_locker_repository, client_repository, locker_repository):
+    """
+    Test to verify that parcel lockers without a free locker of the requested size are skipped.
+
+    The lockers are inserted directly through the repository, so the free locker counters are reconciled first.
+
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    :param client_repository: The repository used to perform database operations on `Client` entities.
+    :param locker_repository: The repository used to perform database operations on `Locker` entities.
+    """
+    client_id = client_repository.insert(Client(
+        first_name='Free', last_name='Slot', email='free.slot@example.com', phone_number='700800901',
+        latitude=-40.0, longitude=160.0
+    ))
+    full_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Full', postal_code='00-001', latitude=-40.001, longitude=160.0)
+    )
+    free_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Free', postal_code='00-002', latitude=-40.01, longitude=160.0)
+    )
+    locker_repository.insert_many([
+        Locker(parcel_locker_id=full_id, size='L', status='Occupied'),
+        Locker(parcel_locker_id=full_id, size='S', status='Available'),
+        Locker(parcel_locker_id=free_id, size='L', status='Available'),
+    ])
+    LockerAvailabilityRepository(locker_repository._connection_manager).reconcile()
+
+    available = parcel_locker_repository.find_nearest_available_parcel_lockers(client_id, 5.0, 'L')
+
+    assert [parcel_locker[0] for parcel_locker in available] == [free_id]
+
+
+def test_reconcile_locker_availability(connection_manager, parcel_locker_repository, locker_repository):
+    """
+    Test to verify that reconciliation reports drifted counters and corrects them from the lockers.
+
+    :param connection_manager: The connection manager used to interact with the database.
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    :param locker_repository: The repository used to perform database operations on `Locker` entities.
+    """
+    availability_repository = LockerAvailabilityRepository(connection_manager)
+    availability_repository.reconcile()
+    parcel_locker_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Drift', postal_code='00-004', latitude=1.0, longitude=1.0)
+    )
+    locker_repository.insert(Locker(parcel_locker_id=parcel_locker_id, size='S', status='Available'))
+    availability_repository.adjust(parcel_locker_id, 'M', 2)
+
+    drift = availability_repository.reconcile()
+
+    assert sorted(drift) == [(parcel_locker_id, 'M', 2, 0), (parcel_locker_id, 'S', 0, 1)]
+    assert availability_repository.find_by_parcel_locker(parcel_locker_id) == {'M': 0, 'S': 1}
+    assert availability_repository.reconcile() == []
+
+
+def test_adjust_locker_availability_after_commit(connection_manager, parcel_locker_repository):
+    """
+    Test to verify that a counter adjusted inside a transaction changes once the transaction commits,
+    and not at all if it rolls back.
+
+    :param connection_manager: The connection manager used to interact with the database.
+    :param parcel_locker_repository: The repository used to perform database operations on `ParcelLocker` entities.
+    """
+    availability_repository = LockerAvailabilityRepository(connection_manager)
+    parcel_locker_id = parcel_locker_repository.insert(
+        ParcelLocker(city='Deferred', postal_code='00-007', latitude=2.0, longitude=2.0)
+    )
+
+    with connection_manager.transaction():
+        availability_repository.adjust(parcel_locker_id, 'S', 3)
+        assert availability_repository.find_by_parcel_locker(parcel_locker_id) == {}
+    assert availability_repository.find_by_parcel_locker(parcel_locker_id) == {'S': 3}
+
+    with pytest.raises(RuntimeError):
+        with connection_manager.transaction():
+            availability_repository.adjust(parcel_locker_id, 'S', -1)
+            raise RuntimeError('abort')
+    assert availability_repository.find_by_parcel_locker(parcel_locker_id) == {'S': 3}
@@ -1,3 +1,6 @@
+import uuid
+
+
 def test_get_clients_location_success(client):
     """
     Test retrieving a client's location successfully.
@@ -10,6 +13,27 @@ def test_get_clients_location_success(client):
     assert b"location" in response.data
 
 
+def test_get_clients_location_not_modified(client):
+    """
+    Test revalidating a client's location with its ETag.
+
+    Sends the ETag of a first response back in If-None-Match.
+    Expects a 304 Not Modified response without a body, and a full response for a stale ETag.
+    """
+    response = client.get("/clients/1")
+    etag = response.headers["ETag"]
+    assert "max-age=60" in response.headers["Cache-Control"]
+
+    revalidated = client.get("/clients/1", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == etag
+
+    stale = client.get("/clients/1", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert b"location" in stale.data
+
+
 def test_get_clients_location_not_found(client):
     """
     Test retrieving a non-existent client's location.
@@ -42,6 +66,85 @@ def test_send_package_success(client):
     assert 'package' in data
 
 
+def test_send_package_idempotent_retry(client):
+    """
+    Test that a retried request with the same Idempotency-Key gets the package of the first request.
+
+    Expects both responses to be 201 Created with the same package, and the retry to be marked as replayed.
+    """
+    payload = {
+        'sender_id': 1,
+        'receiver_id': 2,
+        'max_distance': 10000.0,
+        'size': 'S'
+    }
+    headers = {'Idempotency-Key': str(uuid.uuid4())}
+    first = client.post('/packages', json=payload, headers=headers)
+    retry = client.post('/packages', json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201, retry.data
+    assert retry.get_json() == first.get_json()
+    assert 'Idempotent-Replayed' not in first.headers
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+
+
+def test_send_package_idempotency_key_reused(client):
+    """
+    Test that an Idempotency-Key sent again with a different body is rejected.
+
+    Expects a 422 Unprocessable Entity response for the second request.
+    """
+    payload = {
+        'sender_id': 1,
+        'receiver_id': 2,
+        'max_distance': 10000.0,
+        'size': 'S'
+    }
+    headers = {'Idempotency-Key': str(uuid.uuid4())}
+    client.post('/packages', json=payload, headers=headers)
+    response = client.post('/packages', json={**payload, 'receiver_id': 1}, headers=headers)
+
+    assert response.status_code == 422, response.data
+    assert response.get_json()['message'] == 'The idempotency key was used for a different request'
+
+
+def test_send_packages_batch(client):
+    """
+    Test sending a manifest of packages in one request.
+
+    Expects a 200 OK response with one result per package, in request order.
+    """
+    package = {
+        'sender_id': 1,
+        'receiver_id': 2,
+        'max_distance': 10000.0,
+        'size': 'S'
+    }
+    response = client.post('/packages:batch', json={'packages': [package, {**package, 'receiver_id': 999}]})
+    assert response.status_code == 200, response.data
+
+    results = response.get_json()['results']
+    assert 'package' in results[0]
+    assert results[1] == {'error': 'No receiver found'}
+
+
+def test_send_packages_batch_invalid_size(client):
+    """
+    Test sending a manifest with a package of an invalid size.
+
+    Expects a 400 Bad Request response naming the package.
+    """
+    package = {
+        'sender_id': 1,
+        'receiver_id': 2,
+        'max_distance': 10000.0,
+        'size': 'XL'
+    }
+    response = client.post('/packages:batch', json={'packages': [package]})
+    assert response.status_code == 400, response.data
+    assert response.get_json()['message'] == 'The size of package 0 must be S, M or L'
+
+
 def test_send_package_invalid_size(client):
     """
     Test sending a package with an invalid size.
@@ -122,3 +225,28 @@ def test_receive_package_already_received(client):
 
     data = response.get_json()
     assert data['message'] == 'The package was received'
+
+
+def test_list_packages_filtered(client):
+    """
+    Test listing packages filtered by size and creation time.
+
+    Sends a GET request with filters and expects a 200 OK response
+    containing only packages that match them.
+    """
+    response = client.get('/packages?size=S&created_from=2000-01-01T00:00:00&limit=50')
+    assert response.status_code == 200, response.data
+
+    data = response.get_json()
+    assert all(package['size'] == 'S' for package in data['items'])
+    assert len(data['items']) <= 50
+
+
+def test_list_packages_invalid_limit(client):
+    """
+    Test listing packages with a page size above the allowed maximum.
+
+    Expects a 400 Bad Request response.
+    """
+    response = client.get('/packages?limit=100000')
+    assert response.status_code == 400
@@ -0,0 +1,30 @@
+def test_health_success(client):
+    """
+    Test reporting the health of the service.
+
+    Sends a GET request after the connection pool has been used by another request.
+    Expects a 200 OK response with the statistics of the connection pool.
+    """
+    client.get('/clients/1')
+    response = client.get('/health')
+    assert response.status_code == 200, response.data
+
+    data = response.get_json()
+    assert data['database']['status'] == 'up'
+    assert 'pool_size' in data['database']
+
+
+def test_health_reports_cache_statistics(client):
+    """
+    Test reporting the statistics of the entity caches.
+
+    Requests the same client twice, so the second lookup is served from the cache.
+    Expects the client cache to report at least one hit.
+    """
+    client.get('/clients/1')
+    client.get('/clients/1')
+    response = client.get('/health')
+
+    caches = response.get_json()['caches']
+    assert caches['client']['hits'] >= 1
+    assert {'misses', 'evictions'} <= set(caches['parcel_locker'])
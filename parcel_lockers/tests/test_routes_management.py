@@ -80,3 +80,108 @@ def test_add_locker_missing_size(client):
     }
     response = client.post("/parcel_lockers/locker", json=payload)
     assert response.status_code in [400, 422], response.data
+
+
+def test_find_nearest_parcel_lockers_batch_success(client):
+    """
+    Test finding the nearest parcel lockers for several clients at once.
+
+    This test sends a POST request with an existing and a non-existent client ID and verifies
+    that the response contains parcel lockers for the first one and an error for the second one.
+
+    :param client: The test client for making HTTP requests.
+    """
+    payload = {
+        "client_ids": [1, 999999],
+        "k": 2
+    }
+    response = client.post("/parcel_lockers/nearest:batch", json=payload)
+    assert response.status_code == 200, response.data
+
+    results = response.get_json()["results"]
+    assert results[0]["client_id"] == 1
+    assert 0 < len(results[0]["parcel_lockers"]) <= 2
+    assert results[1] == {"client_id": 999999, "error": "Client 999999 not found"}
+
+
+def test_find_nearest_parcel_lockers_batch_empty(client):
+    """
+    Test finding the nearest parcel lockers without any client IDs.
+
+    This test sends a POST request with an empty list of clients and expects a
+    400 or 422 response indicating validation failure.
+
+    :param client: The test client for making HTTP requests.
+    """
+    response = client.post("/parcel_lockers/nearest:batch", json={"client_ids": []})
+    assert response.status_code in [400, 422], response.data
+
+
+def test_get_availability_success(client):
+    """
+    Test getting the number of free lockers of a parcel locker.
+
+    This test sends a GET request for an existing parcel locker and verifies
+    that the response contains the number of free lockers of every size.
+
+    :param client: The test client for making HTTP requests.
+    """
+    response = client.get("/parcel_lockers/1/availability")
+    assert response.status_code == 200, response.data
+
+    data = response.get_json()
+    assert data["parcel_locker_id"] == 1
+    assert set(data["availability"]) == {"S", "M", "L"}
+
+
+def test_get_availability_not_found(client):
+    """
+    Test getting the number of free lockers of a non-existent parcel locker.
+
+    This test sends a GET request for a parcel locker that does not exist and expects a 404 response.
+
+    :param client: The test client for making HTTP requests.
+    """
+    response = client.get("/parcel_lockers/999999/availability")
+    assert response.status_code == 404, response.data
+
+
+def test_list_parcel_lockers_pages(client):
+    """
+    Test listing parcel lockers page by page.
+
+    This test follows the cursors of two pages of size 1 and verifies that they
+    contain different parcel lockers in ascending ID order.
+
+    :param client: The test client for making HTTP requests.
+    """
+    first_page = client.get("/parcel_lockers?limit=1").get_json()
+    assert len(first_page["items"]) == 1
+    assert first_page["next_cursor"] == first_page["items"][0]["id_"]
+
+    second_page = client.get(f"/parcel_lockers?limit=1&after={first_page['next_cursor']}").get_json()
+    assert second_page["items"][0]["id_"] > first_page["items"][0]["id_"]
+
+
+def test_list_lockers(client):
+    """
+    Test listing the lockers of a parcel locker filtered by size.
+
+    :param client: The test client for making HTTP requests.
+    """
+    response = client.get("/parcel_lockers/1/lockers?size=S&limit=1000")
+    assert response.status_code == 200, response.data
+
+    data = response.get_json()
+    assert all(locker["parcel_locker_id"] == 1 and locker["size"] == "S" for locker in data["items"])
+    assert data["next_cursor"] is None
+
+
+def test_list_lockers_not_found(client):
+    """
+    Test listing the lockers of a non-existent parcel locker, which is expected to return 404.
+
+    :param client: The test client for making HTTP requests.
+    """
+    response = client.get("/parcel_lockers/999999/lockers")
+    assert response.status_code == 404, response.data
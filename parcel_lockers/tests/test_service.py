@@ -1,8 +1,9 @@
 import pytest
-from app.src.service import ParcelLockerService
+from app.src.service import ParcelLockerService, IdempotencyKeyReused
 from app.src.repository import LockerRepository, ClientRepository, PackageRepository, ParcelLockerRepository
-from app.src.entity import Size
+from app.src.entity import Size, Client
 from datetime import datetime
+import uuid
 
 
 @pytest.fixture
@@ -57,6 +58,147 @@ def test_no_parcel_locker_found(parcel_locker_service):
         parcel_locker_service.send_package(1, 1, 10, Size.S.value)
 
 
+def test_send_package_unknown_receiver(parcel_locker_service):
+    """
+    Test to verify that the `send_package` method raises an exception when the receiver does not exist.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    with pytest.raises(ValueError, match="No receiver found"):
+        parcel_locker_service.send_package(1, 999999, 1000000, Size.S.value)
+
+
+def test_send_package_falls_through_to_farther_parcel_lockers(parcel_locker_service):
+    """
+    Test to verify that `send_package` keeps searching the farther parcel lockers in range when the nearest ones
+    counted as available have no free locker left, e.g. because concurrent senders took them.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    sender_id = parcel_locker_service.client_repo.insert(
+        Client(first_name='Far', last_name='Sender', email='far.sender@example.com', phone_number='600700900',
+               latitude=60.0, longitude=60.0)
+    )
+    for i in range(6):
+        taken = parcel_locker_service.add_parcel_locker(f'Taken {i}', '00-006', 60.0 + i * 0.001, 60.0)
+        parcel_locker_service.availability_repo.adjust(taken, Size.M.value, 1)
+    farthest = parcel_locker_service.add_parcel_locker('Free', '00-006', 60.01, 60.0)
+    parcel_locker_service.add_locker(farthest, None, None, Size.M.value, 'Available')
+
+    package_id = parcel_locker_service.send_package(sender_id, sender_id, 5, Size.M.value)
+
+    package = parcel_locker_service.package_repo.find_by_id(package_id)
+    locker = parcel_locker_service.locker_repo.find_by_id(package.locker_id)
+    assert package.parcel_locker_id == farthest
+    assert (locker.status, locker.package_id, locker.client_id) == ("Occupied", package_id, sender_id)
+
+
+def test_send_package_with_undercounted_parcel_locker(parcel_locker_service):
+    """
+    Test to verify that `send_package` finds a free locker of a parcel locker whose free locker counter is too low.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    sender_id = parcel_locker_service.client_repo.insert(
+        Client(first_name='Lost', last_name='Counter', email='lost.counter@example.com', phone_number='600700920',
+               latitude=65.0, longitude=65.0)
+    )
+    parcel_locker_id = parcel_locker_service.add_parcel_locker('Lost', '00-009', 65.0, 65.0)
+    parcel_locker_service.add_locker(parcel_locker_id, None, None, Size.M.value, 'Available')
+    parcel_locker_service.availability_repo.adjust(parcel_locker_id, Size.M.value, -1)
+
+    package_id = parcel_locker_service.send_package(sender_id, sender_id, 5, Size.M.value)
+
+    assert parcel_locker_service.package_repo.find_by_id(package_id).parcel_locker_id == parcel_locker_id
+
+
+def test_send_package_once(parcel_locker_service):
+    """
+    Test to verify that `send_package_once` creates a package for a new key and returns the same one for a retry.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    key = str(uuid.uuid4())
+    package_id, replayed = parcel_locker_service.send_package_once(key, 1, 1, 1000000, Size.S.value)
+    assert not replayed
+
+    assert parcel_locker_service.send_package_once(key, 1, 1, 1000000, Size.S.value) == (package_id, True)
+    with pytest.raises(IdempotencyKeyReused):
+        parcel_locker_service.send_package_once(key, 1, 1, 1000000, Size.M.value)
+
+
+def test_send_package_once_failure_leaves_key_unused(parcel_locker_service):
+    """
+    Test to verify that a failed `send_package_once` rolls back the claim of its key, so a retry is sent again.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    key = str(uuid.uuid4())
+    with pytest.raises(ValueError, match="No receiver found"):
+        parcel_locker_service.send_package_once(key, 1, 999999, 1000000, Size.S.value)
+
+    assert parcel_locker_service.idempotency_repo.find(key) is None
+
+
+def test_send_packages(parcel_locker_service):
+    """
+    Test to verify that `send_packages` sends every package it can and reports the others, in request order.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    results = parcel_locker_service.send_packages([
+        (1, 2, 1000000, Size.S.value),
+        (1, 999999, 1000000, Size.S.value),
+        (1, 1, 10, Size.S.value)
+    ])
+
+    package_id, error = results[0]
+    assert error is None
+    package = parcel_locker_service.package_repo.find_by_id(package_id)
+    locker = parcel_locker_service.locker_repo.find_by_id(package.locker_id)
+    assert (package.sender_id, package.receiver_id, package.size) == (1, 2, Size.S.value)
+    assert (locker.status, locker.package_id, locker.client_id) == ("Occupied", package_id, 2)
+    assert results[1:] == [(None, "No receiver found"), (None, "No parcel lockers found")]
+
+
+def test_send_packages_without_consecutive_ids(parcel_locker_service, connection_manager):
+    """
+    Test to verify that `send_packages` puts every package in the locker reserved for it when the rows of its
+    multi-row insert do not get consecutive IDs, e.g. with an `auto_increment_increment` above 1.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    :param connection_manager: The connection manager used to interact with the database.
+    """
+    sender_id = parcel_locker_service.client_repo.insert(
+        Client(first_name='Gap', last_name='Sender', email='gap.sender@example.com', phone_number='600700910',
+               latitude=70.0, longitude=70.0)
+    )
+    receiver_id = parcel_locker_service.client_repo.insert(
+        Client(first_name='Gap', last_name='Receiver', email='gap.receiver@example.com', phone_number='600700911',
+               latitude=70.0, longitude=70.0)
+    )
+    parcel_locker_id = parcel_locker_service.add_parcel_locker('Gap', '00-008', 70.0, 70.0)
+    for _ in range(3):
+        parcel_locker_service.add_locker(parcel_locker_id, None, None, Size.S.value, 'Available')
+
+    with connection_manager.transaction() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION auto_increment_increment = 7;")
+        try:
+            results = parcel_locker_service.send_packages([(sender_id, receiver_id, 1, Size.S.value)] * 3)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SET SESSION auto_increment_increment = 1;")
+
+    assert all(error is None for _, error in results)
+    package_ids = sorted(package_id for package_id, _ in results)
+    assert package_ids != list(range(package_ids[0], package_ids[0] + 3))
+    for package_id in package_ids:
+        package = parcel_locker_service.package_repo.find_by_id(package_id)
+        locker = parcel_locker_service.locker_repo.find_by_id(package.locker_id)
+        assert (locker.status, locker.package_id, locker.client_id) == ("Occupied", package_id, receiver_id)
+
+
 def test_receive_package(parcel_locker_service):
     """
     Test to verify that the `receive_package` method correctly updates
@@ -77,8 +219,58 @@ def test_receive_package(parcel_locker_service):
     assert locker.status == "Available"
 
 
+def test_transaction_shares_connection(parcel_locker_service, connection_manager):
+    """
+    Test to verify that repository calls made inside a transaction reuse its connection.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    :param connection_manager: The connection manager used to interact with the database.
+    """
+    with connection_manager.transaction() as connection:
+        parcel_locker_service.client_repo.find_by_id(1)
+        with connection_manager.transaction() as nested_connection:
+            assert nested_connection is connection
+        assert connection_manager.current_transaction() is connection
 
+    assert connection_manager.current_transaction() is None
 
 
+def test_transaction_rolls_back_all_repository_calls(parcel_locker_service, connection_manager):
+    """
+    Test to verify that a failed transaction rolls back every repository call made inside it.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    :param connection_manager: The connection manager used to interact with the database.
+    """
+    client = Client(first_name='Roll', last_name='Back', email='rollback@example.com', phone_number='000111222',
+                    latitude=50.0, longitude=19.0)
+
+    with pytest.raises(RuntimeError):
+        with connection_manager.transaction():
+            client_id = parcel_locker_service.client_repo.insert(client)
+            assert parcel_locker_service.client_repo.find_by_id(client_id) is not None
+            raise RuntimeError('abort')
+
+    assert parcel_locker_service.client_repo.find_by_id(client_id) is None
+
+
+def test_locker_availability_counters(parcel_locker_service):
+    """
+    Test to verify that adding lockers, sending and receiving packages keep the free locker counters up to date.
+
+    :param parcel_locker_service: The service that manages the business logic related to parcel lockers.
+    """
+    parcel_locker_service.reconcile_availability()
+    parcel_locker_id = parcel_locker_service.add_parcel_locker('Counter City', '00-005', 52.2297, 21.0122)
+    parcel_locker_service.add_locker(parcel_locker_id, None, None, 'L', 'Available')
+    parcel_locker_service.add_locker(parcel_locker_id, None, None, 'L', 'Occupied')
+    assert parcel_locker_service.find_availability(parcel_locker_id) == {'S': 0, 'M': 0, 'L': 1}
+
+    package_id = parcel_locker_service.send_package(1, 1, 0.5, Size.L.value)
+    assert parcel_locker_service.find_availability(parcel_locker_id)['L'] == 0
 
+    parcel_locker_service.receive_package(package_id)
+    assert parcel_locker_service.find_availability(parcel_locker_id)['L'] == 1
 
+    assert parcel_locker_service.reconcile_availability() == []
+    assert parcel_locker_service.find_availability(999999) is None
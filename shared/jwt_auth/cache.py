@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import Any
+import hashlib
+import threading
+import time
+
+
+class TokenCache:
+    """
+    In-process cache of the claims of verified access tokens, evicting the least recently used tokens first.
+
+    Verifying the signature of a token on every request is wasted work for clients sending the same token
+    again and again, so the claims of a verified token are kept until the token expires or the time to live
+    of the cache passes, whichever comes first. Tokens are keyed by a digest, so the cache holds no usable
+    credentials. Only valid tokens are cached, and every cache belongs to one verification key.
+
+    The cache is shared by all threads of a worker process and guarded by a lock.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 300.0):
+        """
+        Initializes an empty cache.
+
+        :param max_size: The maximum number of tokens kept in the cache.
+        :param ttl: The maximum number of seconds a token is served from the cache after it is verified.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._claims: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        """
+        Builds the cache key of a token.
+
+        :param token: The encoded access token.
+        :return: The digest of the token.
+        """
+        return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+    def get(self, key: bytes) -> dict[str, Any] | None:
+        """
+        Retrieves the claims of a verified token and marks it as recently used; expired tokens are dropped.
+
+        :param key: The cache key of the token.
+        :return: The claims of the token, or None if it is not cached or has expired.
+        """
+        with self._lock:
+            entry = self._claims.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._claims[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._claims.move_to_end(key)
+            self._hits += 1
+            return claims
+
+    def set(self, key: bytes, claims: dict[str, Any]) -> None:
+        """
+        Stores the claims of a verified token until its `exp` claim or the time to live of the cache,
+        evicting the least recently used tokens if the cache is full.
+
+        :param key: The cache key of the token.
+        :param claims: The decoded claims of the token.
+        """
+        expires_at = time.time() + self._ttl
+        if 'exp' in claims:
+            expires_at = min(expires_at, float(claims['exp']))
+
+        with self._lock:
+            self._claims[key] = (expires_at, claims)
+            self._claims.move_to_end(key)
+            while len(self._claims) > self._max_size:
+                self._claims.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns usage statistics of the cache.
+
+        :return: A dictionary with the size of the cache, the number of hits and misses, the hit ratio,
+                 and the number of tokens evicted to make room and dropped after expiring.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._claims),
+                'max_size': self._max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+    def __len__(self) -> int:
+        """
+        Returns the number of tokens in the cache, including expired ones that were not dropped yet.
+
+        :return: The number of cached tokens.
+        """
+        return len(self._claims)
+
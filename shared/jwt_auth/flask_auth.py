@@ -0,0 +1,98 @@
+from flask import Flask, request, current_app, make_response, Response, g
+from functools import wraps
+from typing import Any, Callable, Iterable, Mapping
+from jwt_auth.cache import TokenCache
+from jwt_auth.keys import verification_key
+from jwt_auth.verifier import AuthorizationError, TokenVerifier, allowed_roles
+
+
+def get_verifier(app: Any) -> TokenVerifier:
+    """
+    Returns the token verifier of an application, creating it on first use.
+
+    The verifier is built from the JWT_AUTHTYPE, JWT_SECRET or JWT_PUBLIC_KEY, JWT_PREFIX, JWT_CACHE_SIZE and
+    JWT_CACHE_TTL settings, and built again if the key settings change. Flask and Quart applications are both
+    supported.
+
+    :param app: The application.
+    :return: The `TokenVerifier` instance of the application.
+    """
+    config = app.config
+    settings = (config['JWT_AUTHTYPE'], verification_key(config), config['JWT_PREFIX'])
+    verifier = app.extensions.get('jwt_auth')
+    if verifier is None or verifier.settings != settings:
+        cache = TokenCache(int(config.get('JWT_CACHE_SIZE', 10_000)), float(config.get('JWT_CACHE_TTL', 300)))
+        verifier = TokenVerifier(*settings, cache=cache)
+        app.extensions['jwt_auth'] = verifier
+    return verifier
+
+
+def authorize(roles: list[str] | None = None) -> Callable[[Callable[..., Response]], Callable[..., Response]]:
+    """
+    Decorator to enforce authorization based on JWT token and optional role-based access control.
+
+    The claims of the token are available to the route handler as `g.jwt_claims`.
+
+    :param roles: List of roles that are allowed to access the route. If None, any valid token is allowed.
+    :return: The decorated function is only called if authorization is successful, otherwise, an error response is returned.
+    """
+    roles_allowed = allowed_roles(roles)
+
+    def decorator(f: Callable[..., Response]) -> Callable[..., Response]:
+        """
+        Wraps a route handler in the authorization check.
+
+        :param f: The route handler function to be wrapped by the decorator.
+        :return: The wrapped route handler.
+        """
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs) -> Response:
+            """
+            Authorizes the request by its Authorization header and calls the route handler if it passes.
+
+            :param args: Positional arguments passed to the route handler.
+            :param kwargs: Keyword arguments passed to the route handler.
+            :return: The result of the route handler function if authorization passes, otherwise an error response.
+            """
+            try:
+                g.jwt_claims = get_verifier(current_app).authorize(request.headers.get('Authorization'),
+                                                                   roles_allowed)
+            except AuthorizationError as error:
+                return make_response({'message': error.message}, error.status_code)
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def authorize_endpoints(app: Flask, roles_by_endpoint: Mapping[str, Iterable[str] | None]) -> None:
+    """
+    Requires a valid token for the listed endpoints of an application, without decorating their handlers.
+
+    Requests to endpoints that are not listed, e.g. health checks, are not checked.
+
+    :param app: The application.
+    :param roles_by_endpoint: The roles allowed to use every protected endpoint, keyed by endpoint name;
+                              None allows any valid token.
+    """
+    endpoint_roles = {endpoint: allowed_roles(roles) for endpoint, roles in roles_by_endpoint.items()}
+
+    @app.before_request
+    def authorize_endpoint() -> Response | None:
+        """
+        Authorizes a request to a protected endpoint.
+
+        :return: An error response if authorization fails, otherwise None to continue handling the request.
+        """
+        if request.endpoint not in endpoint_roles:
+            return None
+
+        try:
+            g.jwt_claims = get_verifier(current_app).authorize(request.headers.get('Authorization'),
+                                                               endpoint_roles[request.endpoint])
+        except AuthorizationError as error:
+            return make_response({'message': error.message}, error.status_code)
+        return None
@@ -0,0 +1,68 @@
+from typing import Any
+import jwt
+import os
+
+SYMMETRIC_ALGORITHMS = frozenset({'HS256', 'HS384', 'HS512'})
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    """
+    Checks if tokens of an algorithm are signed with a private key and verified with a public key.
+
+    :param algorithm: The name of the algorithm, e.g. HS256, RS256 or EdDSA.
+    :return: True for public-key algorithms, False for HMAC.
+    """
+    return algorithm not in SYMMETRIC_ALGORITHMS
+
+
+def prepare_key(algorithm: str, key: Any) -> Any:
+    """
+    Parses a key once into the form used by the algorithm, so it is not parsed again for every token.
+
+    :param algorithm: The name of the algorithm.
+    :param key: An HMAC secret, a PEM encoded key, or an already parsed key.
+    :return: The prepared key.
+    """
+    return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
+
+
+def read_key(name: str) -> str | None:
+    """
+    Reads a key from the environment, either inline from <NAME> or from the file named by <NAME>_FILE.
+
+    :param name: The name of the environment variable, e.g. JWT_PUBLIC_KEY.
+    :return: The key, or None if neither variable is set.
+    """
+    key = os.getenv(name)
+    if key:
+        return key.replace('\\n', '\n')
+
+    path = os.getenv(f'{name}_FILE')
+    if path:
+        with open(path) as key_file:
+            return key_file.read()
+    return None
+
+
+def verification_key(config: Any) -> Any:
+    """
+    Selects the key tokens are verified with: the public key for asymmetric algorithms, the shared secret for HMAC.
+
+    :param config: The configuration of the application, with JWT_AUTHTYPE and JWT_PUBLIC_KEY or JWT_SECRET.
+    :return: The verification key.
+    """
+    if is_asymmetric(config['JWT_AUTHTYPE']):
+        return config['JWT_PUBLIC_KEY']
+    return config['JWT_SECRET']
+
+
+def signing_key(config: Any) -> Any:
+    """
+    Selects the key tokens are signed with: the private key for asymmetric algorithms, the shared secret for HMAC.
+
+    :param config: The configuration of the application, with JWT_AUTHTYPE and JWT_PRIVATE_KEY or JWT_SECRET.
+    :return: The signing key.
+    """
+    if is_asymmetric(config['JWT_AUTHTYPE']):
+        return config['JWT_PRIVATE_KEY']
+    return config['JWT_SECRET']
@@ -0,0 +1,99 @@
+from typing import Any, Iterable
+from jwt_auth.cache import TokenCache
+from jwt_auth.keys import prepare_key
+import logging
+import jwt
+
+
+class AuthorizationError(Exception):
+    """
+    Raised when a request cannot be authorized; carries the message and status code of the response.
+    """
+
+    def __init__(self, message: str, status_code: int = 401):
+        """
+        Initializes the error.
+
+        :param message: The message returned to the client.
+        :param status_code: The HTTP status code of the response, 401 or 403.
+        """
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def allowed_roles(roles: Iterable[str] | None) -> frozenset[str] | None:
+    """
+    Normalizes the roles allowed to use an endpoint, so checking a role is a single set lookup.
+
+    :param roles: The allowed roles, or None if any valid token is allowed.
+    :return: The lower-cased roles, or None if any valid token is allowed.
+    """
+    return frozenset(role.lower() for role in roles) if roles else None
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens issued by the users service and checks the role they carry.
+
+    The verification key is parsed once, and the claims of verified tokens are cached until the tokens expire,
+    so a token sent again is authorized without verifying its signature again. With an asymmetric algorithm
+    (RS256, ES256, EdDSA, ...) only the public key is needed, so services verifying tokens cannot issue them.
+    """
+
+    def __init__(self, algorithm: str, key: Any, prefix: str, cache: TokenCache | None = None):
+        """
+        Initializes the verifier.
+
+        :param algorithm: The algorithm the tokens are signed with.
+        :param key: The HMAC secret or the public key, PEM encoded or parsed.
+        :param prefix: The prefix of the token in the Authorization header, e.g. Bearer.
+        :param cache: The cache of verified tokens; a new cache with the default size is used if None.
+        """
+        self.algorithm = algorithm
+        self.prefix = prefix
+        self.settings = (algorithm, key, prefix)
+        self.cache = cache if cache is not None else TokenCache()
+        self._key = prepare_key(algorithm, key)
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Verifies a token, answering from the cache if the token was verified before.
+
+        :param token: The encoded access token.
+        :return: The claims of the token.
+        :raises jwt.InvalidTokenError: If the token is malformed, expired or its signature is invalid.
+        """
+        key = TokenCache.key(token)
+        claims = self.cache.get(key)
+        if claims is None:
+            claims = jwt.decode(token, self._key, algorithms=[self.algorithm])
+            self.cache.set(key, claims)
+        return claims
+
+    def authorize(self, header: str | None, roles: frozenset[str] | None) -> dict[str, Any]:
+        """
+        Authorizes a request by its Authorization header.
+
+        :param header: The value of the Authorization header, or None if the request has none.
+        :param roles: The lower-cased roles allowed to make the request, or None if any valid token is allowed.
+        :return: The claims of the token.
+        :raises AuthorizationError: With status 401 if the token is missing or invalid, 403 if its role is not allowed.
+        """
+        if not header:
+            raise AuthorizationError('Authorization failed - no header')
+
+        if not header.startswith(self.prefix):
+            raise AuthorizationError('Authorization failed - access token without prefix')
+
+        try:
+            claims = self.verify(header.split(' ')[1])
+            role = claims['role'].lower()
+        except Exception as error:
+            logging.info('Authorization failed: %r', error)
+            raise AuthorizationError('Authorization failed') from error
+
+        if roles and role not in roles:
+            raise AuthorizationError('Access denied!', 403)
+
+        return claims
@@ -5,6 +5,7 @@ from werkzeug.security import check_password_hash
 from app.db.entity import UserEntity
 from app.db.repository import user_repository
 from app.config import JWT_CONFIG
+from jwt_auth.keys import signing_key, verification_key
 import datetime
 import jwt
 import logging
@@ -66,8 +67,8 @@ def configure_security(app: Flask) -> None:
             'access_token_exp': access_token_exp
         }
 
-        access_token = jwt.encode(access_token_payload, app.config['JWT_SECRET'], algorithm=app.config['JWT_AUTHTYPE'])
-        refresh_token = jwt.encode(refresh_token_payload, app.config['JWT_SECRET'], algorithm=app.config['JWT_AUTHTYPE'])
+        access_token = jwt.encode(access_token_payload, signing_key(app.config), algorithm=app.config['JWT_AUTHTYPE'])
+        refresh_token = jwt.encode(refresh_token_payload, signing_key(app.config), algorithm=app.config['JWT_AUTHTYPE'])
 
         response_body = {
             'access_token': access_token,
@@ -103,7 +104,7 @@ def configure_security(app: Flask) -> None:
         try:
             decoded_refresh_token = jwt.decode(
                 refresh_token,
-                app.config['JWT_SECRET'],
+                verification_key(app.config),
                 algorithms=[app.config['JWT_AUTHTYPE']]
             )
 
@@ -128,9 +129,9 @@ def configure_security(app: Flask) -> None:
                 'access_token_exp': new_access_token_exp
             }
 
-            access_token = jwt.encode(access_token_payload, app.config['JWT_SECRET'],
+            access_token = jwt.encode(access_token_payload, signing_key(app.config),
                                       algorithm=app.config['JWT_AUTHTYPE'])
-            refresh_token = jwt.encode(refresh_token_payload, app.config['JWT_SECRET'],
+            refresh_token = jwt.encode(refresh_token_payload, signing_key(app.config),
                                        algorithm=app.config['JWT_AUTHTYPE'])
 
             response_body = {
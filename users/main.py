@@ -11,6 +11,7 @@ from app.db.entity import UserEntity, ClientEntity
 from app.routes.resource import RegisterUserResource, ActivationUserResource
 from app.config import MAIL_SETTINGS, DB_URL, JWT_CONFIG
 from app.security.configuration import configure_security, users_blueprint
+from jwt_auth.keys import read_key
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +39,8 @@ def create_app() -> Flask:
         MailSender(app, MAIL_SETTINGS['MAIL_USERNAME'])
 
         app.config.update(JWT_CONFIG)
+        app.config['JWT_PRIVATE_KEY'] = read_key('JWT_PRIVATE_KEY')
+        app.config['JWT_PUBLIC_KEY'] = read_key('JWT_PUBLIC_KEY')
         configure_security(app)
 
         app.register_blueprint(users_blueprint)